@@ -0,0 +1,63 @@
+"""Настройки gunicorn для бэкенда
+
+По умолчанию WSGI с потоками (gthread): синхронный DRF API обслуживается
+параллельно потоками воркера. Под ASGI каждое синхронное представление
+выполняется через sync_to_async(thread_sensitive=True), то есть по одному
+за раз на воркер. Поэтому под ASGI (GUNICORN_WORKER_CLASS=
+uvicorn_worker.UvicornWorker, приложение todo_project.asgi) запускается
+отдельный сервис только для async-представлений /api/async/*.
+"""
+
+import itertools
+import multiprocessing
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Потоки воркера gthread; пул соединений с БД (DB_POOL_MAX_SIZE) не меньше
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Перезапуск воркера после N запросов ограничивает рост памяти,
+# jitter не дает всем воркерам перезапуститься одновременно
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG") or None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def on_starting(server):
+    """Пустой каталог метрик Prometheus для нового запуска"""
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Метрики завершившегося воркера больше не учитываются в gauge"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def pre_fork(server, worker):
+    """Наименьший свободный номер процесса на узле для генератора ID
+
+    Номер освобождается, только когда прежний воркер завершился, поэтому
+    два живых воркера узла никогда не получат один номер генератора.
+    """
+    used = {getattr(other, "id_slot", None) for other in server.WORKERS.values()}
+    worker.id_slot = next(slot for slot in itertools.count(1) if slot not in used)
+
+
+def post_fork(server, worker):
+    os.environ["ID_WORKER_SLOT"] = str(worker.id_slot)
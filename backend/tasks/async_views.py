@@ -0,0 +1,83 @@
+"""Асинхронные представления для горячих запросов бота
+
+Работают под ASGI-сервером без потока на запрос: ORM вызывается через
+async-методы QuerySet.
+"""
+
+import functools
+import logging
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+    TokenError,
+)
+
+from .authentication import CachedJWTAuthentication
+from .models import Task
+from .serializers import TaskSerializer
+from .views import filter_tasks, task_status_counts
+
+logger = logging.getLogger(__name__)
+
+_jwt_authentication = CachedJWTAuthentication()
+
+
+async def authenticate(request):
+    """Пользователь по JWT из заголовка Authorization или None"""
+    header = _jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = _jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+
+    try:
+        # Проверка подписи и срока действия не обращается к БД,
+        # пользователь берется из кеша
+        token = _jwt_authentication.get_validated_token(raw_token)
+        return await _jwt_authentication.aget_user(token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def jwt_required(view):
+    """Аутентификация async-представления по JWT, как у DRF-представлений"""
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await authenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Учетные данные не были предоставлены."}, status=401
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@require_GET
+@jwt_required
+async def task_detail(request, pk):
+    """Детали задачи (async-вариант GET /api/tasks/{id}/)"""
+    try:
+        task = await filter_tasks(request.user, request.GET).aget(pk=pk)
+    except Task.DoesNotExist:
+        return JsonResponse({"detail": "Не найдено."}, status=404)
+    return JsonResponse(TaskSerializer(task).data)
+
+
+@require_GET
+@jwt_required
+async def task_stats(request):
+    """Количество задач по статусам (async-вариант GET /api/tasks/stats/)"""
+    counts = (
+        await filter_tasks(request.user, request.GET)
+        .order_by()
+        .aaggregate(**task_status_counts(timezone.now()))
+    )
+    return JsonResponse(counts)
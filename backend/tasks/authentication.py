@@ -0,0 +1,102 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import CACHE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication без запроса пользователя в БД на каждый запрос
+
+    Пользователь из токена берется из кеша Django (AUTH_USER_CACHE_TIMEOUT
+    секунд), запись сбрасывается сигналами при изменении или удалении
+    пользователя. Проверки активности и отзыва токена выполняются всегда.
+    """
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        key = user_cache_key(user_id)
+
+        try:
+            user = cache.get(key)
+        except CACHE_ERRORS as e:
+            logger.warning(f"Кеш недоступен, пользователь берется из БД: {e}")
+            user = None
+        if user is None:
+            try:
+                user = self.user_model.objects.get(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                ) from e
+            try:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            except CACHE_ERRORS as e:
+                logger.warning(f"Не удалось закешировать пользователя: {e}")
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        """Async-вариант get_user для ASGI-представлений"""
+        user_id = self.get_user_id(validated_token)
+        key = user_cache_key(user_id)
+
+        try:
+            user = await cache.aget(key)
+        except CACHE_ERRORS as e:
+            logger.warning(f"Кеш недоступен, пользователь берется из БД: {e}")
+            user = None
+        if user is None:
+            try:
+                user = await self.user_model.objects.aget(
+                    **{api_settings.USER_ID_FIELD: user_id}
+                )
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found"
+                ) from e
+            try:
+                await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+            except CACHE_ERRORS as e:
+                logger.warning(f"Не удалось закешировать пользователя: {e}")
+
+        self.check_user(user, validated_token)
+        return user
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+    @staticmethod
+    def check_user(user, validated_token) -> None:
+        """Те же проверки, что у JWTAuthentication.get_user"""
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
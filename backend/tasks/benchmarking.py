@@ -0,0 +1,196 @@
+import json
+import logging
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Перцентиль по методу ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(durations: list) -> dict:
+    """Сводка по длительностям в секундах, результат в миллисекундах"""
+    if not durations:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "count": len(durations),
+        "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p99_ms": round(percentile(durations, 99) * 1000, 3),
+    }
+
+
+def measure(func, repeat: int) -> dict:
+    """Многократный замер вызова func"""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def run_concurrent(items: list, concurrency: int, func) -> dict:
+    """Выполнение func(item) в concurrency потоках
+
+    func возвращает (ok, число SQL-запросов). У каждого потока свое
+    соединение с БД, оно закрывается по завершении потока.
+    """
+    from django.db import connection
+
+    pending = iter(items)
+    lock = threading.Lock()
+    durations, queries = [], []
+    errors = 0
+
+    def worker():
+        nonlocal errors
+        try:
+            while True:
+                with lock:
+                    item = next(pending, None)
+                if item is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    ok, query_count = func(item)
+                except Exception as e:
+                    logger.error(f"Ошибка запроса бенчмарка: {e}")
+                    ok, query_count = False, 0
+                elapsed = time.perf_counter() - started
+                with lock:
+                    durations.append(elapsed)
+                    queries.append(query_count)
+                    errors += not ok
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        **summarize(durations),
+        "rps": round(len(durations) / elapsed, 1) if elapsed else 0.0,
+        "queries_max": max(queries, default=0),
+        "errors": errors,
+    }
+
+
+# Метрики, которые при повторах берутся худшими, а не медианой
+STRICT_METRICS = ("queries_max", "queries", "errors", "failed")
+
+
+def median_report(reports: list) -> dict:
+    """Сводка нескольких повторов одного сценария: медиана времени и
+    пропускной способности, худшее число SQL-запросов и ошибок"""
+    combined = {}
+    for key in reports[0]:
+        values = [report[key] for report in reports]
+        if key in STRICT_METRICS:
+            combined[key] = max(values)
+        else:
+            combined[key] = round(statistics.median(values), 3)
+    return combined
+
+
+class StubBotServer:
+    """Локальная заглушка Notification API бота (/send_message, /send_messages)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.received = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                items = body if isinstance(body, list) else [body]
+                if stub.latency:
+                    time.sleep(stub.latency)
+                with stub._lock:
+                    stub.received += len(items)
+
+                payload = json.dumps(
+                    {
+                        "sent": len(items),
+                        "total": len(items),
+                        "results": [
+                            {"index": index, "status": "sent"}
+                            for index in range(len(items))
+                        ],
+                    }
+                ).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def compare_with_baseline(
+    results: dict, baseline: dict, tolerance: float, p99_tolerance: float
+) -> list:
+    """Регрессии results относительно baseline, список описаний
+
+    Медиана времени (p50) и пропускная способность сравниваются с допуском
+    tolerance, p99 - с более широким p99_tolerance, число SQL-запросов и
+    ошибок - строго.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        for key, allowed in (("p50_ms", tolerance), ("p99_ms", p99_tolerance)):
+            if key in base and current[key] > base[key] * (1 + allowed):
+                regressions.append(
+                    f"{name}: {key[:3]} {current[key]} мс > {base[key]} мс"
+                )
+        for key in ("rps", "throughput"):
+            if key in base and current[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{name}: {key} {current[key]} < {base[key]}")
+        for key in STRICT_METRICS:
+            if key in base and current[key] > base[key]:
+                regressions.append(f"{name}: {key} {current[key]} > {base[key]}")
+    return regressions
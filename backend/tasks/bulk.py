@@ -0,0 +1,144 @@
+"""Пакетные операции над задачами
+
+bulk_create и UPDATE по списку ID не вызывают post_save и m2m_changed,
+поэтому сброс кеша списков и планирование напоминаний здесь выполняются
+явно. DELETE по списку ID вызывает post_delete для каждой задачи: к сигналу
+подключены обработчики, и Django сначала выбирает удаляемые строки. Эти
+обработчики сбрасывают кеш еще до фиксации транзакции, поэтому сброс
+после фиксации выполняется и для удаления.
+"""
+
+from django.db import transaction
+
+from .cache import bump_generation
+from .models import Category, Task
+from .tasks import schedule_task_reminder
+
+TaskCategory = Task.categories.through
+
+
+def _invalidate(user_id, telegram_user_ids) -> None:
+    """Сброс кеша списков после фиксации транзакции
+
+    Иначе параллельный запрос списка успеет прочитать строки до фиксации
+    и закешировать их под новым поколением.
+    """
+    telegram_user_ids = set(telegram_user_ids)
+
+    def invalidate():
+        for telegram_user_id in telegram_user_ids:
+            bump_generation("task", user_id, telegram_user_id)
+
+    transaction.on_commit(invalidate)
+
+
+def _schedule_reminders(task_ids) -> None:
+    """Планирование напоминаний после фиксации транзакции"""
+
+    def schedule():
+        tasks = Task.objects.filter(id__in=task_ids, due_date__isnull=False).only(
+            "id", "due_date", "telegram_user_id", "is_completed", "notification_sent"
+        )
+        for task in tasks:
+            schedule_task_reminder(task)
+
+    transaction.on_commit(schedule)
+
+
+def _user_category_ids(user, category_ids) -> set:
+    """ID категорий из списка, которые принадлежат пользователю (один запрос)"""
+    if not category_ids:
+        return set()
+    return set(
+        Category.objects.filter(user=user, id__in=set(category_ids)).values_list(
+            "id", flat=True
+        )
+    )
+
+
+def bulk_create_tasks(user, items) -> list:
+    """Создание задач одним INSERT и привязка категорий одним INSERT в связи
+
+    items - провалидированные данные TaskSerializer, возвращает созданные задачи.
+    """
+    allowed = _user_category_ids(
+        user, [cid for item in items for cid in item.get("category_ids") or []]
+    )
+
+    tasks, links = [], []
+    for item in items:
+        data = dict(item)
+        category_ids = data.pop("category_ids", None) or []
+        task = Task(user=user, **data)
+        tasks.append(task)
+        links.extend(
+            TaskCategory(task_id=task.id, category_id=category_id)
+            for category_id in dict.fromkeys(category_ids)
+            if category_id in allowed
+        )
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+        TaskCategory.objects.bulk_create(links, ignore_conflicts=True)
+        _invalidate(user.pk, [task.telegram_user_id for task in tasks])
+        _schedule_reminders([task.id for task in tasks if task.due_date])
+
+    return tasks
+
+
+def _existing(queryset, task_ids) -> dict:
+    """ID найденных задач -> telegram_user_id"""
+    return dict(
+        queryset.filter(id__in=set(task_ids))
+        .order_by()
+        .values_list("id", "telegram_user_id")
+    )
+
+
+def bulk_set_completed(user, queryset, task_ids, is_completed: bool) -> set:
+    """Смена статуса задач одним UPDATE, возвращает ID найденных задач"""
+    with transaction.atomic():
+        found = _existing(queryset, task_ids)
+        if found:
+            Task.objects.filter(id__in=found).update(is_completed=is_completed)
+            _invalidate(user.pk, found.values())
+            # Выполненные задачи напоминание пропустит само, вернувшимся в работу
+            # его нужно запланировать заново
+            if not is_completed:
+                _schedule_reminders(list(found))
+    return set(found)
+
+
+def bulk_delete_tasks(user, queryset, task_ids) -> set:
+    """Удаление задач (связи с категориями Django удаляет одним запросом)"""
+    with transaction.atomic():
+        found = _existing(queryset, task_ids)
+        if found:
+            Task.objects.filter(id__in=found).delete()
+            _invalidate(user.pk, found.values())
+    return set(found)
+
+
+def bulk_categorize_tasks(user, queryset, task_ids, category_ids, mode: str) -> set:
+    """Добавление (add), замена (set) или снятие (remove) категорий у задач"""
+    with transaction.atomic():
+        found = _existing(queryset, task_ids)
+        allowed = _user_category_ids(user, category_ids)
+        if found:
+            links = TaskCategory.objects.filter(task_id__in=found)
+            if mode == "set":
+                links.delete()
+            elif mode == "remove":
+                links.filter(category_id__in=allowed).delete()
+
+            if mode in ("add", "set"):
+                TaskCategory.objects.bulk_create(
+                    [
+                        TaskCategory(task_id=task_id, category_id=category_id)
+                        for task_id in found
+                        for category_id in allowed
+                    ],
+                    ignore_conflicts=True,
+                )
+            _invalidate(user.pk, found.values())
+    return set(found)
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from redis.exceptions import RedisError
+from rest_framework import status
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+ALL_TELEGRAM_USERS = "*"
+
+# Ошибки недоступного бэкенда кеша: кеш пропускается, данные берутся из БД
+CACHE_ERRORS = (RedisError, OSError)
+
+
+def _generation_key(scope: str, user_id, telegram_user_id) -> str:
+    return f"gen:{scope}:{user_id}:{telegram_user_id}"
+
+
+def get_generation(scope: str, user_id, telegram_user_id=ALL_TELEGRAM_USERS):
+    """Текущее поколение данных списка, None если кеш недоступен"""
+    key = _generation_key(scope, user_id, telegram_user_id)
+    try:
+        generation = cache.get(key)
+        if generation is None:
+            # После вытеснения ключа поколение не должно совпасть с прежним
+            cache.add(key, time.time_ns(), timeout=None)
+            generation = cache.get(key)
+    except CACHE_ERRORS as e:
+        logger.warning(f"Кеш недоступен, список {scope} берется из БД: {e}")
+        return None
+    return generation
+
+
+def bump_generation(scope: str, user_id, telegram_user_id=None) -> None:
+    """Инвалидация закешированных списков: увеличение поколения"""
+    scopes = [ALL_TELEGRAM_USERS]
+    if telegram_user_id is not None:
+        scopes.append(telegram_user_id)
+
+    for value in scopes:
+        key = _generation_key(scope, user_id, value)
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+        except CACHE_ERRORS as e:
+            # Запись в БД уже выполнена и не должна падать из-за кеша; старые
+            # списки могут отдаваться до LIST_CACHE_TIMEOUT после восстановления
+            logger.error(f"Не удалось сбросить кеш списков {key}: {e}")
+
+
+class CachedListMixin:
+    """Cache-aside для list(): ответы кешируются по пользователю, параметрам
+    запроса и поколению данных; по совпадающему If-None-Match отдается 304"""
+
+    list_cache_scope = None
+
+    def get_list_cache_key(self, request):
+        """Ключ кеша списка, None если кеш недоступен"""
+        telegram_user_id = request.query_params.get(
+            "telegram_user_id", ALL_TELEGRAM_USERS
+        )
+        generation = get_generation(
+            self.list_cache_scope, request.user.pk, telegram_user_id
+        )
+        if generation is None:
+            return None
+        params = "&".join(
+            f"{key}={value}" for key, value in sorted(request.query_params.items())
+        )
+        digest = hashlib.sha1(f"{request.get_host()}?{params}".encode()).hexdigest()
+        return f"list:{self.list_cache_scope}:{request.user.pk}:{generation}:{digest}"
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_list_cache_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        # Содержимое ответа однозначно определяется ключом, поэтому ключ и есть ETag
+        etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                data = cache.get(key)
+            except CACHE_ERRORS as e:
+                logger.warning(f"Кеш недоступен, список берется из БД: {e}")
+                return super().list(request, *args, **kwargs)
+
+            if data is None:
+                response = super().list(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                try:
+                    cache.set(key, response.data, settings.LIST_CACHE_TIMEOUT)
+                except CACHE_ERRORS as e:
+                    logger.warning(f"Не удалось закешировать список: {e}")
+            else:
+                response = Response(data)
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
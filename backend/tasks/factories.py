@@ -0,0 +1,133 @@
+"""Фабрики данных для тестов и бенчмарков
+
+Пользователи Telegram (BotProfile), их категории и задачи создаются
+пакетно через bulk_create, без сигналов: без напоминаний Celery и
+сброса кеша списков.
+"""
+
+import datetime
+import random
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BotProfile, Category, Task
+
+
+@dataclass
+class SeededUser:
+    """Telegram пользователь и ID его данных"""
+
+    telegram_user_id: int
+    category_ids: list = field(default_factory=list)
+    task_ids: list = field(default_factory=list)
+
+
+def build_category(user, telegram_user_id: int, number: int) -> Category:
+    # Название уникально в пределах пользователя Django (все категории бота)
+    return Category(
+        name=f"Категория {telegram_user_id}-{number}",
+        user=user,
+        telegram_user_id=telegram_user_id,
+    )
+
+
+def build_task(
+    user, telegram_user_id: int, number: int, rng: random.Random, now=None
+) -> Task:
+    now = now or timezone.now()
+    has_due_date = rng.random() < 0.7
+    return Task(
+        title=f"Задача {telegram_user_id}-{number}",
+        description="Описание задачи" if rng.random() < 0.5 else "",
+        user=user,
+        telegram_user_id=telegram_user_id,
+        # Сроки в будущем: рассылка уведомлений их не трогает
+        due_date=(
+            now + datetime.timedelta(hours=rng.randint(1, 24 * 30))
+            if has_due_date
+            else None
+        ),
+        is_completed=rng.random() < 0.3,
+    )
+
+
+def build_due_task(user, telegram_user_id: int, number: int, now=None) -> Task:
+    """Просроченная задача без отправленного уведомления"""
+    now = now or timezone.now()
+    return Task(
+        title=f"Просроченная задача {telegram_user_id}-{number}",
+        user=user,
+        telegram_user_id=telegram_user_id,
+        due_date=now - datetime.timedelta(minutes=number + 1),
+    )
+
+
+@transaction.atomic
+def seed_users(
+    user,
+    users: int,
+    categories_per_user: int,
+    tasks_per_user: int,
+    seed: int = 0,
+    first_telegram_user_id: int = 1_000_000,
+) -> list:
+    """Telegram пользователи с категориями и задачами, список SeededUser"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    seeded = [
+        SeededUser(telegram_user_id=first_telegram_user_id + number)
+        for number in range(users)
+    ]
+
+    BotProfile.objects.bulk_create(
+        BotProfile(
+            user=user,
+            telegram_user_id=item.telegram_user_id,
+            chat_id=item.telegram_user_id,
+            first_name=f"User {item.telegram_user_id}",
+        )
+        for item in seeded
+    )
+
+    categories = Category.objects.bulk_create(
+        build_category(user, item.telegram_user_id, number)
+        for item in seeded
+        for number in range(categories_per_user)
+    )
+    tasks = Task.objects.bulk_create(
+        build_task(user, item.telegram_user_id, number, rng, now)
+        for item in seeded
+        for number in range(tasks_per_user)
+    )
+
+    by_telegram_id = {item.telegram_user_id: item for item in seeded}
+    for category in categories:
+        by_telegram_id[category.telegram_user_id].category_ids.append(category.id)
+
+    links = []
+    for task in tasks:
+        item = by_telegram_id[task.telegram_user_id]
+        item.task_ids.append(task.id)
+        if item.category_ids:
+            links.append(
+                Task.categories.through(
+                    task_id=task.id, category_id=rng.choice(item.category_ids)
+                )
+            )
+    Task.categories.through.objects.bulk_create(links)
+
+    return seeded
+
+
+def seed_due_tasks(user, telegram_user_ids: list, count: int) -> list:
+    """count просроченных задач, поровну между пользователями"""
+    now = timezone.now()
+    tasks = Task.objects.bulk_create(
+        build_due_task(
+            user, telegram_user_ids[number % len(telegram_user_ids)], number, now
+        )
+        for number in range(count)
+    )
+    return [task.id for task in tasks]
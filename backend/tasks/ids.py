@@ -0,0 +1,123 @@
+"""Генерация 64-битных ID, упорядоченных по времени (схема Snowflake)
+
+41 бит - миллисекунды от ID_EPOCH, 10 бит - номер генератора, 12 бит -
+счетчик внутри миллисекунды. ID помещается в положительный BIGINT,
+новые строки ложатся в конец B-tree индекса, а до 4096 ID в миллисекунду
+на генератор не пересекаются.
+
+Номер генератора должен быть уникален среди всех процессов, пишущих в БД:
+5 бит - номер узла (контейнера) ID_NODE_ID, 5 бит - номер процесса на узле,
+который хуки gunicorn и Celery передают через ID_WORKER_SLOT.
+"""
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# 2025-01-01 00:00:00 UTC, миллисекунды
+ID_EPOCH_MS = 1735689600000
+
+TIMESTAMP_BITS = 41
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+NODE_BITS = 5
+SLOT_BITS = WORKER_BITS - NODE_BITS
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+MAX_SLOT = (1 << SLOT_BITS) - 1
+
+# Номер процесса на узле: 0 - основной процесс (manage.py, beat),
+# 1..MAX_SLOT - воркеры gunicorn и дочерние процессы Celery
+WORKER_SLOT_ENV = "ID_WORKER_SLOT"
+
+
+def compose_id(timestamp_ms: int, worker_id: int, sequence: int) -> int:
+    """Сборка ID из времени в миллисекундах Unix, номера генератора и счетчика"""
+    return (
+        (timestamp_ms - ID_EPOCH_MS) << (WORKER_BITS + SEQUENCE_BITS)
+        | (worker_id & MAX_WORKER_ID) << SEQUENCE_BITS
+        | (sequence & MAX_SEQUENCE)
+    )
+
+
+def id_timestamp_ms(value: int) -> int:
+    """Время создания ID в миллисекундах Unix"""
+    return (value >> (WORKER_BITS + SEQUENCE_BITS)) + ID_EPOCH_MS
+
+
+class SnowflakeGenerator:
+    """Потокобезопасный генератор монотонно растущих ID"""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id & MAX_WORKER_ID
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def __call__(self) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            # Часы отошли назад: продолжаем от последней выданной миллисекунды
+            now_ms = max(now_ms, self._last_ms)
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # Счетчик миллисекунды исчерпан, берем следующую
+                    now_ms += 1
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return compose_id(now_ms, self.worker_id, self._sequence)
+
+
+_generator = None
+_generator_pid = None
+_generator_lock = threading.Lock()
+
+
+def worker_id(node_id: int, slot: int) -> int:
+    """Номер генератора процесса slot на узле node_id"""
+    if not 0 <= node_id <= MAX_NODE_ID:
+        raise ImproperlyConfigured(f"ID_NODE_ID должен быть от 0 до {MAX_NODE_ID}")
+    if not 0 <= slot <= MAX_SLOT:
+        raise ImproperlyConfigured(
+            f"На узле не больше {MAX_SLOT} процессов-воркеров, номер процесса {slot}"
+        )
+    return node_id << SLOT_BITS | slot
+
+
+def _worker_id() -> int:
+    """Номер генератора: ID_WORKER_ID целиком или ID_NODE_ID + номер процесса
+
+    Случайный номер или PID не годятся: при нескольких воркерах на
+    нескольких узлах совпадения вероятны, а совпавшие генераторы выдают
+    одинаковые ID в одну миллисекунду.
+    """
+    configured = settings.ID_WORKER_ID
+    if configured is not None:
+        if not 0 <= configured <= MAX_WORKER_ID:
+            raise ImproperlyConfigured(
+                f"ID_WORKER_ID должен быть от 0 до {MAX_WORKER_ID}"
+            )
+        return configured
+    return worker_id(settings.ID_NODE_ID, int(os.environ.get(WORKER_SLOT_ENV, 0)))
+
+
+def generate_id() -> int:
+    """Новый ID для первичного ключа модели"""
+    global _generator, _generator_pid
+
+    # После fork (воркеры gunicorn, celery) генератор создается заново
+    pid = os.getpid()
+    if _generator is None or _generator_pid != pid:
+        with _generator_lock:
+            if _generator is None or _generator_pid != pid:
+                _generator = SnowflakeGenerator(_worker_id())
+                _generator_pid = pid
+    return _generator()
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks.benchmarking import measure
+
+QUERY = "SELECT id, title FROM tasks_task ORDER BY created_at DESC LIMIT 20"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request latency of a typical query when every request "
+        "opens a new PostgreSQL connection (CONN_MAX_AGE=0 without a pool), "
+        "reuses a persistent connection, or borrows one from a psycopg pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=500)
+        parser.add_argument("--pool-size", type=int, default=4)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Нужен PostgreSQL")
+
+        import psycopg
+        from psycopg_pool import ConnectionPool
+
+        params = connection.get_connection_params()
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+
+        def new_connection():
+            with psycopg.connect(**params) as conn:
+                conn.execute(QUERY).fetchall()
+
+        persistent = psycopg.connect(**params, autocommit=True)
+
+        def persistent_connection():
+            persistent.execute(QUERY).fetchall()
+
+        pool = ConnectionPool(
+            kwargs={**params, "autocommit": True},
+            min_size=options["pool_size"],
+            max_size=options["pool_size"],
+            open=True,
+        )
+        pool.wait()
+
+        def pooled_connection():
+            with pool.connection() as conn:
+                conn.execute(QUERY).fetchall()
+
+        try:
+            for name, func in (
+                ("new connection per request", new_connection),
+                ("persistent (CONN_MAX_AGE)", persistent_connection),
+                ("psycopg pool", pooled_connection),
+            ):
+                timings = measure(func, options["repeat"])
+                self.stdout.write(
+                    f"{name}: p50 {timings['p50_ms']} мс, p99 {timings['p99_ms']} мс, "
+                    f"среднее {timings['mean_ms']} мс"
+                )
+        finally:
+            persistent.close()
+            pool.close()
@@ -0,0 +1,177 @@
+import datetime
+import hashlib
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from tasks.benchmarking import measure
+from tasks.ids import SnowflakeGenerator
+
+TABLE_PREFIX = "bench_ids"
+
+# Тип первичного ключа и генератор ID для каждой схемы
+SCHEMES = {
+    "legacy": "varchar(30)",
+    "snowflake": "bigint",
+}
+
+
+def legacy_id(prefix: str, *args) -> str:
+    """Прежний формат ID: префикс, дата и 24 бита sha1 от аргументов"""
+    date_part = datetime.date.today().strftime("%Y%m%d")
+    hash_part = hashlib.sha1("_".join(map(str, args)).encode()).hexdigest()[:6]
+    return f"{prefix}_{date_part}_{hash_part}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare insert and join throughput of the legacy hash-based string "
+        "IDs and the 64-bit time-ordered IDs on scratch tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000)
+        parser.add_argument("--categories", type=int, default=2_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, **options):
+        for scheme, id_type in SCHEMES.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{scheme} ({id_type})"))
+            task_ids, category_ids = self.build_ids(scheme, options)
+            self.create_tables(scheme, id_type)
+            try:
+                self.run_scheme(scheme, task_ids, category_ids, options)
+            finally:
+                self.drop_tables(scheme)
+
+    def build_ids(self, scheme: str, options):
+        """ID задач и категорий; дубликаты прежней схемы отбрасываются"""
+        if scheme == "snowflake":
+            generate = SnowflakeGenerator(worker_id=1)
+            return (
+                [generate() for _ in range(options["rows"])],
+                [generate() for _ in range(options["categories"])],
+            )
+
+        # Как в прежнем Task.save: telegram id, заголовок и время создания
+        now = datetime.datetime.now()
+        task_ids = {
+            legacy_id(
+                "task",
+                random.randint(1, 10_000),
+                f"Задача {number}",
+                (now + datetime.timedelta(microseconds=number)).isoformat(),
+            )
+            for number in range(options["rows"])
+        }
+        category_ids = {
+            legacy_id("cat", random.randint(1, 10_000), f"Категория {number}")
+            for number in range(options["categories"])
+        }
+        collisions = options["rows"] - len(task_ids)
+        collisions += options["categories"] - len(category_ids)
+        if collisions:
+            self.stdout.write(self.style.WARNING(f"Коллизий ID: {collisions}"))
+        return list(task_ids), list(category_ids)
+
+    def create_tables(self, scheme: str, id_type: str) -> None:
+        prefix = f"{TABLE_PREFIX}_{scheme}"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {prefix}_task "
+                f"(id {id_type} PRIMARY KEY, title varchar(200) NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE TABLE {prefix}_category "
+                f"(id {id_type} PRIMARY KEY, name varchar(100) NOT NULL)"
+            )
+            cursor.execute(
+                f"CREATE TABLE {prefix}_link (task_id {id_type} NOT NULL, "
+                f"category_id {id_type} NOT NULL, PRIMARY KEY (task_id, category_id))"
+            )
+            cursor.execute(
+                f"CREATE INDEX {prefix}_link_category ON {prefix}_link (category_id)"
+            )
+
+    def drop_tables(self, scheme: str) -> None:
+        with connection.cursor() as cursor:
+            for table in ("link", "task", "category"):
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE_PREFIX}_{scheme}_{table}")
+
+    def insert(self, table: str, columns: str, rows: list, batch_size: int) -> float:
+        """Вставка пачками через executemany, возвращает строк в секунду"""
+        placeholders = ", ".join(["%s"] * len(rows[0]))
+        started = time.perf_counter()
+        for start in range(0, len(rows), batch_size):
+            # Пачка - одна транзакция, как у bulk_create
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                    rows[start : start + batch_size],
+                )
+        return len(rows) / (time.perf_counter() - started)
+
+    def run_scheme(self, scheme: str, task_ids, category_ids, options) -> None:
+        prefix = f"{TABLE_PREFIX}_{scheme}"
+        batch_size = options["batch_size"]
+
+        category_rate = self.insert(
+            f"{prefix}_category",
+            "id, name",
+            [(cid, f"Категория {n}") for n, cid in enumerate(category_ids)],
+            batch_size,
+        )
+        task_rate = self.insert(
+            f"{prefix}_task",
+            "id, title",
+            [(tid, f"Задача {n}") for n, tid in enumerate(task_ids)],
+            batch_size,
+        )
+        links = {
+            (task_id, random.choice(category_ids))
+            for task_id in task_ids
+            for _ in range(random.randint(1, 3))
+        }
+        link_rate = self.insert(
+            f"{prefix}_link", "task_id, category_id", list(links), batch_size
+        )
+        self.stdout.write(
+            f"INSERT: задачи {task_rate:,.0f} строк/с, категории "
+            f"{category_rate:,.0f} строк/с, связи {link_rate:,.0f} строк/с"
+        )
+
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute(f"ANALYZE {prefix}_task")
+                cursor.execute(f"ANALYZE {prefix}_category")
+                cursor.execute(f"ANALYZE {prefix}_link")
+            else:
+                cursor.execute("ANALYZE")
+
+        def join():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT c.name, COUNT(*) FROM {prefix}_task t "
+                    f"JOIN {prefix}_link l ON l.task_id = t.id "
+                    f"JOIN {prefix}_category c ON c.id = l.category_id "
+                    f"GROUP BY c.name"
+                )
+                cursor.fetchall()
+
+        timings = measure(join, options["repeat"])
+        self.stdout.write(
+            f"JOIN задачи-связи-категории: p50 {timings['p50_ms']} мс, "
+            f"p99 {timings['p99_ms']} мс ({timings['count']} запусков)"
+        )
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                for table in ("task", "link"):
+                    cursor.execute(
+                        "SELECT pg_size_pretty(pg_indexes_size(%s))",
+                        [f"{prefix}_{table}"],
+                    )
+                    self.stdout.write(f"Индексы {table}: {cursor.fetchone()[0]}")
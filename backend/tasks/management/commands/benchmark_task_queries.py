@@ -0,0 +1,142 @@
+import datetime
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from tasks.benchmarking import measure
+from tasks.models import Task
+
+User = get_user_model()
+
+BENCHMARK_USERNAME = "benchmark_user"
+
+# Индексы задачи до появления составного и частичного (миграция 0001)
+BASELINE_INDEXES = [
+    models.Index(fields=["telegram_user_id"], name="bench_task_tg_idx"),
+    models.Index(fields=["is_completed"], name="bench_task_completed_idx"),
+]
+QUERY_SHAPE_INDEXES = ["task_user_tg_created_idx", "task_pending_notify_idx"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark tasks and show EXPLAIN plans and timings of the hot "
+        "task queries with the current indexes and, with --compare, with the "
+        "previous single-column indexes (PostgreSQL)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--telegram-users", type=int, default=10_000)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also measure with the old indexes (inside a rolled back transaction)",
+        )
+        parser.add_argument(
+            "--keep", action="store_true", help="Do not delete the seeded rows"
+        )
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username=BENCHMARK_USERNAME)
+
+        existing = Task.objects.filter(user=user).count()
+        if existing < options["rows"]:
+            self.seed(user, options["rows"] - existing, options)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Task._meta.db_table}")
+
+        telegram_user_id = random.randint(1, options["telegram_users"])
+        queries = {
+            "due_scan": lambda: Task.objects.filter(
+                due_date__lte=timezone.now(),
+                is_completed=False,
+                notification_sent=False,
+                telegram_user_id__isnull=False,
+            ).order_by("due_date", "id")[:200],
+            "user_list": lambda: Task.objects.filter(
+                user=user, telegram_user_id=telegram_user_id
+            ).order_by("-created_at", "id")[:20],
+        }
+
+        self.stdout.write(self.style.MIGRATE_HEADING("Текущие индексы"))
+        self.run_queries(queries, options["repeat"])
+
+        if options["compare"] and connection.vendor != "postgresql":
+            self.stderr.write("--compare требует PostgreSQL (транзакционный DDL)")
+        elif options["compare"]:
+            self.stdout.write(self.style.MIGRATE_HEADING("Прежние индексы"))
+            with transaction.atomic():
+                with connection.schema_editor(atomic=False) as editor:
+                    for index in Task._meta.indexes:
+                        if index.name in QUERY_SHAPE_INDEXES:
+                            editor.remove_index(Task, index)
+                    for index in BASELINE_INDEXES:
+                        editor.add_index(Task, index)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {Task._meta.db_table}")
+
+                self.run_queries(queries, options["repeat"])
+                transaction.set_rollback(True)
+
+        if not options["keep"]:
+            # Без ORM: сигналы post_delete на миллионе строк не нужны
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {Task._meta.db_table} WHERE user_id = %s", [user.pk]
+                )
+            self.stdout.write("Тестовые задачи удалены")
+
+    def seed(self, user, count: int, options) -> None:
+        self.stdout.write(f"Создание {count} задач...")
+        now = timezone.now()
+        batch = []
+
+        # Иначе auto_now_add перезапишет created_at при bulk_create
+        created_at_field = Task._meta.get_field("created_at")
+        created_at_field.auto_now_add = False
+        try:
+            for number in range(count):
+                created_at = now - datetime.timedelta(
+                    minutes=random.randint(0, 525_600)
+                )
+                is_completed = random.random() < 0.6
+                batch.append(
+                    Task(
+                        title=f"Benchmark task {number}",
+                        user=user,
+                        telegram_user_id=random.randint(1, options["telegram_users"]),
+                        created_at=created_at,
+                        due_date=created_at
+                        + datetime.timedelta(days=random.randint(0, 30)),
+                        is_completed=is_completed,
+                        notification_sent=not is_completed and random.random() < 0.95,
+                    )
+                )
+                if len(batch) >= options["batch_size"]:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+            if batch:
+                Task.objects.bulk_create(batch)
+        finally:
+            created_at_field.auto_now_add = True
+
+    def run_queries(self, queries: dict, repeat: int) -> None:
+        for name, build in queries.items():
+            self.stdout.write(self.style.SUCCESS(f"\n{name}"))
+            if connection.vendor == "postgresql":
+                plan = build().explain(analyze=True, buffers=True)
+            else:
+                plan = build().explain()
+            self.stdout.write(plan)
+            timings = measure(lambda: list(build()), repeat)
+            self.stdout.write(
+                f"p50 {timings['p50_ms']} мс, p99 {timings['p99_ms']} мс, "
+                f"среднее {timings['mean_ms']} мс ({timings['count']} запусков)"
+            )
@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarking import summarize
+
+# Запросы бота: список, статистика и детали задачи (sync DRF и async-варианты)
+DEFAULT_PATHS = [
+    "/api/tasks/?telegram_user_id={telegram_user_id}",
+    "/api/tasks/stats/?telegram_user_id={telegram_user_id}",
+    "/api/async/tasks/stats/?telegram_user_id={telegram_user_id}",
+    "/api/tasks/{task_id}/?telegram_user_id={telegram_user_id}",
+    "/api/async/tasks/{task_id}/?telegram_user_id={telegram_user_id}",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the running API with concurrent bot requests and report "
+        "throughput and p50/p99 latency per endpoint"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            action="append",
+            dest="urls",
+            help="Base URL of a running server; repeat to compare servers "
+            "(e.g. runserver vs gunicorn+uvicorn)",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path template with {telegram_user_id} and {task_id}; "
+            'prefix with "POST " to send a notification payload',
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--telegram-user-id", type=int, default=1)
+
+    def handle(self, *args, **options):
+        urls = options["urls"] or ["http://localhost:8000"]
+        paths = options["paths"] or DEFAULT_PATHS
+
+        for base_url in urls:
+            self.stdout.write(self.style.MIGRATE_HEADING(base_url))
+            results = asyncio.run(self.run_server(base_url, paths, options))
+            for path, report in results:
+                self.stdout.write(
+                    f"{path}\n  {report['rps']:.1f} запр./с, p50 {report['p50_ms']} мс, "
+                    f"p99 {report['p99_ms']} мс, ошибок {report['errors']}"
+                )
+
+    async def run_server(self, base_url: str, paths: list, options) -> list:
+        limits = httpx.Limits(
+            max_connections=options["concurrency"],
+            max_keepalive_connections=options["concurrency"],
+        )
+        async with httpx.AsyncClient(
+            base_url=base_url, limits=limits, timeout=30
+        ) as client:
+            headers, task_id = await self.prepare(client, options)
+
+            results = []
+            for template in paths:
+                path = template.format(
+                    telegram_user_id=options["telegram_user_id"], task_id=task_id
+                )
+                report = await self.run_path(client, path, headers, options)
+                results.append((path, report))
+            return results
+
+    async def prepare(self, client: httpx.AsyncClient, options):
+        """JWT бота и ID существующей задачи для запросов деталей"""
+        response = await client.get("/api/bot/token/")
+        if response.status_code != 200:
+            raise CommandError(f"Не удалось получить токен: {response.status_code}")
+        headers = {"Authorization": f"Bearer {response.json()['access']}"}
+
+        response = await client.post(
+            "/api/tasks/",
+            json={
+                "title": "Load test",
+                "telegram_user_id": options["telegram_user_id"],
+            },
+            headers=headers,
+        )
+        if response.status_code != 201:
+            raise CommandError(f"Не удалось создать задачу: {response.status_code}")
+        return headers, response.json()["id"]
+
+    async def run_path(self, client, path: str, headers: dict, options) -> dict:
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        durations, errors = [], 0
+
+        method, _, url = path.rpartition(" ")
+        payload = None
+        if method == "POST":
+            payload = {
+                "telegram_id": options["telegram_user_id"],
+                "message": "Load test",
+            }
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(
+                        method or "GET", url, json=payload, headers=headers
+                    )
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options["requests"])))
+        elapsed = time.perf_counter() - started
+
+        return {
+            **summarize(durations),
+            "rps": options["requests"] / elapsed,
+            "errors": errors,
+        }
@@ -0,0 +1,328 @@
+import json
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from tasks.benchmarking import (
+    StubBotServer,
+    compare_with_baseline,
+    median_report,
+    run_concurrent,
+)
+from tasks.factories import seed_due_tasks, seed_users
+from tasks.services import BotJWTService, override_notification_transport
+from tasks.services.notification_transport import build_notification_transport
+from tasks.tasks import send_due_task_notifications
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def scenario_request(name: str, user, rng: random.Random, label: str):
+    """(метод, путь, тело) запроса сценария к пользователю user
+
+    label делает уникальными названия создаваемых задач и категорий.
+    """
+    tg = user.telegram_user_id
+    if name == "task-list":
+        return "GET", f"/api/tasks/?telegram_user_id={tg}", None
+    if name == "task-detail":
+        task_id = rng.choice(user.task_ids)
+        return "GET", f"/api/tasks/{task_id}/?telegram_user_id={tg}", None
+    if name == "task-create":
+        payload = {
+            "telegram_user_id": tg,
+            "title": f"Benchmark {label}",
+            "category_ids": [rng.choice(user.category_ids)],
+        }
+        return "POST", "/api/tasks/", payload
+    if name == "category-list":
+        return "GET", f"/api/categories/?telegram_user_id={tg}", None
+    if name == "category-detail":
+        category_id = rng.choice(user.category_ids)
+        return "GET", f"/api/categories/{category_id}/?telegram_user_id={tg}", None
+    if name == "category-create":
+        payload = {"telegram_user_id": tg, "name": f"Benchmark {tg}-{label}"}
+        return "POST", "/api/categories/", payload
+    raise ValueError(name)
+
+
+SCENARIOS = [
+    "task-list",
+    "task-detail",
+    "task-create",
+    "category-list",
+    "category-detail",
+    "category-create",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Reproducible end-to-end benchmark on a throwaway test database: seed "
+        "users, categories and tasks, drive the task and category list, detail "
+        "and create endpoints with concurrent clients, run "
+        "send_due_task_notifications against a local bot stub, and compare "
+        "throughput, p50/p99 latency and query counts with a saved baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=5)
+        parser.add_argument("--tasks", type=int, default=40)
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--notifications", type=int, default=1000)
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=50,
+            help="Unmeasured requests per scenario before the measured runs",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Measured rounds over all scenarios; the report takes the "
+            "median of each scenario's rounds",
+        )
+        parser.add_argument(
+            "--stub-latency-ms",
+            type=float,
+            default=5.0,
+            help="Response delay of the bot stub per request",
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            dest="scenarios",
+            choices=SCENARIOS,
+            help="Run only these API scenarios (repeatable)",
+        )
+        parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Write the results as the new baseline instead of comparing",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative p50/throughput regression (0.5 = 50%%)",
+        )
+        parser.add_argument(
+            "--p99-tolerance",
+            type=float,
+            default=1.0,
+            help="Allowed relative p99 regression; the tail of a few hundred "
+            "requests is far noisier than the median",
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            key: options[key]
+            for key in (
+                "users",
+                "categories",
+                "tasks",
+                "requests",
+                "concurrency",
+                "notifications",
+                "warmup",
+                "repeat",
+                "stub_latency_ms",
+                "seed",
+            )
+        }
+
+        if connection.vendor == "sqlite" and options["concurrency"] > 1:
+            self.stdout.write(
+                self.style.WARNING(
+                    "SQLite блокирует таблицы при параллельной записи: "
+                    "сценарии создания дадут ошибки, запускайте на PostgreSQL"
+                )
+            )
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Кеши не истекают посреди замера, иначе число SQL-запросов
+            # зависело бы от длительности прогона
+            with override_settings(
+                CACHES=BENCHMARK_CACHES,
+                AUTH_USER_CACHE_TIMEOUT=None,
+                LIST_CACHE_TIMEOUT=None,
+                DEBUG=False,
+            ):
+                results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results)
+
+        baseline_path = Path(options["baseline"])
+        if options["save_baseline"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(
+                json.dumps({"params": params, "results": results}, indent=2)
+            )
+            self.stdout.write(self.style.SUCCESS(f"Baseline сохранен: {baseline_path}"))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(f"Baseline {baseline_path} не найден, сравнения нет")
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        if baseline["params"] != params:
+            raise CommandError(
+                f"Baseline снят с другими параметрами: {baseline['params']}"
+            )
+        regressions = compare_with_baseline(
+            results,
+            baseline["results"],
+            options["tolerance"],
+            options["p99_tolerance"],
+        )
+        if regressions:
+            raise CommandError("Регрессии:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("Регрессий относительно baseline нет"))
+
+    def run(self, options) -> dict:
+        bot_user = BotJWTService.get_bot_user()
+        users = seed_users(
+            bot_user,
+            options["users"],
+            options["categories"],
+            options["tasks"],
+            seed=options["seed"],
+        )
+        perform = self.performer(BotJWTService.create_bot_tokens()["access"])
+        scenarios = options["scenarios"] or SCENARIOS
+
+        # Прогрев: первые запросы (соединения с БД, кеши) в замер не попадают
+        for name in scenarios:
+            warmup = self.plan(name, users, "warmup", options["warmup"], options)
+            run_concurrent(warmup, options["concurrency"], perform)
+
+        # Повторы идут кругами по всем сценариям: кратковременное замедление
+        # машины портит один повтор нескольких сценариев, а не все повторы
+        # одного, и медиана его отбрасывает
+        rounds = []
+        for run in range(options["repeat"]):
+            rounds.append(
+                {
+                    name: run_concurrent(
+                        self.plan(name, users, run, options["requests"], options),
+                        options["concurrency"],
+                        perform,
+                    )
+                    for name in scenarios
+                }
+            )
+            rounds[-1]["notifications"] = self.run_notifications(
+                bot_user, users, options
+            )
+            self.stdout.write(f"Повтор {run + 1} из {options['repeat']}: готово")
+
+        return {
+            name: median_report([report[name] for report in rounds])
+            for name in rounds[0]
+        }
+
+    @staticmethod
+    def performer(access: str):
+        """Выполнение запроса сценария: (успех, число SQL-запросов)"""
+        local = threading.local()
+
+        def perform(request) -> tuple:
+            method, path, payload = request
+            client = getattr(local, "client", None)
+            if client is None:
+                client = local.client = Client(HTTP_AUTHORIZATION=f"Bearer {access}")
+            with CaptureQueriesContext(connection) as queries:
+                if method == "GET":
+                    response = client.get(path)
+                else:
+                    response = client.post(
+                        path, payload, content_type="application/json"
+                    )
+            return response.status_code < 400, len(queries)
+
+        return perform
+
+    @staticmethod
+    def plan(name: str, users: list, run, count: int, options) -> list:
+        """Запросы прогона run; при одном seed план одинаков"""
+        rng = random.Random(f"{options['seed']}:{name}:{run}")
+        return [
+            scenario_request(name, rng.choice(users), rng, f"{run}-{number}")
+            for number in range(count)
+        ]
+
+    def run_notifications(self, bot_user, users: list, options) -> dict:
+        seed_due_tasks(
+            bot_user,
+            [user.telegram_user_id for user in users],
+            options["notifications"],
+        )
+
+        with StubBotServer(latency=options["stub_latency_ms"] / 1000) as stub:
+            with override_settings(
+                BOT_API_URL=f"{stub.url}/send_message",
+                BOT_BULK_API_URL=f"{stub.url}/send_messages",
+            ):
+                transport = build_notification_transport("http")
+            try:
+                with override_notification_transport(transport):
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        stats = send_due_task_notifications()
+                        elapsed = time.perf_counter() - started
+            finally:
+                transport.close()
+
+        return {
+            "sent": stats["sent"],
+            "failed": stats["failed"],
+            "delivered": stub.received,
+            "duration_ms": round(elapsed * 1000, 1),
+            "throughput": round(stats["sent"] / elapsed, 1) if elapsed else 0.0,
+            "queries": len(queries),
+        }
+
+    def report(self, results: dict) -> None:
+        self.stdout.write(self.style.MIGRATE_HEADING("\nAPI"))
+        for name, report in results.items():
+            if name == "notifications":
+                continue
+            self.stdout.write(
+                f"{name}: {report['rps']} запр./с, p50 {report['p50_ms']} мс, "
+                f"p99 {report['p99_ms']} мс, SQL до {report['queries_max']}, "
+                f"ошибок {report['errors']}"
+            )
+
+        report = results["notifications"]
+        self.stdout.write(self.style.MIGRATE_HEADING("Рассылка уведомлений"))
+        self.stdout.write(
+            f"отправлено {report['sent']}, ошибок {report['failed']}, "
+            f"{report['duration_ms']} мс ({report['throughput']} уведомл./с), "
+            f"SQL {report['queries']}"
+        )
@@ -0,0 +1,188 @@
+"""Метрики Prometheus: HTTP API, запросы к БД, задачи Celery и рассылка
+
+При нескольких процессах (воркеры gunicorn, prefork Celery) метрики
+собираются через PROMETHEUS_MULTIPROC_DIR.
+"""
+
+import contextvars
+import logging
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_failure, task_postrun, task_prerun, worker_ready
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+logger = logging.getLogger(__name__)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "view", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число SQL-запросов на HTTP-запрос",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL-запроса",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Время выполнения задачи Celery",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+CELERY_TASK_FAILURES = Counter(
+    "celery_task_failures_total", "Задачи Celery, завершившиеся ошибкой", ["task"]
+)
+NOTIFICATIONS_SENT = Counter(
+    "notifications_sent_total", "Отправленные уведомления о задачах"
+)
+NOTIFICATIONS_FAILED = Counter(
+    "notifications_failed_total", "Неотправленные уведомления о задачах"
+)
+NOTIFICATION_BACKLOG = Gauge(
+    "notification_backlog",
+    "Просроченных задач без уведомления в начале последней рассылки",
+    multiprocess_mode="mostrecent",
+)
+
+# Число SQL-запросов текущего HTTP-запроса (изменяемый список из одного числа)
+_request_queries = contextvars.ContextVar("request_queries", default=None)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_DURATION.observe(time.perf_counter() - started)
+        counter = _request_queries.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Таймер на каждом соединении с БД (соединение из пула - один раз)"""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+class MetricsMiddleware:
+    """Время ответа и число SQL-запросов по представлению (view_name)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        counter = [0]
+        reset_token = _request_queries.set(counter)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(reset_token)
+        self._observe(request, response, started, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        # Запросы ORM из sync_to_async видят тот же счетчик через контекст
+        counter = [0]
+        reset_token = _request_queries.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(reset_token)
+        self._observe(request, response, started, counter[0])
+        return response
+
+    @staticmethod
+    def _observe(request, response, started, queries: int) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        HTTP_REQUEST_DURATION.labels(
+            request.method, view, response.status_code
+        ).observe(time.perf_counter() - started)
+        HTTP_REQUEST_DB_QUERIES.labels(view).observe(queries)
+
+
+def metrics_registry():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view(request):
+    """Метрики в текстовом формате Prometheus"""
+    return HttpResponse(
+        generate_latest(metrics_registry()), content_type=CONTENT_TYPE_LATEST
+    )
+
+
+def observe_notification_run(stats) -> None:
+    """Итоги прогона send_due_task_notifications"""
+    NOTIFICATION_BACKLOG.set(stats.found)
+    NOTIFICATIONS_SENT.inc(stats.sent)
+    NOTIFICATIONS_FAILED.inc(stats.failed)
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
+
+
+@task_failure.connect
+def _on_task_failure(sender=None, **kwargs):
+    CELERY_TASK_FAILURES.labels(sender.name).inc()
+
+
+@worker_ready.connect
+def _start_worker_metrics_server(**kwargs):
+    """HTTP /metrics воркера Celery на CELERY_METRICS_PORT"""
+    port = os.environ.get("CELERY_METRICS_PORT")
+    if port:
+        start_http_server(int(port), registry=metrics_registry())
+        logger.info(f"Метрики Celery доступны на порту {port}")
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["user", "telegram_user_id", "-created_at", "id"],
+                name="category_user_tg_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "telegram_user_id", "-created_at", "id"],
+                name="task_user_tg_created_idx",
+            ),
+        ),
+    ]
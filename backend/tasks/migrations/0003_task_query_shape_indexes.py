@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0002_cursor_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="task",
+            name="tasks_task_telegra_151b35_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="task",
+            name="tasks_task_is_comp_30fbc3_idx",
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(
+                    ("is_completed", False),
+                    ("notification_sent", False),
+                    ("telegram_user_id__isnull", False),
+                ),
+                fields=["due_date", "id"],
+                name="task_pending_notify_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0003_task_query_shape_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="notification_claimed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Уведомление захвачено"
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:04
+
+import tasks.ids
+from django.db import migrations
+from django.db.models import Case, Value, When
+
+BATCH_SIZE = 500
+
+
+def build_id_map(model) -> dict:
+    """Старый строковый ID -> числовой, упорядоченный по created_at"""
+    id_map = {}
+    last_ms, sequence = None, 0
+    for old_id, created_at in model.objects.order_by("created_at", "id").values_list(
+        "id", "created_at"
+    ):
+        created_ms = int(created_at.timestamp() * 1000)
+        # Не раньше предыдущей строки и эпохи ID, счетчик в пределах миллисекунды
+        created_ms = max(created_ms, last_ms or 0, tasks.ids.ID_EPOCH_MS)
+        if created_ms == last_ms:
+            sequence += 1
+            if sequence > tasks.ids.MAX_SEQUENCE:
+                created_ms, sequence = created_ms + 1, 0
+        else:
+            sequence = 0
+        last_ms = created_ms
+        id_map[old_id] = str(tasks.ids.compose_id(created_ms, 0, sequence))
+    return id_map
+
+
+def rewrite_column(queryset, column: str, id_map: dict) -> None:
+    """UPDATE ... SET column = CASE ... пачками по BATCH_SIZE строк"""
+    old_ids = list(id_map)
+    for start in range(0, len(old_ids), BATCH_SIZE):
+        batch = old_ids[start : start + BATCH_SIZE]
+        queryset.filter(**{f"{column}__in": batch}).update(
+            **{
+                column: Case(
+                    *(When(**{column: old}, then=Value(id_map[old])) for old in batch)
+                )
+            }
+        )
+
+
+def rekey_rows(apps, schema_editor):
+    """Перевод существующих строк на числовые ID (еще в строковых колонках)
+
+    Ключи связей M2M переписываются в той же транзакции: внешние ключи
+    Django создает отложенными, проверка пройдет при COMMIT. Типы колонок
+    меняет отдельная миграция 0006: PostgreSQL не выполняет ALTER TABLE,
+    пока в транзакции есть отложенные проверки внешних ключей.
+    """
+    Category = apps.get_model("tasks", "Category")
+    Task = apps.get_model("tasks", "Task")
+    TaskCategory = Task.categories.through
+
+    category_map = build_id_map(Category)
+    task_map = build_id_map(Task)
+
+    rewrite_column(TaskCategory.objects.all(), "category_id", category_map)
+    rewrite_column(TaskCategory.objects.all(), "task_id", task_map)
+    rewrite_column(Category.objects.all(), "id", category_map)
+    rewrite_column(Task.objects.all(), "id", task_map)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0004_task_notification_claimed_at"),
+    ]
+
+    operations = [
+        # Обратно числовые строки остаются валидными строковыми ID
+        migrations.RunPython(rekey_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:12
+
+import tasks.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tasks", "0005_snowflake_ids"),
+    ]
+
+    # Отдельно от 0005: к ALTER TABLE отложенные проверки FK уже выполнены
+    operations = [
+        migrations.AlterField(
+            model_name="category",
+            name="id",
+            field=models.BigIntegerField(
+                default=tasks.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="id",
+            field=models.BigIntegerField(
+                default=tasks.ids.generate_id,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -1,22 +1,13 @@
-import datetime
-import hashlib
-
 from django.conf import settings
 from django.db import models
 
-
-def generate_id(prefix: str, *args) -> str:
-    """Генерация уникального ID на основе префикса и аргументов"""
-    date_part = datetime.date.today().strftime("%Y%m%d")
-    base = "_".join(map(str, args))
-    hash_part = hashlib.sha1(base.encode()).hexdigest()[:6]
-    return f"{prefix}_{date_part}_{hash_part}"
+from .ids import generate_id
 
 
 class Category(models.Model):
     """Модель категории задач"""
 
-    id = models.CharField(primary_key=True, max_length=30, editable=False)
+    id = models.BigIntegerField(primary_key=True, default=generate_id, editable=False)
     name = models.CharField(max_length=100, verbose_name="Название категории")
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -29,12 +20,6 @@ class Category(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
 
-    def save(self, *args, **kwargs):
-        """Сохранение категории с генерацией ID"""
-        if not self.id:
-            self.id = generate_id("cat", self.telegram_user_id, self.name)
-        super().save(*args, **kwargs)
-
     class Meta:
         verbose_name = "Категория"
         unique_together = ["name", "user"]
@@ -42,6 +27,11 @@ class Category(models.Model):
             models.Index(fields=["user"]),
             models.Index(fields=["telegram_user_id"]),
             models.Index(fields=["created_at"]),
+            # Курсорная пагинация списка категорий Telegram пользователя
+            models.Index(
+                fields=["user", "telegram_user_id", "-created_at", "id"],
+                name="category_user_tg_created_idx",
+            ),
         ]
 
     def __str__(self):
@@ -51,7 +41,7 @@ class Category(models.Model):
 class Task(models.Model):
     """Модель задачи"""
 
-    id = models.CharField(primary_key=True, max_length=30, editable=False)
+    id = models.BigIntegerField(primary_key=True, default=generate_id, editable=False)
     title = models.CharField(max_length=200, verbose_name="Заголовок задачи")
     description = models.TextField(
         blank=True, null=True, verbose_name="Описание задачи"
@@ -74,25 +64,33 @@ class Task(models.Model):
     notification_sent = models.BooleanField(
         default=False, verbose_name="Уведомление отправлено"
     )
+    # Аренда на отправку уведомления: метка захвата воркером, истекает
+    # через NOTIFICATION_CLAIM_LEASE секунд, если воркер упал
+    notification_claimed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Уведомление захвачено"
+    )
     telegram_user_id = models.BigIntegerField(null=True, blank=True)
 
-    def save(self, *args, **kwargs):
-        """Сохранение задачи с генерацией ID"""
-        if not self.id:
-            # включаем timestamp, чтобы ID не повторялись, если названия одинаковые
-            timestamp = self.created_at or datetime.datetime.now()
-            self.id = generate_id(
-                "task", self.telegram_user_id, self.title, timestamp.isoformat()
-            )
-        super().save(*args, **kwargs)
-
     class Meta:
         verbose_name = "Задача"
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["telegram_user_id"]),
-            models.Index(fields=["is_completed"]),
             models.Index(fields=["due_date"]),
+            # Курсорная пагинация списка задач Telegram пользователя
+            models.Index(
+                fields=["user", "telegram_user_id", "-created_at", "id"],
+                name="task_user_tg_created_idx",
+            ),
+            # Частичный индекс очереди уведомлений: только ожидающие задачи
+            models.Index(
+                fields=["due_date", "id"],
+                name="task_pending_notify_idx",
+                condition=models.Q(
+                    is_completed=False,
+                    notification_sent=False,
+                    telegram_user_id__isnull=False,
+                ),
+            ),
         ]
 
     def __str__(self):
@@ -0,0 +1,10 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Keyset-пагинация по (-created_at, id) без COUNT(*) и OFFSET"""
+
+    ordering = ("-created_at", "id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
@@ -0,0 +1,226 @@
+"""Профилирование SQL по HTTP-запросам (включается SQL_PROFILING)
+
+Для каждого запроса считаются SQL-запросы, суммарное время в БД и
+повторы: запросы с одинаковым отпечатком (SQL без параметров, списки
+IN (...) схлопнуты) - типичный признак N+1. Итоги отдаются заголовками
+X-DB-* и/или пишутся в лог для доли запросов. Медленные запросы вместе
+со списком SQL и местом вызова в коде проекта попадают в кольцевой буфер
+процесса, который читает администратор через /api/debug/sql-profiles/.
+Параметры запросов не сохраняются: в них пароли, токены и данные
+пользователей. Запросы к самому /api/debug/sql-profiles/ не профилируются.
+"""
+
+import contextvars
+import itertools
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# Файлы проекта; сторонние пакеты в стек вызова не попадают
+_PROJECT_ROOT = str(settings.BASE_DIR) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def sql_fingerprint(sql: str) -> str:
+    """SQL без параметров: IN (%s, %s, ...) с любым числом элементов - один отпечаток"""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", sql.strip()))
+
+
+def project_stack(limit: int = 8) -> list:
+    """Кадры кода проекта в стеке вызова, от ближнего к дальнему"""
+    frames = []
+    frame = sys._getframe(1)
+    while frame is not None and len(frames) < limit:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(_PROJECT_ROOT)
+            and filename != _THIS_FILE
+            and "site-packages" not in filename
+        ):
+            frames.append(
+                f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_lineno} "
+                f"{frame.f_code.co_name}"
+            )
+        frame = frame.f_back
+    return frames
+
+
+@dataclass
+class RequestProfile:
+    """SQL-запросы одного HTTP-запроса"""
+
+    capture_stacks: bool
+    queries: list = field(default_factory=list)
+    db_time: float = 0.0
+
+    def add(self, sql: str, duration: float) -> None:
+        self.db_time += duration
+        self.queries.append(
+            {
+                "sql": sql,
+                "duration_ms": round(duration * 1000, 3),
+                "stack": project_stack() if self.capture_stacks else [],
+            }
+        )
+
+    def duplicates(self) -> dict:
+        """Отпечаток -> число выполнений для повторяющихся запросов"""
+        counts = Counter(sql_fingerprint(query["sql"]) for query in self.queries)
+        return {sql: count for sql, count in counts.most_common() if count > 1}
+
+
+_request_profile = contextvars.ContextVar("request_profile", default=None)
+
+_slow_requests = deque(maxlen=settings.SQL_PROFILING_BUFFER_SIZE)
+_slow_requests_lock = threading.Lock()
+_slow_request_ids = itertools.count(1)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    profile = _request_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add(sql, time.perf_counter() - started)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    """Обертка на каждом соединении; без активного профиля она ничего не делает"""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def slow_requests() -> list:
+    """Медленные запросы из буфера процесса, последние первыми"""
+    with _slow_requests_lock:
+        return list(reversed(_slow_requests))
+
+
+def clear_slow_requests() -> None:
+    with _slow_requests_lock:
+        _slow_requests.clear()
+
+
+class SQLProfilingMiddleware:
+    """Число SQL-запросов, время в БД и повторы по каждому HTTP-запросу"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._excluded_path = None
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_excluded(self, request) -> bool:
+        """Чтение буфера не профилируется, иначе опрос эндпоинта его заполняет"""
+        if self._excluded_path is None:
+            self._excluded_path = reverse("sql-profiles")
+        return request.path == self._excluded_path
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.is_excluded(request):
+            return self.get_response(request)
+
+        profile = RequestProfile(capture_stacks=settings.SQL_PROFILING_CAPTURE_STACKS)
+        reset_token = _request_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_profile.reset(reset_token)
+        self._finish(request, response, profile, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        if self.is_excluded(request):
+            return await self.get_response(request)
+
+        # Запросы ORM из sync_to_async пишут в тот же профиль через контекст
+        profile = RequestProfile(capture_stacks=settings.SQL_PROFILING_CAPTURE_STACKS)
+        reset_token = _request_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_profile.reset(reset_token)
+        self._finish(request, response, profile, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _finish(request, response, profile: RequestProfile, elapsed: float) -> None:
+        duplicates = profile.duplicates()
+        repeated = sum(count - 1 for count in duplicates.values())
+        db_time_ms = round(profile.db_time * 1000, 1)
+        duration_ms = round(elapsed * 1000, 1)
+
+        if settings.SQL_PROFILING_HEADERS:
+            response["X-DB-Query-Count"] = str(len(profile.queries))
+            response["X-DB-Time-Ms"] = str(db_time_ms)
+            response["X-DB-Duplicate-Queries"] = str(repeated)
+
+        if random.random() < settings.SQL_PROFILING_LOG_SAMPLE_RATE:
+            logger.info(
+                f"{request.method} {request.path} {response.status_code}: "
+                f"{duration_ms} мс, SQL {len(profile.queries)} ({db_time_ms} мс), "
+                f"повторов {repeated}"
+                + "".join(
+                    f"\n  {count}x {sql[:200]}" for sql, count in duplicates.items()
+                )
+            )
+
+        if duration_ms < settings.SQL_PROFILING_SLOW_MS:
+            return
+
+        match = request.resolver_match
+        entry = {
+            "id": next(_slow_request_ids),
+            "time": timezone.now().isoformat(),
+            "method": request.method,
+            # Без строки запроса: в ней telegram_user_id, фильтры и курсоры
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": duration_ms,
+            "db_time_ms": db_time_ms,
+            "query_count": len(profile.queries),
+            "duplicates": [
+                {"sql": sql, "count": count} for sql, count in duplicates.items()
+            ],
+            "queries": profile.queries,
+        }
+        with _slow_requests_lock:
+            _slow_requests.append(entry)
+        logger.warning(
+            f"Медленный запрос {request.method} {request.path}: {duration_ms} мс, "
+            f"SQL {len(profile.queries)} ({db_time_ms} мс)"
+        )
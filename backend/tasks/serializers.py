@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 from .models import BotProfile, Category, Task
@@ -6,6 +7,10 @@ from .models import BotProfile, Category, Task
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категорий"""
 
+    # 64-битный ID отдается строкой: так его не округлят JSON-клиенты,
+    # а бот по-прежнему работает со строковыми ID
+    id = serializers.CharField(read_only=True)
+
     class Meta:
         model = Category
         fields = ["id", "name", "created_at", "telegram_user_id"]
@@ -22,9 +27,10 @@ class CategorySerializer(serializers.ModelSerializer):
 class TaskSerializer(serializers.ModelSerializer):
     """Сериализатор для задач"""
 
+    id = serializers.CharField(read_only=True)
     categories = CategorySerializer(many=True, read_only=True)
     category_ids = serializers.ListField(
-        child=serializers.CharField(), write_only=True, required=False
+        child=serializers.IntegerField(), write_only=True, required=False
     )
 
     class Meta:
@@ -62,6 +68,10 @@ class TaskSerializer(serializers.ModelSerializer):
         category_ids = validated_data.pop("category_ids", None)
         telegram_user_id = validated_data.pop("telegram_user_id", None)
 
+        # Новый срок - новое напоминание
+        if validated_data.get("due_date", instance.due_date) != instance.due_date:
+            instance.notification_sent = False
+
         # Обновляем основные поля
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -82,6 +92,31 @@ class TaskSerializer(serializers.ModelSerializer):
         return instance
 
 
+class BulkTaskIdsSerializer(serializers.Serializer):
+    """Список ID задач для пакетной операции"""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=settings.TASK_BULK_MAX_ITEMS,
+    )
+
+
+class BulkCompleteSerializer(BulkTaskIdsSerializer):
+    """Пакетная смена статуса выполнения"""
+
+    is_completed = serializers.BooleanField(default=True)
+
+
+class BulkCategorizeSerializer(BulkTaskIdsSerializer):
+    """Пакетное изменение категорий задач"""
+
+    category_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=True
+    )
+    mode = serializers.ChoiceField(choices=["add", "set", "remove"], default="add")
+
+
 class BotProfileSerializer(serializers.ModelSerializer):
     """Сериализатор для профиля бота"""
 
@@ -1,3 +1,17 @@
 from .jwt_service import BotJWTService
+from .notification_transport import (
+    HTTPBotTransport,
+    NotificationTransport,
+    RedisStreamTransport,
+    get_notification_transport,
+    override_notification_transport,
+)
 
-__all__ = ["BotJWTService"]
+__all__ = [
+    "BotJWTService",
+    "HTTPBotTransport",
+    "NotificationTransport",
+    "RedisStreamTransport",
+    "get_notification_transport",
+    "override_notification_transport",
+]
@@ -0,0 +1,156 @@
+import contextlib
+import logging
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationTransport:
+    """Базовый транспорт доставки уведомлений в бота"""
+
+    def send(self, telegram_id: int, message: str) -> bool:
+        """Отправка одного уведомления, ошибки транспорта пробрасываются наружу"""
+        raise NotImplementedError
+
+    def send_many(self, notifications: list) -> list:
+        """Отправка пакета пар (telegram_id, message), результат по каждой"""
+        return [
+            self.send(telegram_id, message) for telegram_id, message in notifications
+        ]
+
+    def close(self) -> None:
+        """Освобождение ресурсов транспорта"""
+
+
+class HTTPBotTransport(NotificationTransport):
+    """Прямые запросы в Notification API бота через пул keep-alive соединений"""
+
+    def __init__(self, url: str, bulk_url: str, timeout: float, pool_size: int):
+        self.url = url
+        self.bulk_url = bulk_url
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, telegram_id: int, message: str) -> bool:
+        response = self.session.post(
+            self.url,
+            json={"telegram_id": int(telegram_id), "message": message},
+            timeout=self.timeout,
+        )
+        # 200: бот отправил сообщение, Telegram его принял
+        return response.status_code == 200
+
+    def send_many(self, notifications: list) -> list:
+        response = self.session.post(
+            self.bulk_url,
+            json=[
+                {"telegram_id": int(telegram_id), "message": message}
+                for telegram_id, message in notifications
+            ],
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            logger.error(f"Ошибка пакетной отправки в Bot API: {response.status_code}")
+            return [False] * len(notifications)
+
+        statuses = {
+            item["index"]: item["status"] for item in response.json()["results"]
+        }
+        return [statuses.get(index) == "sent" for index in range(len(notifications))]
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class RedisStreamTransport(NotificationTransport):
+    """Публикация уведомлений в Redis Stream, который читает бот"""
+
+    def __init__(self, redis_url: str, stream: str, maxlen: int):
+        import redis
+
+        self.stream = stream
+        self.maxlen = maxlen
+        self.client = redis.Redis.from_url(redis_url)
+
+    def send(self, telegram_id: int, message: str) -> bool:
+        self.client.xadd(
+            self.stream,
+            {"telegram_id": int(telegram_id), "message": message},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        return True
+
+    def send_many(self, notifications: list) -> list:
+        with self.client.pipeline(transaction=False) as pipe:
+            for telegram_id, message in notifications:
+                pipe.xadd(
+                    self.stream,
+                    {"telegram_id": int(telegram_id), "message": message},
+                    maxlen=self.maxlen,
+                    approximate=True,
+                )
+            pipe.execute()
+        return [True] * len(notifications)
+
+    def close(self) -> None:
+        self.client.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def build_notification_transport(kind: str = None) -> NotificationTransport:
+    """Создание транспорта по настройке NOTIFICATION_TRANSPORT"""
+    kind = kind or getattr(settings, "NOTIFICATION_TRANSPORT", "http")
+
+    if kind == "http":
+        return HTTPBotTransport(
+            url=getattr(settings, "BOT_API_URL", "http://bot:8001/send_message"),
+            bulk_url=getattr(
+                settings, "BOT_BULK_API_URL", "http://bot:8001/send_messages"
+            ),
+            timeout=getattr(settings, "NOTIFICATION_TIMEOUT", 60),
+            pool_size=getattr(settings, "NOTIFICATION_MAX_WORKERS", 16),
+        )
+    if kind == "redis":
+        return RedisStreamTransport(
+            redis_url=settings.CELERY_BROKER_URL,
+            stream=getattr(settings, "NOTIFICATION_STREAM", "bot:notifications"),
+            maxlen=getattr(settings, "NOTIFICATION_STREAM_MAXLEN", 100000),
+        )
+
+    raise ValueError(f"Неизвестный транспорт уведомлений: {kind}")
+
+
+def get_notification_transport() -> NotificationTransport:
+    """Общий на процесс транспорт уведомлений (создается лениво)"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = build_notification_transport()
+                logger.info(f"Транспорт уведомлений: {_transport.__class__.__name__}")
+    return _transport
+
+
+@contextlib.contextmanager
+def override_notification_transport(transport: NotificationTransport):
+    """Временная подмена транспорта процесса (бенчмарки, заглушка бота)"""
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    try:
+        yield transport
+    finally:
+        with _transport_lock:
+            _transport = previous
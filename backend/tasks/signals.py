@@ -0,0 +1,53 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import user_cache_key
+from .cache import CACHE_ERRORS, bump_generation
+from .models import Category, Task
+from .tasks import schedule_task_reminder
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_lists(sender, instance, **kwargs):
+    """Сброс закешированных списков задач при изменении задачи"""
+    bump_generation("task", instance.user_id, instance.telegram_user_id)
+
+
+@receiver(post_save, sender=Task)
+def schedule_reminder(sender, instance, **kwargs):
+    """Планирование напоминания о задаче после фиксации транзакции"""
+    transaction.on_commit(lambda: schedule_task_reminder(instance))
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_category_lists(sender, instance, **kwargs):
+    """Сброс списков категорий и задач (в них вложены категории)"""
+    bump_generation("category", instance.user_id, instance.telegram_user_id)
+    bump_generation("task", instance.user_id, instance.telegram_user_id)
+
+
+@receiver(m2m_changed, sender=Task.categories.through)
+def invalidate_task_categories(sender, instance, action, **kwargs):
+    """Сброс списков задач при изменении их категорий"""
+    if action.startswith("post_"):
+        bump_generation("task", instance.user_id, instance.telegram_user_id)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сброс пользователя, закешированного для JWT-аутентификации"""
+    key = user_cache_key(getattr(instance, api_settings.USER_ID_FIELD))
+    try:
+        cache.delete(key)
+    except CACHE_ERRORS as e:
+        # Сохранение пользователя не должно падать из-за кеша; запись в кеше
+        # устареет сама через AUTH_USER_CACHE_TIMEOUT
+        logger.error(f"Не удалось сбросить кеш пользователя {key}: {e}")
@@ -1,73 +1,358 @@
+import datetime
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 
 import requests
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch, Q
 from django.utils import timezone
+from kombu.exceptions import OperationalError
 
-from .models import Task
+from .cache import CACHE_ERRORS
+from .metrics import observe_notification_run
+from .models import Category, Task
+from .services import get_notification_transport
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task
-def send_due_task_notifications() -> None:
-    """Фоновая задача для отправки уведомлений о просроченных задачах"""
+@dataclass
+class NotificationRunStats:
+    """Счетчики одного прогона рассылки уведомлений"""
+
+    found: int = 0
+    sent: int = 0
+    failed: int = 0
+    # Итог неизвестен (таймаут ответа бота), аренда не снимается
+    unknown: int = 0
+    chunks: int = 0
+    duration: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Отправленных уведомлений в секунду"""
+        return self.sent / self.duration if self.duration else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "throughput": round(self.throughput, 2)}
+
+
+def pending_notification_tasks():
+    """Задачи, по которым еще ждут напоминания (частичный индекс task_pending_notify_idx)"""
+    return Task.objects.filter(
+        is_completed=False,
+        notification_sent=False,
+        telegram_user_id__isnull=False,
+        due_date__isnull=False,
+    )
+
+
+def unclaimed_notification_tasks(now):
+    """Ожидающие задачи без действующей аренды на отправку"""
+    lease = getattr(settings, "NOTIFICATION_CLAIM_LEASE", 300)
+    expired = now - datetime.timedelta(seconds=lease)
+    return pending_notification_tasks().filter(
+        Q(notification_claimed_at__isnull=True) | Q(notification_claimed_at__lt=expired)
+    )
+
+
+def release_notification_claims(task_ids, claimed_at, sent: bool) -> int:
+    """Снятие аренды: отправленные задачи помечаются, остальные вернутся в очередь
+
+    Фильтр по метке захвата не дает затронуть задачи, чью истекшую
+    аренду уже перехватил другой воркер.
+    """
+    fields = {"notification_claimed_at": None}
+    if sent:
+        fields["notification_sent"] = True
+    return Task.objects.filter(
+        id__in=task_ids, notification_claimed_at=claimed_at
+    ).update(**fields)
+
+
+def schedule_task_reminder(task) -> bool:
+    """Постановка напоминания о задаче в Celery точно на её due_date
+
+    Планируются только сроки в пределах NOTIFICATION_SCHEDULE_HORIZON:
+    дальние ETA брокер Redis переотправил бы по visibility_timeout,
+    их позже подхватит schedule_upcoming_reminders. Отмена не нужна:
+    send_task_reminder сверяет due_date и статус задачи в момент срабатывания.
+    """
+    if task.is_completed or task.notification_sent:
+        return False
+    if task.due_date is None or task.telegram_user_id is None:
+        return False
+
+    horizon = getattr(settings, "NOTIFICATION_SCHEDULE_HORIZON", 900)
+    delay = (task.due_date - timezone.now()).total_seconds()
+    if delay > horizon:
+        return False
+
+    # Одно сообщение в брокере на пару (задача, срок), даже если задачу
+    # сохраняют повторно или её видит несколько проходов планировщика
+    due_iso = task.due_date.isoformat()
+    marker_timeout = int(max(delay, 0)) + 60
     try:
+        if not cache.add(f"reminder:{task.id}:{due_iso}", 1, marker_timeout):
+            return False
+    except CACHE_ERRORS as e:
+        # Без метки возможен лишний вызов в брокере, но не повторная отправка:
+        # send_task_reminder захватывает задачу условным UPDATE
+        logger.warning(f"Кеш недоступен, напоминание {task.id} без метки: {e}")
 
-        now = timezone.now()
+    try:
+        send_task_reminder.apply_async(args=[task.id, due_iso], eta=task.due_date)
+    except OperationalError as e:
+        # Вызывается из on_commit: задача уже сохранена, напоминание позже
+        # поставит schedule_upcoming_reminders или отправит догоняющая рассылка
+        logger.error(f"Брокер недоступен, напоминание {task.id} не поставлено: {e}")
+        return False
+    return True
 
-        due_tasks = (
-            Task.objects.filter(
-                due_date__lte=now, is_completed=False, notification_sent=False,
-                telegram_user_id__isnull=False
-            )
-            .prefetch_related("categories")
+
+@shared_task(ignore_result=True)
+def send_task_reminder(task_id: int, due_iso: str) -> bool:
+    """Отправка напоминания об одной задаче в момент наступления срока"""
+    due_date = datetime.datetime.fromisoformat(due_iso)
+
+    # Условный UPDATE - и проверка актуальности, и захват: срок могли
+    # перенести, задачу выполнить или удалить, а напоминание - уже отправить
+    claimed_at = timezone.now()
+    claimed = (
+        unclaimed_notification_tasks(claimed_at)
+        .filter(id=task_id, due_date=due_date)
+        .update(notification_claimed_at=claimed_at)
+    )
+    if not claimed:
+        return False
+
+    task = (
+        Task.objects.only("id", "title", "due_date", "telegram_user_id")
+        .prefetch_related(
+            Prefetch("categories", queryset=Category.objects.only("id", "name"))
         )
+        .get(id=task_id)
+    )
+    sent = send_telegram_notification(
+        task.telegram_user_id, format_task_notification(task)
+    )
+    if sent is None:
+        # Бот мог отправить сообщение: до конца аренды задачу никто не тронет,
+        # потом ее повторит страховочная рассылка
+        logger.warning(f"Итог напоминания для задачи {task.id} неизвестен")
+        return False
+    release_notification_claims([task.id], claimed_at, sent=sent)
 
-        logger.info(f"Найдено {due_tasks.count()} просроченных задач для уведомления")
+    if sent:
+        logger.info(
+            f"Напоминание отправлено для задачи {task.id} пользователю {task.telegram_user_id}"
+        )
+    else:
+        # Неотправленное напоминание подберет страховочный проход
+        logger.error(f"Не удалось отправить напоминание для задачи {task.id}")
+    return sent
 
-        notification_count = 0
-        for task in due_tasks:
-            try:
-                message = format_task_notification(task)
 
-                success = send_telegram_notification(
-                    task.telegram_user_id, message
-                )
+@shared_task
+def schedule_upcoming_reminders() -> int:
+    """Планирование напоминаний, срок которых вошел в горизонт планирования
+
+    Читает только диапазон частичного индекса по due_date, поэтому
+    стоимость прохода зависит от числа ближайших сроков, а не от размера таблицы.
+    """
+    horizon = getattr(settings, "NOTIFICATION_SCHEDULE_HORIZON", 900)
+    now = timezone.now()
+    upcoming = (
+        pending_notification_tasks()
+        .filter(
+            due_date__gt=now, due_date__lte=now + datetime.timedelta(seconds=horizon)
+        )
+        .only("id", "due_date", "telegram_user_id", "is_completed", "notification_sent")
+        .order_by("due_date", "id")
+    )
 
-                if success:
-                    task.notification_sent = True
-                    task.save()
+    scheduled = sum(schedule_task_reminder(task) for task in upcoming.iterator())
+    logger.info(f"Запланировано напоминаний: {scheduled}")
+    return scheduled
 
-                    notification_count += 1
-                    logger.info(
-                        f"Уведомление отправлено для задачи {task.id} пользователю {task.telegram_user_id}"
-                    )
-                else:
-                    logger.error(
-                        f"Не удалось отправить уведомление для задачи {task.id}"
-                    )
 
-            except Exception as e:
-                logger.error(f"Ошибка обработки задачи {task.id}: {e}")
+@shared_task
+def send_due_task_notifications() -> dict:
+    """Страховочная рассылка уведомлений о просроченных задачах
+
+    Подбирает напоминания, которые не удалось отправить вовремя
+    (ошибка доставки, простой воркера, задачи, созданные в обход API).
+    """
+    stats = NotificationRunStats()
+    started = time.monotonic()
+    max_workers = getattr(settings, "NOTIFICATION_MAX_WORKERS", 16)
+    chunk_size = getattr(settings, "NOTIFICATION_BATCH_SIZE", 200)
+
+    try:
+        now = timezone.now()
 
-        logger.info(f"Успешно отправлено {notification_count} уведомлений")
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="notify"
+        ) as executor:
+            for claimed_at, chunk in iter_due_task_chunks(now, chunk_size):
+                stats.chunks += 1
+                stats.found += len(chunk)
+
+                sent_ids, unknown_ids = send_notifications_chunk(chunk, executor)
+                done = set(sent_ids) | set(unknown_ids)
+                failed_ids = [task.id for task in chunk if task.id not in done]
+
+                # Одним UPDATE помечаем отправленные задачи чанка и снимаем
+                # аренду с неотправленных, их повторит следующий проход.
+                # Задачи с неизвестным итогом остаются захваченными до конца
+                # аренды: бот может еще дослать их
+                if sent_ids:
+                    release_notification_claims(sent_ids, claimed_at, sent=True)
+                if failed_ids:
+                    release_notification_claims(failed_ids, claimed_at, sent=False)
+
+                stats.sent += len(sent_ids)
+                stats.failed += len(failed_ids)
+                stats.unknown += len(unknown_ids)
 
     except Exception as e:
         logger.error(f"Ошибка в send_due_task_notifications: {e}")
 
+    stats.duration = time.monotonic() - started
+    observe_notification_run(stats)
+    logger.info(
+        f"Рассылка завершена: найдено {stats.found}, отправлено {stats.sent}, "
+        f"ошибок {stats.failed}, итог неизвестен {stats.unknown}, "
+        f"чанков {stats.chunks}, "
+        f"{stats.duration:.2f} с ({stats.throughput:.1f} уведомл./с)"
+    )
+    return stats.as_dict()
 
-def send_telegram_notification(telegram_id: int, message: str) -> bool:
-    """Отправка уведомления через Telegram API"""
-    try:
-        api_url = f"http://backend:8000/api/send-telegram-message/"
 
-        response = requests.post(
-            api_url, json={"telegram_id": telegram_id, "message": message}, timeout=10
+def iter_due_task_chunks(now, chunk_size: int):
+    """Keyset-пагинация просроченных задач по (due_date, id) с захватом чанков
+
+    Порядок совпадает с частичным индексом task_pending_notify_idx,
+    поэтому каждый чанк читается диапазоном индекса без сортировки.
+    Выдает пары (метка захвата, задачи чанка).
+    """
+    last = None
+    while True:
+        claimed_at, rows = claim_due_tasks(now, chunk_size, after=last)
+        if not rows:
+            return
+
+        chunk = list(
+            Task.objects.filter(id__in=[task_id for task_id, _ in rows])
+            .only("id", "title", "due_date", "telegram_user_id")
+            .prefetch_related(
+                Prefetch("categories", queryset=Category.objects.only("id", "name"))
+            )
+            .order_by("due_date", "id")
+        )
+        yield claimed_at, chunk
+
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+def claim_due_tasks(now, chunk_size: int, after=None):
+    """Атомарный захват чанка просроченных задач
+
+    SELECT ... FOR UPDATE SKIP LOCKED пропускает строки, которые в этот
+    момент захватывает другой воркер, а метка notification_claimed_at
+    скрывает захваченные строки до конца аренды. Задачи упавшего воркера
+    вернутся в выборку, когда аренда истечет.
+    """
+    claimed_at = timezone.now()
+    queryset = unclaimed_notification_tasks(claimed_at).filter(due_date__lte=now)
+    if after is not None:
+        last_id, last_due_date = after
+        queryset = queryset.filter(
+            Q(due_date__gt=last_due_date) | Q(due_date=last_due_date, id__gt=last_id)
         )
 
-        return response.status_code == 200
+    with transaction.atomic():
+        rows = list(
+            queryset.order_by("due_date", "id")
+            .select_for_update(skip_locked=True)
+            .values_list("id", "due_date")[:chunk_size]
+        )
+        if rows:
+            Task.objects.filter(id__in=[task_id for task_id, _ in rows]).update(
+                notification_claimed_at=claimed_at
+            )
+
+    return claimed_at, rows
+
+
+def send_notifications_chunk(tasks, executor) -> tuple:
+    """Параллельная пакетная отправка уведомлений чанка
+
+    Возвращает ID отправленных задач и ID задач с неизвестным итогом.
+    """
+    # Сообщения формируем в текущем потоке: категории уже загружены prefetch'ем
+    messages = [(task, format_task_notification(task)) for task in tasks]
+
+    bulk_size = getattr(settings, "NOTIFICATION_BULK_SIZE", 50)
+    batches = [
+        messages[start : start + bulk_size]
+        for start in range(0, len(messages), bulk_size)
+    ]
+    results = executor.map(send_telegram_notifications, batches)
+
+    sent_ids, unknown_ids = [], []
+    for batch, batch_results in zip(batches, results):
+        for (task, _), success in zip(batch, batch_results):
+            if success:
+                sent_ids.append(task.id)
+                logger.info(
+                    f"Уведомление отправлено для задачи {task.id} пользователю {task.telegram_user_id}"
+                )
+            elif success is None:
+                unknown_ids.append(task.id)
+            else:
+                logger.error(f"Не удалось отправить уведомление для задачи {task.id}")
+
+    return sent_ids, unknown_ids
+
+
+def send_telegram_notifications(batch) -> list:
+    """Отправка пакета уведомлений одним запросом к боту
+
+    None вместо результата - итог неизвестен: бот не ответил за
+    NOTIFICATION_TIMEOUT, но мог принять пакет и отправить его позже.
+    """
+    try:
+        return get_notification_transport().send_many(
+            [(task.telegram_user_id, message) for task, message in batch]
+        )
+
+    except requests.exceptions.ReadTimeout:
+        logger.warning(f"Бот не ответил на пакет из {len(batch)} уведомлений")
+        return [None] * len(batch)
+    except Exception as e:
+        logger.error(f"Ошибка при пакетной отправке Telegram уведомлений: {e}")
+        return [False] * len(batch)
+
+
+def send_telegram_notification(telegram_id: int, message: str):
+    """Отправка уведомления напрямую в бота, минуя HTTP API бэкенда
+
+    True или False - итог отправки, None - бот не ответил и итог неизвестен.
+    """
+    try:
+        return get_notification_transport().send(telegram_id, message)
 
+    except requests.exceptions.ReadTimeout:
+        logger.warning(f"Бот не ответил на уведомление пользователю {telegram_id}")
+        return None
     except Exception as e:
         logger.error(f"Ошибка при отправке Telegram уведомления: {e}")
         return False
@@ -1,3 +1,869 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .benchmarking import compare_with_baseline, median_report
+from .bulk import bulk_set_completed
+from .cache import get_generation
+from .factories import seed_users
+from .ids import SnowflakeGenerator, _worker_id, id_timestamp_ms
+from .models import Category, Task
+from .profiling import clear_slow_requests, sql_fingerprint
+from .services import (
+    BotJWTService,
+    NotificationTransport,
+    override_notification_transport,
+)
+from .tasks import (
+    claim_due_tasks,
+    iter_due_task_chunks,
+    send_due_task_notifications,
+    send_task_reminder,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+# Redis, к которому нельзя подключиться: имитация недоступного кеша
+UNAVAILABLE_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:1/0",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskQueryCountTests(APITestCase):
+    """Число SQL-запросов эндпоинтов задач не зависит от размера страницы"""
+
+    telegram_user_id = 1001
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+        self.categories = [
+            Category.objects.create(
+                name=f"Категория {index}",
+                user=self.user,
+                telegram_user_id=self.telegram_user_id,
+            )
+            for index in range(3)
+        ]
+
+    def create_tasks(self, count: int) -> list:
+        tasks = []
+        for index in range(count):
+            task = Task.objects.create(
+                title=f"Задача {index}",
+                user=self.user,
+                telegram_user_id=self.telegram_user_id,
+            )
+            task.categories.set(self.categories[: index % 3 + 1])
+            tasks.append(task)
+        return tasks
+
+    def get_list(self):
+        cache.clear()
+        return self.client.get(
+            "/api/tasks/", {"telegram_user_id": self.telegram_user_id}
+        )
+
+    def test_list_query_count_is_constant(self):
+        self.create_tasks(2)
+        with self.assertNumQueries(2):
+            response = self.get_list()
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self.create_tasks(18)
+        with self.assertNumQueries(2):
+            response = self.get_list()
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertTrue(all(task["categories"] for task in response.data["results"]))
+
+    def test_detail_query_count(self):
+        task = self.create_tasks(3)[-1]
+        with self.assertNumQueries(2):
+            response = self.client.get(f"/api/tasks/{task.id}/")
+        self.assertEqual(len(response.data["categories"]), 3)
+
+    def test_toggle_complete_query_count(self):
+        task = self.create_tasks(1)[0]
+        with self.assertNumQueries(3):
+            response = self.client.post(f"/api/tasks/{task.id}/toggle_complete/")
+        self.assertTrue(response.data["is_completed"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskStatusFilterTests(APITestCase):
+    """Фильтр по статусу и агрегированная статистика для бота"""
+
+    telegram_user_id = 2002
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        for index, (is_completed, due_date) in enumerate(
+            [(True, None), (False, None), (False, yesterday), (True, yesterday)]
+        ):
+            Task.objects.create(
+                title=f"Задача {index}",
+                user=self.user,
+                telegram_user_id=self.telegram_user_id,
+                is_completed=is_completed,
+                due_date=due_date,
+            )
+        Task.objects.create(title="Чужая", user=self.user, telegram_user_id=1)
+
+    def test_bot_list_honors_completed_param(self):
+        response = self.client.get(
+            "/api/tasks/",
+            {"telegram_user_id": self.telegram_user_id, "completed": "false"},
+        )
+        results = response.data["results"]
+        self.assertEqual(len(results), 2)
+        self.assertFalse(any(task["is_completed"] for task in results))
+
+    def test_stats_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/tasks/stats/", {"telegram_user_id": self.telegram_user_id}
+            )
+        self.assertEqual(
+            response.data, {"total": 4, "completed": 2, "pending": 2, "overdue": 1}
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskListFilterTests(APITestCase):
+    """Фильтры filter_tasks: telegram_user_id и статус (is_completed/completed)"""
+
+    telegram_user_id = 3003
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+        category = Category.objects.create(
+            name="Дом", user=self.user, telegram_user_id=self.telegram_user_id
+        )
+        for index, is_completed in enumerate([True, True, False, False, False]):
+            task = Task.objects.create(
+                title=f"Задача {index}",
+                user=self.user,
+                telegram_user_id=self.telegram_user_id,
+                is_completed=is_completed,
+            )
+            task.categories.add(category)
+        Task.objects.create(title="Чужая", user=self.user, telegram_user_id=1)
+
+    def get_titles(self, **params) -> list:
+        cache.clear()
+        response = self.client.get(
+            "/api/tasks/", {"telegram_user_id": self.telegram_user_id, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [task["title"] for task in response.data["results"]]
+
+    def test_status_aliases(self):
+        self.assertEqual(len(self.get_titles()), 5)
+        self.assertEqual(len(self.get_titles(is_completed="true")), 2)
+        self.assertEqual(len(self.get_titles(completed="false")), 3)
+        self.assertEqual(len(self.get_titles(completed="True")), 2)
+        # is_completed важнее completed
+        self.assertEqual(
+            len(self.get_titles(is_completed="false", completed="true")), 3
+        )
+        self.assertNotIn("Чужая", self.get_titles())
+
+    def test_filtered_list_query_count(self):
+        # Задачи + категории одним prefetch, поля категорий ограничены only()
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                "/api/tasks/",
+                {"telegram_user_id": self.telegram_user_id, "is_completed": "false"},
+            )
+        results = response.data["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            set(results[0]["categories"][0]),
+            {"id", "name", "created_at", "telegram_user_id"},
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskReminderSchedulingTests(APITestCase):
+    """Напоминание ставится на due_date и срабатывает только для актуального срока"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+        self.due_date = timezone.now() + datetime.timedelta(minutes=5)
+
+    def create_task(self):
+        with mock.patch("tasks.tasks.send_task_reminder.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(
+                    title="Напомнить",
+                    user=self.user,
+                    telegram_user_id=3003,
+                    due_date=self.due_date,
+                )
+        return task, apply_async
+
+    def test_reminder_scheduled_with_eta_once(self):
+        task, apply_async = self.create_task()
+        apply_async.assert_called_once_with(
+            args=[task.id, self.due_date.isoformat()], eta=self.due_date
+        )
+
+        with mock.patch("tasks.tasks.send_task_reminder.apply_async") as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                task.save()
+        apply_async.assert_not_called()
+
+    @mock.patch("tasks.tasks.send_telegram_notification", return_value=True)
+    def test_stale_reminder_is_skipped(self, send):
+        task, _ = self.create_task()
+        stale_iso = task.due_date.isoformat()
+        self.client.patch(
+            f"/api/tasks/{task.id}/",
+            {"due_date": (self.due_date + datetime.timedelta(hours=1)).isoformat()},
+            format="json",
+        )
+
+        self.assertFalse(send_task_reminder(task.id, stale_iso))
+        send.assert_not_called()
+
+    @mock.patch("tasks.tasks.send_telegram_notification", return_value=True)
+    def test_reminder_sent_once(self, send):
+        task, _ = self.create_task()
+        due_iso = task.due_date.isoformat()
+
+        self.assertTrue(send_task_reminder(task.id, due_iso))
+        self.assertFalse(send_task_reminder(task.id, due_iso))
+        send.assert_called_once()
+        task.refresh_from_db()
+        self.assertTrue(task.notification_sent)
+
+    @mock.patch("tasks.tasks.send_telegram_notification", return_value=None)
+    def test_unknown_outcome_keeps_claim(self, send):
+        task, _ = self.create_task()
+
+        self.assertFalse(send_task_reminder(task.id, task.due_date.isoformat()))
+        task.refresh_from_db()
+        self.assertFalse(task.notification_sent)
+        self.assertIsNotNone(task.notification_claimed_at)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, NOTIFICATION_CLAIM_LEASE=300)
+class DueNotificationClaimTests(APITestCase):
+    """Захват просроченных задач воркером: без дублей, с возвратом по аренде"""
+
+    def setUp(self):
+        self.user = BotJWTService.get_bot_user()
+        self.now = timezone.now()
+        self.tasks = [
+            Task.objects.create(
+                title=f"Просрочена {index}",
+                user=self.user,
+                telegram_user_id=4004,
+                due_date=self.now - datetime.timedelta(minutes=index + 1),
+            )
+            for index in range(3)
+        ]
+
+    def test_claimed_tasks_are_skipped_until_lease_expires(self):
+        _, first = claim_due_tasks(self.now, 10)
+        self.assertEqual(len(first), 3)
+        _, second = claim_due_tasks(self.now, 10)
+        self.assertEqual(second, [])
+
+        Task.objects.update(
+            notification_claimed_at=self.now - datetime.timedelta(minutes=10)
+        )
+        _, expired = claim_due_tasks(self.now, 10)
+        self.assertEqual(len(expired), 3)
+
+    @mock.patch("tasks.tasks.send_telegram_notifications")
+    def test_failed_sends_release_claims(self, send_many):
+        send_many.side_effect = lambda batch: [
+            task.title != "Просрочена 0" for task, _ in batch
+        ]
+
+        stats = send_due_task_notifications()
+
+        self.assertEqual((stats["sent"], stats["failed"]), (2, 1))
+        self.assertFalse(Task.objects.filter(notification_claimed_at__isnull=False))
+        self.assertEqual(
+            list(Task.objects.filter(notification_sent=False).values_list("title")),
+            [("Просрочена 0",)],
+        )
+
+    def test_bot_timeout_keeps_claims(self):
+        transport = mock.Mock(spec=NotificationTransport)
+        transport.send_many.side_effect = requests.exceptions.ReadTimeout()
+        with override_notification_transport(transport):
+            stats = send_due_task_notifications()
+
+        # Бот мог отправить пакет: задачи не помечены ни отправленными, ни
+        # свободными, следующий проход их не возьмет до конца аренды
+        self.assertEqual((stats["unknown"], stats["failed"]), (3, 0))
+        self.assertEqual(
+            Task.objects.filter(
+                notification_claimed_at__isnull=False, notification_sent=False
+            ).count(),
+            3,
+        )
+        _, rows = claim_due_tasks(self.now, 10)
+        self.assertEqual(rows, [])
+
+    @override_settings(NOTIFICATION_BATCH_SIZE=2)
+    @mock.patch("tasks.tasks.send_telegram_notifications")
+    def test_run_continues_after_first_chunk(self, send_many):
+        send_many.side_effect = lambda batch: [True] * len(batch)
+
+        stats = send_due_task_notifications()
+
+        self.assertEqual((stats["chunks"], stats["sent"]), (2, 3))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DueNotificationBatchTests(APITestCase):
+    """Страховочная рассылка: keyset-чанки, пакетная пометка и счетчики прогона"""
+
+    def setUp(self):
+        self.user = BotJWTService.get_bot_user()
+        self.now = timezone.now()
+
+    def create_due_tasks(self, count: int, due_dates=None) -> list:
+        due_dates = due_dates or [
+            self.now - datetime.timedelta(minutes=index + 1) for index in range(count)
+        ]
+        return [
+            Task.objects.create(
+                title=f"Просрочена {index}",
+                user=self.user,
+                telegram_user_id=5005,
+                due_date=due_date,
+            )
+            for index, due_date in enumerate(due_dates)
+        ]
+
+    def test_keyset_chunks_cover_every_task_once(self):
+        # Одинаковые сроки на границе чанков различает id
+        same = self.now - datetime.timedelta(minutes=5)
+        earlier = self.now - datetime.timedelta(minutes=10)
+        tasks = self.create_due_tasks(5, [same, earlier, same, same, earlier])
+        expected = [task.id for task in sorted(tasks, key=lambda t: (t.due_date, t.id))]
+
+        chunks = [
+            [task.id for task in chunk]
+            for _, chunk in iter_due_task_chunks(self.now, chunk_size=2)
+        ]
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([task_id for chunk in chunks for task_id in chunk], expected)
+
+    @mock.patch("tasks.tasks.send_telegram_notifications")
+    def test_chunk_is_marked_sent_with_one_update(self, send_many):
+        send_many.side_effect = lambda batch: [True] * len(batch)
+
+        def run_queries(count: int) -> int:
+            Task.objects.all().delete()
+            self.create_due_tasks(count)
+            with CaptureQueriesContext(connection) as queries:
+                stats = send_due_task_notifications()
+            self.assertEqual(stats["sent"], count)
+            return len(queries)
+
+        # Захват, чтение чанка с категориями и один UPDATE на весь чанк
+        self.assertEqual(run_queries(2), run_queries(20))
+        self.assertFalse(Task.objects.filter(notification_sent=False))
+
+    @mock.patch("tasks.tasks.time.monotonic", side_effect=[100.0, 104.0])
+    @mock.patch("tasks.tasks.send_telegram_notifications")
+    def test_run_reports_throughput(self, send_many, monotonic):
+        send_many.side_effect = lambda batch: [
+            task.title != "Просрочена 0" for task, _ in batch
+        ]
+        self.create_due_tasks(9)
+
+        stats = send_due_task_notifications()
+
+        self.assertEqual(
+            stats,
+            {
+                "found": 9,
+                "sent": 8,
+                "failed": 1,
+                "unknown": 0,
+                "chunks": 1,
+                "duration": 4.0,
+                "throughput": 2.0,
+            },
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TaskBulkOperationsTests(APITestCase):
+    """Пакетные операции: фиксированное число запросов и постатусный ответ"""
+
+    telegram_user_id = 5005
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(
+            name="Импорт", user=self.user, telegram_user_id=self.telegram_user_id
+        )
+
+    def bulk_create(self, count):
+        payload = [
+            {
+                "title": f"Задача {index}",
+                "telegram_user_id": self.telegram_user_id,
+                "category_ids": [self.category.id, "1"],
+            }
+            for index in range(count)
+        ]
+        return self.client.post("/api/tasks/bulk_create/", payload, format="json")
+
+    def test_bulk_create_query_count_is_constant(self):
+        # Категории, INSERT задач, INSERT связей и SAVEPOINT/RELEASE транзакции
+        with self.assertNumQueries(5):
+            self.bulk_create(2)
+        with self.assertNumQueries(5):
+            response = self.bulk_create(30)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.count(), 32)
+        self.assertEqual(self.category.tasks.count(), 32)
+
+    def test_bulk_create_reports_invalid_items(self):
+        response = self.client.post(
+            "/api/tasks/bulk_create/",
+            {"tasks": [{"title": "Годная"}, {"description": "Без заголовка"}]},
+            format="json",
+        )
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["created", "invalid"])
+
+    def test_bulk_complete_and_categorize(self):
+        ids = [result["id"] for result in self.bulk_create(3).data["results"]]
+
+        response = self.client.post(
+            "/api/tasks/bulk_complete/", {"ids": ids + ["1"]}, format="json"
+        )
+        statuses = [result["status"] for result in response.data["results"]]
+        self.assertEqual(statuses, ["updated"] * 3 + ["not_found"])
+        self.assertEqual(Task.objects.filter(is_completed=True).count(), 3)
+
+        self.client.post(
+            "/api/tasks/bulk_categorize/",
+            {"ids": ids[:2], "category_ids": [self.category.id], "mode": "remove"},
+            format="json",
+        )
+        self.assertEqual(self.category.tasks.count(), 1)
+
+        self.client.post("/api/tasks/bulk_delete/", {"ids": ids}, format="json")
+        self.assertEqual(Task.objects.count(), 0)
+
+    def test_list_cache_is_invalidated_after_commit(self):
+        ids = [result["id"] for result in self.bulk_create(2).data["results"]]
+        queryset = Task.objects.filter(user=self.user)
+        before = get_generation("task", self.user.pk, self.telegram_user_id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bulk_set_completed(self.user, queryset, ids, True)
+        # До фиксации список еще закеширован под прежним поколением
+        self.assertEqual(
+            get_generation("task", self.user.pk, self.telegram_user_id), before
+        )
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(
+            get_generation("task", self.user.pk, self.telegram_user_id), before
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SnowflakeIdTests(APITestCase):
+    """64-битные ID растут со временем и отдаются API строкой"""
+
+    def test_generator_is_monotonic_and_unique(self):
+        generate = SnowflakeGenerator(worker_id=7)
+        ids = [generate() for _ in range(20_000)]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertLess(ids[-1], 2**63)
+        self.assertAlmostEqual(
+            id_timestamp_ms(ids[0]) / 1000, timezone.now().timestamp(), delta=5
+        )
+
+    @override_settings(ID_WORKER_ID=None, ID_NODE_ID=3)
+    def test_worker_id_is_node_and_process_slot(self):
+        with mock.patch.dict("os.environ", {"ID_WORKER_SLOT": "2"}):
+            self.assertEqual(_worker_id(), 3 << 5 | 2)
+        with mock.patch.dict("os.environ", {"ID_WORKER_SLOT": "32"}):
+            with self.assertRaises(ImproperlyConfigured):
+                _worker_id()
+        with override_settings(ID_NODE_ID=32), self.assertRaises(ImproperlyConfigured):
+            _worker_id()
+        with override_settings(ID_WORKER_ID=1000):
+            self.assertEqual(_worker_id(), 1000)
+
+    def test_api_keeps_string_ids(self):
+        user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(user)
+        category = Category.objects.create(name="Строки", user=user)
+
+        response = self.client.post(
+            "/api/tasks/",
+            {"title": "ID строкой", "category_ids": [str(category.id)]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsInstance(response.data["id"], str)
+        self.assertEqual(response.data["categories"][0]["id"], str(category.id))
+
+        detail = self.client.get(f"/api/tasks/{response.data['id']}/")
+        self.assertEqual(detail.status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AsyncTaskApiTests(APITestCase):
+    """Async-представления отвечают так же, как DRF-представления"""
+
+    def setUp(self):
+        self.user = BotJWTService.get_bot_user()
+        self.headers = {
+            "Authorization": f"Bearer {BotJWTService.create_bot_tokens()['access']}"
+        }
+        self.task = Task.objects.create(
+            title="Async", user=self.user, telegram_user_id=6006
+        )
+
+    async def test_detail_and_stats(self):
+        response = await self.async_client.get(
+            f"/api/async/tasks/{self.task.id}/", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], str(self.task.id))
+
+        response = await self.async_client.get(
+            "/api/async/tasks/stats/",
+            {"telegram_user_id": 6006},
+            headers=self.headers,
+        )
+        self.assertEqual(response.json()["pending"], 1)
+
+    async def test_requires_token(self):
+        response = await self.async_client.get("/api/async/tasks/stats/")
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SendTelegramMessageTests(APITestCase):
+    """Публичная отправка идет через общий транспорт процесса"""
+
+    def test_requests_share_process_transport(self):
+        transport = mock.Mock(spec=NotificationTransport)
+        transport.send.return_value = True
+        with override_notification_transport(transport):
+            for _ in range(3):
+                response = self.client.post(
+                    "/api/send-telegram-message/",
+                    {"telegram_id": 6006, "message": "Привет"},
+                    format="json",
+                )
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(transport.send.call_count, 3)
+        transport.send.assert_called_with(6006, "Привет")
+
+    def test_requires_fields(self):
+        response = self.client.post(
+            "/api/send-telegram-message/", {"telegram_id": 6006}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedJWTAuthenticationTests(APITestCase):
+    """Пользователь из JWT берется из кеша, а не из БД на каждый запрос"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = BotJWTService.get_bot_user()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {BotJWTService.create_bot_tokens()['access']}"
+        )
+
+    def test_user_lookup_is_cached(self):
+        # SELECT пользователя + агрегат
+        with self.assertNumQueries(2):
+            self.client.get("/api/tasks/stats/", {"telegram_user_id": 7007})
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/tasks/stats/", {"telegram_user_id": 7007})
+        self.assertEqual(response.status_code, 200)
+
+    def test_user_change_invalidates_cache(self):
+        self.client.get("/api/tasks/stats/", {"telegram_user_id": 7007})
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get("/api/tasks/stats/", {"telegram_user_id": 7007})
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(CACHES=UNAVAILABLE_CACHES)
+class UnavailableCacheTests(APITestCase):
+    """Недоступный кеш не ломает запросы и записи: данные берутся из БД"""
+
+    telegram_user_id = 8008
+
+    def setUp(self):
+        self.user = BotJWTService.get_bot_user()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {BotJWTService.create_bot_tokens()['access']}"
+        )
+
+    def test_jwt_authentication_falls_back_to_db(self):
+        for path in ("/api/tasks/stats/", "/api/async/tasks/stats/"):
+            response = self.client.get(
+                path, {"telegram_user_id": self.telegram_user_id}
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_user_save_succeeds(self):
+        self.user.first_name = "Bot"
+        with self.assertLogs("tasks.signals", "ERROR"):
+            self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_name, "Bot")
+
+    def test_writes_and_lists_bypass_cache(self):
+        category = self.client.post(
+            "/api/categories/",
+            {"telegram_user_id": self.telegram_user_id, "name": "Работа"},
+            format="json",
+        )
+        self.assertEqual(category.status_code, 201)
+
+        created = self.client.post(
+            "/api/tasks/",
+            {
+                "telegram_user_id": self.telegram_user_id,
+                "title": "Отчет",
+                "category_ids": [category.data["id"]],
+                "due_date": (
+                    timezone.now() + datetime.timedelta(minutes=5)
+                ).isoformat(),
+            },
+            format="json",
+        )
+        self.assertEqual(created.status_code, 201)
+
+        response = self.client.patch(
+            f"/api/tasks/{created.data['id']}/",
+            {"telegram_user_id": self.telegram_user_id, "title": "Отчет за месяц"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        for path in ("/api/tasks/", "/api/categories/"):
+            response = self.client.get(
+                path, {"telegram_user_id": self.telegram_user_id}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Работа")
+
+        response = self.client.delete(
+            f"/api/tasks/{created.data['id']}/?telegram_user_id={self.telegram_user_id}"
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Task.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BotTokenRefreshTests(APITestCase):
+    """Бот обновляет access-токен по refresh-токену"""
+
+    def test_refresh_returns_working_access_token(self):
+        tokens = self.client.get("/api/bot/token/").json()
+
+        response = self.client.post(
+            "/api/bot/token/refresh/", {"refresh": tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}"
+        )
+        response = self.client.get("/api/tasks/stats/", {"telegram_user_id": 8008})
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_refresh_token_is_rejected(self):
+        response = self.client.post(
+            "/api/bot/token/refresh/", {"refresh": "garbage"}, format="json"
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MetricsTests(APITestCase):
+    """/metrics отдает время ответа и число SQL-запросов по представлениям"""
+
+    def test_request_metrics_are_exported(self):
+        user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(user)
+        self.client.get("/api/tasks/stats/", {"telegram_user_id": 9009})
+
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{method="GET",status="200",'
+            'view="task-stats"}',
+            body,
+        )
+        self.assertIn('http_request_db_queries_count{view="task-stats"}', body)
+        self.assertIn("db_query_duration_seconds_count", body)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class BenchmarkHarnessTests(APITestCase):
+    """Фабрики бенчмарка и сравнение результатов с baseline"""
+
+    def test_seed_users(self):
+        user = BotJWTService.get_bot_user()
+        seeded = seed_users(user, users=3, categories_per_user=2, tasks_per_user=4)
+
+        self.assertEqual(len(seeded), 3)
+        self.assertEqual(Category.objects.count(), 6)
+        self.assertEqual(Task.objects.count(), 12)
+        self.assertEqual(Task.categories.through.objects.count(), 12)
+        self.assertEqual(
+            Task.objects.filter(telegram_user_id=seeded[0].telegram_user_id).count(), 4
+        )
+
+    def test_compare_with_baseline(self):
+        baseline = {
+            "task-list": {
+                "p50_ms": 5.0,
+                "p99_ms": 10.0,
+                "rps": 100.0,
+                "queries_max": 3,
+                "errors": 0,
+            }
+        }
+        within = {
+            "task-list": {
+                "p50_ms": 6.0,
+                "p99_ms": 18.0,
+                "rps": 80.0,
+                "queries_max": 3,
+                "errors": 0,
+            }
+        }
+        self.assertEqual(compare_with_baseline(within, baseline, 0.3, 1.0), [])
+
+        slower = {
+            "task-list": {
+                "p50_ms": 7.0,
+                "p99_ms": 21.0,
+                "rps": 100.0,
+                "queries_max": 4,
+                "errors": 0,
+            }
+        }
+        self.assertEqual(len(compare_with_baseline(slower, baseline, 0.3, 1.0)), 3)
+
+    def test_median_report(self):
+        reports = [
+            {"p50_ms": 5.0, "rps": 100.0, "queries_max": 2, "errors": 0},
+            {"p50_ms": 50.0, "rps": 10.0, "queries_max": 2, "errors": 1},
+            {"p50_ms": 6.0, "rps": 90.0, "queries_max": 3, "errors": 0},
+        ]
+        self.assertEqual(
+            median_report(reports),
+            {"p50_ms": 6.0, "rps": 90.0, "queries_max": 3, "errors": 1},
+        )
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    SQL_PROFILING=True,
+    SQL_PROFILING_SLOW_MS=0,
+    SQL_PROFILING_CAPTURE_STACKS=True,
+)
+class SQLProfilingTests(APITestCase):
+    """Заголовки X-DB-*, повторы SQL и буфер медленных запросов"""
+
+    telegram_user_id = 7007
+
+    def setUp(self):
+        cache.clear()
+        clear_slow_requests()
+        self.user = BotJWTService.get_bot_user()
+        self.client.force_authenticate(self.user)
+
+    def test_fingerprint_collapses_in_lists(self):
+        self.assertEqual(
+            sql_fingerprint('SELECT * FROM "t"\n WHERE "id" IN (%s, %s, %s)'),
+            sql_fingerprint('SELECT * FROM "t" WHERE "id" IN (%s)'),
+        )
+
+    def test_response_headers(self):
+        response = self.client.get(
+            "/api/tasks/stats/", {"telegram_user_id": self.telegram_user_id}
+        )
+        self.assertEqual(response["X-DB-Query-Count"], "1")
+        self.assertEqual(response["X-DB-Duplicate-Queries"], "0")
+        self.assertIn("X-DB-Time-Ms", response)
+
+    def test_slow_requests_are_readable_by_admin_only(self):
+        self.client.get(
+            "/api/tasks/stats/", {"telegram_user_id": self.telegram_user_id}
+        )
+
+        response = self.client.get("/api/debug/sql-profiles/")
+        self.assertEqual(response.status_code, 403)
+
+        admin = get_user_model().objects.create_superuser("admin", password="admin")
+        self.client.force_authenticate(admin)
+        response = self.client.get("/api/debug/sql-profiles/")
+        self.assertEqual(response.status_code, 200)
+
+        # Сами обращения к /api/debug/sql-profiles/ в буфер не попадают
+        self.assertEqual(len(response.data["requests"]), 1)
+        entry = response.data["requests"][0]
+        self.assertEqual(entry["view"], "task-stats")
+        self.assertEqual(entry["path"], "/api/tasks/stats/")
+        self.assertEqual(entry["query_count"], 1)
+        self.assertNotIn("params", entry["queries"][0])
+        self.assertTrue(
+            any("tasks/views.py" in frame for frame in entry["queries"][0]["stack"])
+        )
+
+    @override_settings(SQL_PROFILING=False)
+    def test_disabled_by_default(self):
+        response = self.client.get(
+            "/api/tasks/stats/", {"telegram_user_id": self.telegram_user_id}
+        )
+        self.assertNotIn("X-DB-Query-Count", response)
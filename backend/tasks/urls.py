@@ -1,8 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenRefreshView
 
-from . import views
-from .views import CategoryViewSet, TaskViewSet, send_telegram_message
+from . import async_views, views
+from .views import CategoryViewSet, TaskViewSet
 
 router = DefaultRouter()
 router.register(r"tasks", TaskViewSet, basename="task")
@@ -10,11 +11,20 @@ router.register(r"categories", CategoryViewSet, basename="category")
 
 urlpatterns = [
     path("", include(router.urls)),
-    path("send-telegram-message/", send_telegram_message, name="send-telegram-message"),
+    path(
+        "send-telegram-message/",
+        views.send_telegram_message,
+        name="send-telegram-message",
+    ),
+    # Async-варианты горячих запросов бота для ASGI-сервера
+    path("async/tasks/stats/", async_views.task_stats, name="async-task-stats"),
+    path("async/tasks/<int:pk>/", async_views.task_detail, name="async-task-detail"),
     path("bot/token/", views.BotTokenView.as_view(), name="bot-token"),
+    path("bot/token/refresh/", TokenRefreshView.as_view(), name="bot-token-refresh"),
     path(
         "bot/register-user/",
         views.RegisterTelegramUserView.as_view(),
         name="register-telegram-user",
     ),
+    path("debug/sql-profiles/", views.SQLProfileView.as_view(), name="sql-profiles"),
 ]
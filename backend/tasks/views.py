@@ -3,24 +3,78 @@ import logging
 import requests
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from .bulk import (
+    bulk_categorize_tasks,
+    bulk_create_tasks,
+    bulk_delete_tasks,
+    bulk_set_completed,
+)
+from .cache import CachedListMixin
 from .models import BotProfile, Category, Task
-from .serializers import CategorySerializer, TaskSerializer
-from .services.jwt_service import BotJWTService
+from .pagination import CreatedAtCursorPagination
+from .profiling import clear_slow_requests, slow_requests
+from .serializers import (
+    BulkCategorizeSerializer,
+    BulkCompleteSerializer,
+    BulkTaskIdsSerializer,
+    CategorySerializer,
+    TaskSerializer,
+)
+from .services import BotJWTService, get_notification_transport
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def filter_tasks(user, query_params):
+    """Задачи пользователя с фильтрами бота и статуса (общие для sync и async API)"""
+    queryset = Task.objects.filter(user=user).prefetch_related(
+        Prefetch(
+            "categories",
+            queryset=Category.objects.only(*CategorySerializer.Meta.fields),
+        )
+    )
+
+    if user.username == "telegram_bot_user":
+        telegram_user_id = query_params.get("telegram_user_id")
+        if telegram_user_id:
+            queryset = queryset.filter(telegram_user_id=telegram_user_id)
+
+    # Бот передает статус параметром completed, остальные клиенты - is_completed
+    is_completed = query_params.get("is_completed", query_params.get("completed"))
+    if is_completed is not None:
+        queryset = queryset.filter(is_completed=is_completed.lower() == "true")
+
+    return queryset.order_by("-created_at")
+
+
+def task_status_counts(now):
+    """Агрегаты по статусам для одного запроса с COUNT ... FILTER"""
+    return {
+        "total": Count("id"),
+        "completed": Count("id", filter=Q(is_completed=True)),
+        "pending": Count("id", filter=Q(is_completed=False)),
+        "overdue": Count("id", filter=Q(is_completed=False, due_date__lt=now)),
+    }
+
+
+class CategoryViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet для работы с категориями"""
 
+    list_cache_scope = "category"
+    lookup_value_regex = r"\d+"
     serializer_class = CategorySerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -39,34 +93,125 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(CachedListMixin, viewsets.ModelViewSet):
     """ViewSet для работы с задачами"""
 
+    list_cache_scope = "task"
+    lookup_value_regex = r"\d+"
     serializer_class = TaskSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Получение queryset задач с фильтрацией для бота и по статусу"""
-        queryset = Task.objects.filter(user=self.request.user)
-
-        if self.request.user.username == "telegram_bot_user":
-            telegram_user_id = self.request.query_params.get("telegram_user_id")
-            if telegram_user_id:
-                return Task.objects.filter(
-                    user=self.request.user, telegram_user_id=telegram_user_id
-                ).order_by("-created_at")
-            return Task.objects.filter(user=self.request.user).order_by("-created_at")
-
-        is_completed = self.request.query_params.get("is_completed")
-        if is_completed is not None:
-            queryset = queryset.filter(is_completed=is_completed.lower() == "true")
-
-        return queryset.order_by("-created_at")
+        return filter_tasks(self.request.user, self.request.query_params)
 
     def perform_create(self, serializer):
         """Сохранение задачи с привязкой к пользователю"""
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Количество задач по статусам одним агрегирующим запросом"""
+        counts = (
+            self.get_queryset()
+            .order_by()
+            .aggregate(**task_status_counts(timezone.now()))
+        )
+        return Response(counts)
+
+    @action(detail=False, methods=["post"])
+    def bulk_create(self, request):
+        """Пакетное создание задач одной транзакцией с постатусным результатом"""
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get("tasks")
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Ожидается непустой список задач"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > settings.TASK_BULK_MAX_ITEMS:
+            return Response(
+                {"error": f"Не больше {settings.TASK_BULK_MAX_ITEMS} задач за запрос"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results, valid = [], []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results.append(
+                    {"index": index, "status": "invalid", "errors": serializer.errors}
+                )
+
+        tasks = bulk_create_tasks(request.user, [data for _, data in valid])
+        results.extend(
+            {"index": index, "status": "created", "id": str(task.id)}
+            for (index, _), task in zip(valid, tasks)
+        )
+        results.sort(key=lambda result: result["index"])
+
+        return Response(
+            {"results": results},
+            status=status.HTTP_201_CREATED if tasks else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @action(detail=False, methods=["post"])
+    def bulk_complete(self, request):
+        """Пакетная смена статуса выполнения задач"""
+        serializer = BulkCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        found = bulk_set_completed(
+            request.user,
+            self.get_queryset(),
+            ids,
+            serializer.validated_data["is_completed"],
+        )
+        return Response(self._bulk_results(ids, found, "updated"))
+
+    @action(detail=False, methods=["post"])
+    def bulk_delete(self, request):
+        """Пакетное удаление задач"""
+        serializer = BulkTaskIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        found = bulk_delete_tasks(request.user, self.get_queryset(), ids)
+        return Response(self._bulk_results(ids, found, "deleted"))
+
+    @action(detail=False, methods=["post"])
+    def bulk_categorize(self, request):
+        """Пакетное добавление, замена или снятие категорий задач"""
+        serializer = BulkCategorizeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+
+        found = bulk_categorize_tasks(
+            request.user,
+            self.get_queryset(),
+            ids,
+            serializer.validated_data["category_ids"],
+            serializer.validated_data["mode"],
+        )
+        return Response(self._bulk_results(ids, found, "updated"))
+
+    @staticmethod
+    def _bulk_results(ids, found, done_status: str) -> dict:
+        return {
+            "results": [
+                {
+                    "id": task_id,
+                    "status": done_status if task_id in found else "not_found",
+                }
+                for task_id in dict.fromkeys(ids)
+            ]
+        }
+
     @action(detail=True, methods=["post"])
     def toggle_complete(self, request, pk=None):
         """Переключение статуса выполнения задачи"""
@@ -89,22 +234,13 @@ def send_telegram_message(request):
         if not telegram_id or not message:
             return Response({"error": "telegram_id и message обязательны"}, status=400)
 
-        bot_api_url = getattr(settings, "BOT_API_URL", "http://bot:8001/send_message")
-
-        response = requests.post(
-            bot_api_url,
-            json={"telegram_id": int(telegram_id), "message": message},
-            timeout=10,
-        )
-
-        if response.status_code == 200:
+        # Общий на процесс пул соединений с ботом, как у Celery-задач
+        if get_notification_transport().send(int(telegram_id), message):
             return Response(
                 {"status": "success", "message": "Уведомление отправлено успешно"}
             )
         else:
-            return Response(
-                {"error": f"Ошибка Bot API: {response.status_code}"}, status=500
-            )
+            return Response({"error": "Ошибка Bot API"}, status=500)
     except requests.exceptions.Timeout:
         logger.error("Таймаут подключения к Bot API")
         return Response({"error": "Таймаут сервиса бота"}, status=504)
@@ -163,3 +299,26 @@ class RegisterTelegramUserView(APIView):
                 "chat_id": bot_profile.chat_id,
             }
         )
+
+
+class SQLProfileView(APIView):
+    """Медленные запросы из буфера профилирования SQL (только администраторы)"""
+
+    authentication_classes = [
+        *api_settings.DEFAULT_AUTHENTICATION_CLASSES,
+        SessionAuthentication,
+    ]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(
+            {
+                "enabled": settings.SQL_PROFILING,
+                "slow_ms": settings.SQL_PROFILING_SLOW_MS,
+                "requests": slow_requests(),
+            }
+        )
+
+    def delete(self, request):
+        clear_slow_requests()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,5 +1,8 @@
 import os
+
+from billiard.process import current_process
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
 
@@ -9,6 +12,14 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 
 app.autodiscover_tasks()
 
+
+@worker_process_init.connect
+def set_id_worker_slot(**kwargs):
+    # Номер дочернего процесса prefork для генератора ID (tasks/ids.py);
+    # billiard отдает номер новому процессу только после завершения прежнего
+    os.environ['ID_WORKER_SLOT'] = str(current_process().index + 1)
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
\ No newline at end of file
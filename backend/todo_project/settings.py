@@ -51,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.metrics.MetricsMiddleware',
+    'tasks.profiling.SQLProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -156,7 +158,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -172,6 +174,39 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Кеш списков API в том же Redis, что и брокер Celery (отдельная база)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': env('CACHE_URL', default='redis://redis:6379/1'),
+        'KEY_PREFIX': 'todo',
+    }
+}
+LIST_CACHE_TIMEOUT = env.int('LIST_CACHE_TIMEOUT', default=300)
+# Сколько секунд JWT-аутентификация берет пользователя из кеша, а не из БД
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', default=60)
+
+# Профилирование SQL по запросам (tasks/profiling.py), по умолчанию выключено
+SQL_PROFILING = env.bool('SQL_PROFILING', default=False)
+# Заголовки X-DB-Query-Count, X-DB-Time-Ms, X-DB-Duplicate-Queries в ответах
+SQL_PROFILING_HEADERS = env.bool('SQL_PROFILING_HEADERS', default=True)
+# Доля запросов (0-1), итоги которых пишутся в лог
+SQL_PROFILING_LOG_SAMPLE_RATE = env.float('SQL_PROFILING_LOG_SAMPLE_RATE', default=0.0)
+# Запросы дольше порога попадают в буфер /api/debug/sql-profiles/
+SQL_PROFILING_SLOW_MS = env.float('SQL_PROFILING_SLOW_MS', default=500.0)
+SQL_PROFILING_BUFFER_SIZE = env.int('SQL_PROFILING_BUFFER_SIZE', default=50)
+# Место вызова каждого SQL-запроса в коде проекта
+SQL_PROFILING_CAPTURE_STACKS = env.bool('SQL_PROFILING_CAPTURE_STACKS', default=True)
+
+# Номер узла (контейнера) для генератора ID (0-31), уникальный среди узлов,
+# пишущих в одну БД; номер процесса на узле добавляют хуки gunicorn и Celery
+ID_NODE_ID = env.int('ID_NODE_ID', default=0)
+# Номер генератора целиком (0-1023), если задан - вместо ID_NODE_ID
+ID_WORKER_ID = env.int('ID_WORKER_ID', default=None)
+
+# Максимум элементов в одном запросе пакетных операций над задачами
+TASK_BULK_MAX_ITEMS = env.int('TASK_BULK_MAX_ITEMS', default=500)
+
 CELERY_BROKER_URL = env('REDIS_URL', default='redis://redis:6379/0')
 CELERY_RESULT_BACKEND = env('REDIS_URL', default='redis://redis:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
@@ -179,13 +214,44 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'America/Adak'
 
+# Напоминания ставятся в Celery с eta не дальше горизонта планирования.
+# visibility_timeout брокера должен быть больше горизонта, иначе Redis
+# переотправит еще не наступившие ETA-задачи другому воркеру.
+NOTIFICATION_SCHEDULE_HORIZON = env.int('NOTIFICATION_SCHEDULE_HORIZON', default=900)
+NOTIFICATION_CATCHUP_INTERVAL = env.int('NOTIFICATION_CATCHUP_INTERVAL', default=600)
+# Срок аренды захваченного на отправку уведомления, после него задачу
+# упавшего воркера подберет другой
+NOTIFICATION_CLAIM_LEASE = env.int('NOTIFICATION_CLAIM_LEASE', default=300)
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'visibility_timeout': NOTIFICATION_SCHEDULE_HORIZON + 3600,
+}
+
 CELERY_BEAT_SCHEDULE = {
+    'schedule-upcoming-reminders': {
+        'task': 'tasks.tasks.schedule_upcoming_reminders',
+        'schedule': NOTIFICATION_SCHEDULE_HORIZON / 3,
+    },
     'send-due-task-notifications': {
         'task': 'tasks.tasks.send_due_task_notifications',
-        'schedule': 60.0,  # Каждые 60 секунд
+        'schedule': float(NOTIFICATION_CATCHUP_INTERVAL),
     },
 }
 
+# Размер чанка (keyset-страницы) и число параллельных отправок уведомлений
+NOTIFICATION_BATCH_SIZE = env.int('NOTIFICATION_BATCH_SIZE', default=200)
+NOTIFICATION_MAX_WORKERS = env.int('NOTIFICATION_MAX_WORKERS', default=16)
+# Сколько уведомлений уходит в бота одним запросом /send_messages
+NOTIFICATION_BULK_SIZE = env.int('NOTIFICATION_BULK_SIZE', default=50)
+
 BOT_API_URL = env('BOT_API_URL', default='http://bot:8001/send_message')
+BOT_BULK_API_URL = env('BOT_BULK_API_URL', default='http://bot:8001/send_messages')
+
+# Транспорт уведомлений из Celery в бота: "http" (пул соединений к Notification
+# API бота) или "redis" (Redis Stream, который читает бот)
+NOTIFICATION_TRANSPORT = env('NOTIFICATION_TRANSPORT', default='http')
+# Бот отвечает после ответа Telegram, пакет ждет лимитов отправки бота
+NOTIFICATION_TIMEOUT = env.float('NOTIFICATION_TIMEOUT', default=60.0)
+NOTIFICATION_STREAM = env('NOTIFICATION_STREAM', default='bot:notifications')
+NOTIFICATION_STREAM_MAXLEN = env.int('NOTIFICATION_STREAM_MAXLEN', default=100000)
 
 
@@ -0,0 +1,62 @@
+"""
+Production settings for todo_project project.
+
+Extends the base settings: DEBUG is off (no per-query log in
+connection.queries), database connections are reused through a
+psycopg 3 pool, persistent connections or PgBouncer, and the app
+is served by gunicorn: threaded WSGI workers for the API and uvicorn
+workers for the async views (see gunicorn.conf.py).
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, SECRET_KEY, env
+
+DEBUG = env.bool('DJANGO_DEBUG', default=False)
+
+SECRET_KEY = env('SECRET_KEY', default=SECRET_KEY)
+
+# Номер узла для генератора ID обязателен: свой у каждого контейнера,
+# пишущего в БД (tasks/ids.py), иначе возможны одинаковые первичные ключи
+ID_NODE_ID = env.int('ID_NODE_ID')
+ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['*'])
+
+# Режим соединений с PostgreSQL:
+#   pool      - пул psycopg 3 в каждом процессе (подходит для ASGI, где
+#               постоянные соединения Django не переиспользуются)
+#   persistent - соединение на поток живет CONN_MAX_AGE секунд (WSGI, Celery)
+#   pgbouncer - PgBouncer в режиме transaction: соединения держит он,
+#               серверные курсоры отключены (подготовленные запросы Django
+#               с psycopg 3 и так не использует)
+DB_CONNECTION_MODE = env('DB_CONNECTION_MODE', default='pool')
+
+if DB_CONNECTION_MODE == 'pool':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.float('DB_POOL_TIMEOUT', default=10.0),
+        },
+    }
+elif DB_CONNECTION_MODE == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=600)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONNECTION_MODE == 'pgbouncer':
+    DATABASES['default']['HOST'] = env('PGBOUNCER_HOST', default='pgbouncer')
+    DATABASES['default']['PORT'] = env('PGBOUNCER_PORT', default='6432')
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=600)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    raise ValueError(f'Неизвестный DB_CONNECTION_MODE: {DB_CONNECTION_MODE}')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'root': {'handlers': ['console'], 'level': env('LOG_LEVEL', default='INFO')},
+}
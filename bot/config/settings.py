@@ -12,6 +12,72 @@ class Settings:
 
     API_TIMEOUT = 30
 
+    # Общий пул keep-alive соединений APIClient к бэкенду
+    API_MAX_CONNECTIONS = int(os.getenv("API_MAX_CONNECTIONS", "50"))
+    API_MAX_KEEPALIVE_CONNECTIONS = int(
+        os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    API_KEEPALIVE_EXPIRY = float(os.getenv("API_KEEPALIVE_EXPIRY", "30"))
+    API_HTTP2 = os.getenv("API_HTTP2", "false").lower() == "true"
+    # Сколько списков помнить для условных запросов (If-None-Match)
+    API_ETAG_CACHE_SIZE = int(os.getenv("API_ETAG_CACHE_SIZE", "1000"))
+    # За сколько секунд до exp обновлять access-токен бота
+    API_TOKEN_REFRESH_MARGIN = float(os.getenv("API_TOKEN_REFRESH_MARGIN", "300"))
+    # Пауза между попытками получить токен после ошибки
+    API_AUTH_RETRY_DELAY = float(os.getenv("API_AUTH_RETRY_DELAY", "5"))
+    # Кеш задач и категорий пользователя между перерисовками диалогов
+    API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "30"))
+    API_CACHE_MAXSIZE = int(os.getenv("API_CACHE_MAXSIZE", "5000"))
+    # Детали и статистику задач читать через async-представления бэкенда (ASGI)
+    API_ASYNC_READS = os.getenv("API_ASYNC_READS", "false").lower() == "true"
+    # Отдельный ASGI-сервис async-представлений; пусто - тот же API_BASE_URL
+    API_ASYNC_BASE_URL = os.getenv("API_ASYNC_BASE_URL", "")
+
+    # Получение обновлений: "polling" или "webhook" (через Notification API)
+    BOT_MODE = os.getenv("BOT_MODE", "polling")
+    # Публичный адрес бота для Telegram, например https://bot.example.com
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    # Сколько обновлений обрабатывается параллельно и сколько ждет в очереди
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "16"))
+    WEBHOOK_QUEUE_MAXSIZE = int(os.getenv("WEBHOOK_QUEUE_MAXSIZE", "1000"))
+
+    # Хранилище состояний диалогов: "memory" или "redis" (несколько реплик бота)
+    FSM_STORAGE = os.getenv("FSM_STORAGE", "memory")
+    FSM_REDIS_URL = os.getenv("FSM_REDIS_URL", "redis://redis:6379/2")
+    # Через сколько секунд без действий пользователя его диалог удаляется
+    FSM_TTL = int(os.getenv("FSM_TTL", str(7 * 24 * 3600)))
+
+    # Транспорт входящих уведомлений от бэкенда: "http" или "redis"
+    NOTIFICATION_TRANSPORT = os.getenv("NOTIFICATION_TRANSPORT", "http")
+    REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+    NOTIFICATION_STREAM = os.getenv("NOTIFICATION_STREAM", "bot:notifications")
+    NOTIFICATION_GROUP = os.getenv("NOTIFICATION_GROUP", "bot")
+    # Через сколько секунд неподтвержденное уведомление забирается повторно
+    # (дольше возможного ожидания в очереди отправки) и сколько раз
+    NOTIFICATION_CLAIM_IDLE = float(os.getenv("NOTIFICATION_CLAIM_IDLE", "300"))
+    NOTIFICATION_MAX_DELIVERIES = int(os.getenv("NOTIFICATION_MAX_DELIVERIES", "5"))
+    # Некорректные и недоставленные уведомления с причиной ошибки
+    NOTIFICATION_DEAD_LETTER_STREAM = os.getenv(
+        "NOTIFICATION_DEAD_LETTER_STREAM", "bot:notifications:dead"
+    )
+    NOTIFICATION_DEAD_LETTER_MAXLEN = int(
+        os.getenv("NOTIFICATION_DEAD_LETTER_MAXLEN", "10000")
+    )
+
+    # Очередь исходящих сообщений и лимиты Telegram (сообщений в секунду)
+    SEND_QUEUE_MAXSIZE = int(os.getenv("SEND_QUEUE_MAXSIZE", "10000"))
+    SEND_QUEUE_WORKERS = int(os.getenv("SEND_QUEUE_WORKERS", "8"))
+    SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "30"))
+    SEND_GLOBAL_BURST = float(os.getenv("SEND_GLOBAL_BURST", "1"))
+    SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))
+    SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "1"))
+    SEND_MAX_TRACKED_CHATS = int(os.getenv("SEND_MAX_TRACKED_CHATS", "10000"))
+    SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", "5"))
+    SEND_BACKOFF_BASE = float(os.getenv("SEND_BACKOFF_BASE", "1"))
+    SEND_BACKOFF_MAX = float(os.getenv("SEND_BACKOFF_MAX", "30"))
+
     MESSAGES = {
         "welcome": "👋 Добро пожаловать в ToDo Bot!\n\nЗдесь вы можете управлять своими задачами.",
         "error": "❌ Произошла ошибка. Попробуйте позже.",
@@ -7,9 +7,7 @@ from aiogram_dialog.widgets.text import Const, Format
 
 from core.states import CategoryFormStates, CategoryStates, MainMenuStates
 from models.schemas import CreateCategoryRequest
-from services.client_api import APIClient
-
-api_client = APIClient()
+from services.client_api import api_client
 
 
 async def get_title_data(dialog_manager: DialogManager, **kwargs) -> Dict:
@@ -63,7 +61,7 @@ async def on_confirm_create(callback, button, dialog_manager: DialogManager) ->
     result = await api_client.create_category(telegram_id, category_data)
 
     if result:
-        dialog_manager.dialog_data["created_category"] = result
+        dialog_manager.dialog_data["created_category_name"] = result.name
         await dialog_manager.next()
     else:
         await callback.message.answer(
@@ -86,8 +84,9 @@ async def get_confirm_data(dialog_manager: DialogManager, **kwargs) -> Dict:
 
 async def get_success_data(dialog_manager: DialogManager, **kwargs) -> Dict:
     """Данные для окна успешного создания категории"""
-    category = dialog_manager.dialog_data.get("created_category")
-    return {"category_name": category.name if category else ""}
+    return {
+        "category_name": dialog_manager.dialog_data.get("created_category_name", "")
+    }
 
 
 input_name_window = Window(
@@ -5,9 +5,7 @@ from aiogram_dialog.widgets.kbd import Back, Button, Row, ScrollingGroup, Select
 from aiogram_dialog.widgets.text import Const, Format
 
 from core.states import CategoryFormStates, CategoryStates, MainMenuStates
-from services.client_api import APIClient
-
-api_client = APIClient()
+from services.client_api import api_client
 
 
 async def get_categories_list_data(dialog_manager: DialogManager, **kwargs) -> Dict:
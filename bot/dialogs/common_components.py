@@ -2,9 +2,7 @@
 from aiogram_dialog import DialogManager
 
 from core.states import TaskFormStates
-from services.client_api import APIClient
-
-api_client = APIClient()
+from services.client_api import api_client
 
 
 async def on_categories_selected(
@@ -21,7 +19,4 @@ async def on_categories_selected(
 async def get_categories_data(dialog_manager: DialogManager, **kwargs) -> dict:
     telegram_id = dialog_manager.event.from_user.id
     categories = await api_client.get_categories(telegram_id)
-
-    dialog_manager.dialog_data["available_categories"] = categories
-
     return {"categories": categories, "categories_count": len(categories)}
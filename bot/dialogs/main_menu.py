@@ -12,12 +12,11 @@ from core.states import (
     TaskFormStates,
     TaskStates,
 )
-from services.client_api import APIClient
+from services.client_api import api_client
 
 # from states import MainMenuStates, AddCategoryStates, TaskStates, AddTaskStates
 # from api_client import APIClient
 
-api_client = APIClient()
 
 main_menu_window = Window(
     Const("📋 Главное меню ToDo Bot\n\nВыберите действие:"),
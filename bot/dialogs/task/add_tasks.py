@@ -10,11 +10,7 @@ from core.states import TaskFormStates, MainMenuStates
 from dialogs.common_components import get_categories_data, on_categories_selected
 from dialogs.task.edit_tasks import edit_confirm_window
 from models.schemas import CreateTaskRequest
-from services.client_api import APIClient
-
-
-
-api_client = APIClient()
+from services.client_api import api_client
 
 
 async def get_confirm_data(dialog_manager: DialogManager, **kwargs) -> Dict:
@@ -25,7 +21,11 @@ async def get_confirm_data(dialog_manager: DialogManager, **kwargs) -> Dict:
     due_date = dialog_manager.dialog_data.get("task_due_date")
     selected_category_ids = dialog_manager.dialog_data.get("selected_category_ids", [])
 
-    categories = dialog_manager.dialog_data.get("available_categories", [])
+    # В dialog_data только ID, сами категории берутся из кеша APIClient
+    telegram_id = dialog_manager.event.from_user.id
+    categories = (
+        await api_client.get_categories(telegram_id) if selected_category_ids else []
+    )
     selected_categories = [cat for cat in categories if cat.id in selected_category_ids]
     due_date_text = due_date.strftime("%d.%m.%Y %H:%M") if due_date else "Не установлен"
     categories_text = (
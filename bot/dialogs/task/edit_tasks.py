@@ -6,9 +6,7 @@ from aiogram_dialog.widgets.text import Const, Format
 
 from core.states import TaskFormStates
 from models.schemas import UpdateTaskRequest
-from services.client_api import APIClient
-
-api_client = APIClient()
+from services.client_api import api_client
 
 
 async def get_edit_confirm_data(dialog_manager: DialogManager, **kwargs) -> Dict:
@@ -43,8 +41,9 @@ async def get_edit_confirm_data(dialog_manager: DialogManager, **kwargs) -> Dict
     due_date = dialog_manager.dialog_data.get("task_due_date", original_task.due_date)
     selected_category_ids = dialog_manager.dialog_data.get("selected_category_ids")
 
-    categories = dialog_manager.dialog_data.get("available_categories", [])
     if selected_category_ids is not None:
+        # В dialog_data только ID, сами категории берутся из кеша APIClient
+        categories = await api_client.get_categories(telegram_id)
         selected_categories = [
             cat for cat in categories if cat.id in selected_category_ids
         ]
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Dict
 
 from aiogram_dialog import Dialog, DialogManager, Window
@@ -5,14 +6,14 @@ from aiogram_dialog.widgets.kbd import Back, Button, Row, ScrollingGroup, Select
 from aiogram_dialog.widgets.text import Const, Format
 
 from core.states import MainMenuStates, TaskFormStates, TaskStates
-from services.client_api import APIClient
+from services.client_api import api_client
 
 # from api_client import APIClient
 
 
 # from states import TaskStates, MainMenuStates
 
-api_client = APIClient()
+TASKS_PAGE_HEIGHT = 6
 
 
 def format_task(task, index) -> str:
@@ -38,13 +39,21 @@ def format_task(task, index) -> str:
 async def get_tasks_data(dialog_manager: DialogManager, **kwargs) -> Dict:
     """Получает данные задач для отображения в списке"""
     telegram_id = dialog_manager.event.from_user.id
-    tasks = await api_client.get_tasks(telegram_id)
+
+    # Загружаем задачи только до следующей страницы прокрутки включительно
+    page = await dialog_manager.find("task_scroll").get_page()
+    limit = (page + 2) * TASKS_PAGE_HEIGHT
+    tasks, stats = await asyncio.gather(
+        api_client.get_tasks(telegram_id, limit=limit),
+        api_client.get_task_stats(telegram_id),
+    )
 
     return {
         "tasks": tasks,
-        "tasks_count": len(tasks),
-        "completed_count": len([t for t in tasks if t.is_completed]),
-        "pending_count": len([t for t in tasks if not t.is_completed]),
+        "tasks_count": stats.total,
+        "completed_count": stats.completed,
+        "pending_count": stats.pending,
+        "overdue_count": stats.overdue,
     }
 
 
@@ -145,7 +154,8 @@ async def on_back_to_list(callback, button, dialog_manager: DialogManager) -> No
 task_list_window = Window(
     Format(
         "📋 Ваши задачи\n\n"
-        "Всего: {tasks_count} | ✅ Выполнено: {completed_count} | ⏳ Ожидает: {pending_count}\n\n"
+        "Всего: {tasks_count} | ✅ Выполнено: {completed_count} | ⏳ Ожидает: {pending_count}\n"
+        "⚠️ Просрочено: {overdue_count}\n\n"
         "Выберите задачу для просмотра:"
     ),
     ScrollingGroup(
@@ -158,7 +168,7 @@ task_list_window = Window(
         ),
         id="task_scroll",
         width=1,
-        height=6,
+        height=TASKS_PAGE_HEIGHT,
     ),
     Start(Const("⬅️ Назад"), id="back_to_main", state=MainMenuStates.main),
     state=TaskStates.list,
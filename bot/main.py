@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import signal
 
 from aiogram import Bot, Dispatcher
 from aiogram.filters import CommandStart
@@ -11,21 +12,59 @@ from dialogs.category.category import category_list_dialog
 from dialogs.task.add_tasks import add_task_dialog
 from dialogs.task.tasks import tasks_dialog
 
-from services.notification_service import start_notification_api
+from services.client_api import api_client
+from services.fsm_storage import build_events_isolation, build_fsm_storage
+from services.notification_consumer import NotificationStreamConsumer
+from services.notification_service import send_queue_key, start_notification_api
+from services.update_pool import UpdateWorkerPool
 from dialogs.main_menu import main_menu_dialog, start_command
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+async def run_webhook(dp: Dispatcher, bot: Bot, workflow_data: dict) -> None:
+    """Регистрация webhook и ожидание SIGTERM/SIGINT
+
+    Обновления принимает Notification API и обрабатывает UpdateWorkerPool.
+    emit_shutdown вызывает main после остановки пула: он закрывает
+    хранилище состояний, которым пользуются обработчики.
+    """
+    await dp.emit_startup(bot=bot, **workflow_data)
+
+    await bot.set_webhook(
+        url=settings.WEBHOOK_URL + settings.WEBHOOK_PATH,
+        secret_token=settings.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types(),
+    )
+    logger.info(f"Webhook установлен: {settings.WEBHOOK_URL}{settings.WEBHOOK_PATH}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await stop.wait()
+
+
 async def main():
     if not settings.BOT_TOKEN:
         raise ValueError("BOT_TOKEN не установлен в переменных окружения")
+    if settings.BOT_MODE not in ("polling", "webhook"):
+        raise ValueError(f"Неизвестный BOT_MODE: {settings.BOT_MODE}")
+    if settings.BOT_MODE == "webhook" and not (
+        settings.WEBHOOK_URL and settings.WEBHOOK_SECRET
+    ):
+        raise ValueError("Для BOT_MODE=webhook нужны WEBHOOK_URL и WEBHOOK_SECRET")
 
     bot = Bot(token=settings.BOT_TOKEN)
-    dp = Dispatcher()
+    storage = build_fsm_storage()
+    dp = Dispatcher(storage=storage, events_isolation=build_events_isolation(storage))
+
+    update_pool = None
+    if settings.BOT_MODE == "webhook":
+        update_pool = UpdateWorkerPool(dp, bot)
 
-    await start_notification_api()
     dp.message.register(start_command, CommandStart())
 
     dp.include_router(main_menu_dialog)
@@ -36,12 +75,39 @@ async def main():
 
     setup_dialogs(dp)
 
+    # Webhook начинает принимать обновления, когда роутеры уже подключены
+    await api_client.start()
+    runner = await start_notification_api(bot, update_pool)
+
+    stream_consumer = None
+    if settings.NOTIFICATION_TRANSPORT == "redis":
+        stream_consumer = NotificationStreamConsumer(runner.app[send_queue_key])
+        await stream_consumer.start()
+
     logger.info("Бот запущен!")
 
+    workflow_data = {"dispatcher": dp, "bots": [bot], **dp.workflow_data}
     try:
-        await dp.start_polling(bot)
+        if update_pool is None:
+            # Telegram отдает обновления getUpdates только одному клиенту:
+            # в режиме polling бот работает в одном экземпляре. Сессию бота
+            # закрывает Notification API после очереди отправки
+            await dp.start_polling(bot, close_bot_session=False)
+        else:
+            await run_webhook(dp, bot, workflow_data)
     finally:
-        await bot.session.close()
+        # Сначала прекращается прием уведомлений и обновлений, затем пул
+        # обновлений и очередь отправки дорабатывают принятое (runner.cleanup),
+        # потом закрывается хранилище состояний, клиент бэкенда - последним
+        if stream_consumer:
+            await stream_consumer.stop()
+        await runner.cleanup()
+        if stream_consumer:
+            await stream_consumer.close()
+        if update_pool is not None:
+            await dp.emit_shutdown(bot=bot, **workflow_data)
+        await dp.storage.close()
+        await api_client.close()
 
 
 if __name__ == "__main__":
@@ -25,6 +25,15 @@ class Task(BaseModel):
     telegram_user_id: int
 
 
+class TaskStats(BaseModel):
+    """Количество задач по статусам"""
+
+    total: int = 0
+    completed: int = 0
+    pending: int = 0
+    overdue: int = 0
+
+
 class CreateTaskRequest(BaseModel):
     """Запрос на создание задачи"""
 
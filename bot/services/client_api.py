@@ -1,5 +1,12 @@
+import asyncio
+import base64
+import functools
+import json
 import logging
-from typing import List, Optional
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional, Tuple
 
 import httpx
 
@@ -9,34 +16,292 @@ from models.schemas import (
     CreateCategoryRequest,
     CreateTaskRequest,
     Task,
+    TaskStats,
     UpdateTaskRequest,
 )
+from services.metrics import API_REQUEST_DURATION, endpoint_label
+from services.ttl_cache import UserTTLCache
 
 logger = logging.getLogger(__name__)
 
 
+class APIError(Exception):
+    """Бэкенд не отдал данные: ошибка аутентификации или статус ответа"""
+
+
+def invalidates_cache(method):
+    """Мутация: после запроса сбрасывает кеш чтения пользователя"""
+
+    @functools.wraps(method)
+    async def wrapper(self, telegram_id: int, *args, **kwargs):
+        try:
+            return await method(self, telegram_id, *args, **kwargs)
+        finally:
+            self._cache.invalidate_user(telegram_id)
+
+    return wrapper
+
+
 class APIClient:
     def __init__(self):
         self.base_url = settings.API_BASE_URL
         self.timeout = settings.API_TIMEOUT
         self.access_token = None
+        self.refresh_token = None
         self.bot_user_id = "telegram_bot_user"  # системный пользователь
+        self.reads_prefix = (
+            f"{settings.API_ASYNC_BASE_URL.rstrip('/')}/api/async"
+            if settings.API_ASYNC_READS
+            else "/api"
+        )
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._requests_total = 0
+        self._requests_in_flight = 0
+        self._errors_total = 0
+
+        # ETag и тело последнего ответа списков для условных запросов
+        self._etags: "OrderedDict[str, Tuple[str, dict]]" = OrderedDict()
+        # Задачи и категории между перерисовками диалогов
+        self._cache = UserTTLCache(settings.API_CACHE_MAXSIZE, settings.API_CACHE_TTL)
+
+        # Токен запрашивает только один вызов, остальные ждут его результата
+        self._auth_lock = asyncio.Lock()
+        self._access_expires_at = 0.0
+        self._auth_retry_at = 0.0
+
+    async def start(self) -> None:
+        """Открывает общий пул соединений к бэкенду"""
+        if self._client is not None:
+            return
+
+        http2 = settings.API_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("Пакет h2 не установлен, HTTP/2 отключен")
+                http2 = False
+
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.API_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.API_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.API_KEEPALIVE_EXPIRY,
+            ),
+        )
+        logger.info(f"HTTP клиент API запущен (HTTP/2: {http2})")
+
+    async def close(self) -> None:
+        """Закрывает пул соединений"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("HTTP клиент API остановлен")
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Запрос к бэкенду через общий пул соединений
+
+        На 401 токен обновляется и запрос повторяется один раз.
+        """
+        client = await self._get_client()
+        extra_headers = kwargs.pop("headers", {})
+
+        self._requests_total += 1
+        self._requests_in_flight += 1
+        started = time.perf_counter()
+        status = "error"
+        try:
+            token = self.access_token
+            response = await client.request(
+                method, path, headers={**self._get_headers(), **extra_headers}, **kwargs
+            )
+            if response.status_code == 401 and token is not None:
+                self._expire_token(token)
+                if await self._ensure_authenticated():
+                    logger.info(f"Повтор запроса {method} {path} с новым токеном")
+                    response = await client.request(
+                        method,
+                        path,
+                        headers={**self._get_headers(), **extra_headers},
+                        **kwargs,
+                    )
+            status = response.status_code
+            return response
+        except Exception:
+            self._errors_total += 1
+            raise
+        finally:
+            self._requests_in_flight -= 1
+            API_REQUEST_DURATION.labels(method, endpoint_label(path), status).observe(
+                time.perf_counter() - started
+            )
+
+    async def _get_json(self, path: str, params: dict) -> Tuple[int, Optional[dict]]:
+        """GET с If-None-Match: на 304 возвращается ранее полученное тело"""
+        cache_key = f"{path}?{sorted(params.items())}"
+        cached = self._etags.get(cache_key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        # Пустой params в httpx стирает query-строку готовой ссылки (next)
+        response = await self._request(
+            "GET", path, params=params or None, headers=headers
+        )
+
+        if response.status_code == 304 and cached:
+            self._etags.move_to_end(cache_key)
+            return 200, cached[1]
+
+        if response.status_code != 200:
+            return response.status_code, None
+
+        data = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etags[cache_key] = (etag, data)
+            self._etags.move_to_end(cache_key)
+            while len(self._etags) > settings.API_ETAG_CACHE_SIZE:
+                self._etags.popitem(last=False)
+        return 200, data
+
+    async def _iter_pages(self, path: str, params: dict) -> AsyncIterator[list]:
+        """Ленивый обход курсорной пагинации по ссылкам next
+
+        Ошибка любой страницы поднимает APIError, чтобы неполный список
+        не выглядел как весь.
+        """
+        url = path
+        while url:
+            status_code, data = await self._get_json(url, params)
+            if status_code != 200:
+                raise APIError(f"ошибка получения страницы {url}: статус {status_code}")
+
+            yield data.get("results", [])
+
+            # Ссылка next уже содержит все параметры запроса и курсор
+            url, params = data.get("next"), {}
+
+    def pool_stats(self) -> dict:
+        """Метрики использования пула соединений"""
+        connections = []
+        if self._client is not None:
+            # httpx не даёт публичного доступа к пулу httpcore
+            pool = getattr(self._client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+
+        return {
+            "requests_total": self._requests_total,
+            "requests_in_flight": self._requests_in_flight,
+            "errors_total": self._errors_total,
+            "connections": len(connections),
+            "idle_connections": len([c for c in connections if c.is_idle()]),
+            "max_connections": settings.API_MAX_CONNECTIONS,
+            "read_cache": self._cache.stats(),
+        }
 
     async def _ensure_authenticated(self) -> bool:
-        """Обеспечивает аутентификацию бота"""
-        if self.access_token:
+        """Обеспечивает аутентификацию бота
+
+        Access-токен обновляется за API_TOKEN_REFRESH_MARGIN секунд до exp.
+        Обновление выполняет один вызов под блокировкой, остальные ждут его.
+        """
+        if self._token_is_fresh():
             return True
+
+        async with self._auth_lock:
+            # Пока ждали блокировку, токен мог обновить другой вызов
+            if self._token_is_fresh():
+                return True
+
+            now = time.time()
+            if now < self._auth_retry_at:
+                # После неудачи не долбим бэкенд, пока старый токен еще жив
+                return self.access_token is not None and now < self._access_expires_at
+
+            if await self._refresh_access_token() or await self._fetch_tokens():
+                self._auth_retry_at = 0.0
+                return True
+
+            self._auth_retry_at = now + settings.API_AUTH_RETRY_DELAY
+            if self.access_token is not None and now < self._access_expires_at:
+                logger.warning("Не удалось обновить токен, используется текущий")
+                return True
+            return False
+
+    def _token_is_fresh(self) -> bool:
+        return (
+            self.access_token is not None
+            and time.time()
+            < self._access_expires_at - settings.API_TOKEN_REFRESH_MARGIN
+        )
+
+    def _expire_token(self, token: str) -> None:
+        """Помечает токен просроченным, если его еще никто не заменил"""
+        if self.access_token == token:
+            self._access_expires_at = 0.0
+
+    def _set_access_token(self, token: str) -> None:
+        self.access_token = token
+        self._access_expires_at = self._token_expiry(token)
+
+    @staticmethod
+    def _token_expiry(token: str) -> float:
+        """Время exp из JWT (подпись проверяет бэкенд)"""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            logger.warning("Не удалось прочитать exp из токена")
+            return float("inf")
+
+    async def _refresh_access_token(self) -> bool:
+        """Новый access-токен по refresh-токену"""
+        if self.refresh_token is None:
+            return False
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}/api/bot/token/")
-                if response.status_code == 200:
-                    tokens = response.json()
-                    self.access_token = tokens["access"]
-                    logger.info("Бот успешно аутентифицирован")
-                    return True
-                else:
-                    logger.error(f"Ошибка аутентификации бота: {response.status_code}")
-                    return False
+            client = await self._get_client()
+            response = await client.post(
+                "/api/bot/token/refresh/", json={"refresh": self.refresh_token}
+            )
+            if response.status_code == 200:
+                tokens = response.json()
+                self._set_access_token(tokens["access"])
+                self.refresh_token = tokens.get("refresh", self.refresh_token)
+                logger.info("Токен бота обновлен")
+                return True
+
+            logger.warning(f"Ошибка обновления токена бота: {response.status_code}")
+            if response.status_code == 401:
+                # Refresh-токен истек, нужна новая пара
+                self.refresh_token = None
+
+        except Exception as e:
+            logger.error(f"Ошибка при обновлении токена бота: {e}")
+        return False
+
+    async def _fetch_tokens(self) -> bool:
+        """Новая пара токенов для системного пользователя бота"""
+        try:
+            client = await self._get_client()
+            response = await client.get("/api/bot/token/")
+            if response.status_code == 200:
+                tokens = response.json()
+                self._set_access_token(tokens["access"])
+                self.refresh_token = tokens.get("refresh")
+                logger.info("Бот успешно аутентифицирован")
+                return True
+            else:
+                logger.error(f"Ошибка аутентификации бота: {response.status_code}")
+                return False
 
         except Exception as e:
             logger.error(f"Ошибка при аутентификации бота: {e}")
@@ -57,33 +322,32 @@ class APIClient:
         last_name: str = None,
     ) -> bool:
         """Регистрация Telegram пользователя в системе"""
-        print('hello')
+        print("hello")
         if not await self._ensure_authenticated():
             return False
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/bot/register-user/",
-                    headers=self._get_headers(),
-                    json={
-                        "telegram_user_id": telegram_id,
-                        "chat_id": telegram_id,
-                        "username": username,
-                        "first_name": first_name,
-                        "last_name": last_name,
-                    },
+            response = await self._request(
+                "POST",
+                "/api/bot/register-user/",
+                json={
+                    "telegram_user_id": telegram_id,
+                    "chat_id": telegram_id,
+                    "username": username,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                },
+            )
+            if response.status_code in [200, 201]:
+                data = response.json()
+                logger.info(f"Telegram пользователь зарегистрирован: {data}")
+                return True
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка регистрации Telegram пользователя: {response.status_code} - {error_text}"
                 )
-                if response.status_code in [200, 201]:
-                    data = response.json()
-                    logger.info(f"Telegram пользователь зарегистрирован: {data}")
-                    return True
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка регистрации Telegram пользователя: {response.status_code} - {error_text}"
-                    )
-                    return False
+                return False
 
         except httpx.TimeoutException:
             logger.error("Таймаут при регистрации Telegram пользователя")
@@ -92,73 +356,135 @@ class APIClient:
             logger.error(f"Неожиданная ошибка при регистрации: {e}")
             return False
 
+    async def iter_tasks(
+        self,
+        telegram_id: int,
+        completed: Optional[bool] = None,
+        page_size: Optional[int] = None,
+    ) -> AsyncIterator[Task]:
+        """Ленивый обход всех задач пользователя постранично"""
+        if not await self._ensure_authenticated():
+            raise APIError("не удалось получить токен бота")
+
+        params = {"telegram_user_id": str(telegram_id)}
+        if completed is not None:
+            params["completed"] = str(completed).lower()
+        if page_size is not None:
+            params["page_size"] = str(page_size)
+
+        async with aclosing(self._iter_pages("/api/tasks/", params)) as pages:
+            async for page in pages:
+                for task in page:
+                    yield Task(**task)
+
     async def get_tasks(
-        self, telegram_id: int, completed: Optional[bool] = None
+        self,
+        telegram_id: int,
+        completed: Optional[bool] = None,
+        limit: Optional[int] = None,
     ) -> List[Task]:
-        """Получение задач для конкретного Telegram пользователя"""
-        if not await self._ensure_authenticated():
-            return []
+        """Получение задач для конкретного Telegram пользователя
 
-        try:
-            params = {"telegram_user_id": str(telegram_id)}
-            if completed is not None:
-                params["completed"] = str(completed).lower()
-
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/tasks/",
-                    headers=self._get_headers(),
-                    params=params,
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    tasks_data = data.get("results", [])
-                    tasks = [Task(**task) for task in tasks_data]
-                    logger.info(
-                        f"Получено {len(tasks)} задач для Telegram пользователя {telegram_id}"
-                    )
-                    return tasks
-                elif response.status_code == 404:
-                    logger.warning(f"Telegram пользователь {telegram_id} не найден")
-                    return []
-                else:
-                    logger.error(
-                        f"Ошибка получения задач: статус {response.status_code}"
-                    )
-                    return []
+        Без limit загружаются все страницы, с limit - только нужные.
+        """
+        key = (telegram_id, "tasks", completed, limit)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        generation = self._cache.generation(telegram_id)
 
+        tasks = []
+        try:
+            page_size = min(limit, 100) if limit else None
+            async with aclosing(
+                self.iter_tasks(telegram_id, completed, page_size)
+            ) as iterator:
+                async for task in iterator:
+                    tasks.append(task)
+                    if limit is not None and len(tasks) >= limit:
+                        break
+
+            logger.info(
+                f"Получено {len(tasks)} задач для Telegram пользователя {telegram_id}"
+            )
+            self._cache.set(key, tuple(tasks), generation)
+            for task in tasks:
+                self._cache.set((telegram_id, "task", task.id), task, generation)
+
+        except APIError as e:
+            # Неполный список в кеш не попадает
+            logger.error(f"Не получены задачи пользователя {telegram_id}: {e}")
         except httpx.TimeoutException:
             logger.error(f"Таймаут при получении задач для пользователя {telegram_id}")
-            return []
         except Exception as e:
             logger.error(f"Неожиданная ошибка при получении задач: {e}")
-            return []
+
+        return tasks
+
+    async def get_task_stats(self, telegram_id: int) -> TaskStats:
+        """Количество задач по статусам, считается на стороне API"""
+        key = (telegram_id, "stats")
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(telegram_id)
+
+        if not await self._ensure_authenticated():
+            return TaskStats()
+
+        try:
+            status, data = await self._get_json(
+                f"{self.reads_prefix}/tasks/stats/",
+                {"telegram_user_id": str(telegram_id)},
+            )
+            if status == 200:
+                stats = TaskStats(**data)
+                self._cache.set(key, stats, generation)
+                return stats
+            logger.error(f"Ошибка получения статистики задач: {status}")
+
+        except httpx.TimeoutException:
+            logger.error(
+                f"Таймаут при получении статистики задач пользователя {telegram_id}"
+            )
+        except Exception as e:
+            logger.error(f"Неожиданная ошибка при получении статистики задач: {e}")
+
+        return TaskStats()
 
     async def get_task_detail(self, telegram_id: int, task_id: str) -> Optional[Task]:
         """Получение деталей конкретной задачи"""
+        key = (telegram_id, "task", str(task_id))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(telegram_id)
+
         if not await self._ensure_authenticated():
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/tasks/{task_id}/",
-                    headers=self._get_headers(),
-                    params={"telegram_user_id": telegram_id},
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"Получены детали задачи: {data.get('title')}")
-                    return Task(**data)
-                else:
-                    logger.error(f"Ошибка получения задачи: {response.status_code}")
-                    return None
+            response = await self._request(
+                "GET",
+                f"{self.reads_prefix}/tasks/{task_id}/",
+                params={"telegram_user_id": telegram_id},
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Получены детали задачи: {data.get('title')}")
+                task = Task(**data)
+                self._cache.set(key, task, generation)
+                return task
+            else:
+                logger.error(f"Ошибка получения задачи: {response.status_code}")
+                return None
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при получении задачи: {e}")
             return None
 
+    @invalidates_cache
     async def update_task(
         self, telegram_id: int, task_id: str, task_data: UpdateTaskRequest
     ) -> bool:
@@ -178,23 +504,22 @@ class APIClient:
                 "category_ids": task_data.category_ids or [],
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.patch(
-                    f"{self.base_url}/api/tasks/{task_id}/",
-                    headers=self._get_headers(),
-                    json=api_task_data,
+            response = await self._request(
+                "PATCH",
+                f"/api/tasks/{task_id}/",
+                json=api_task_data,
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Задача обновлена: {data.get('title')}")
+                return True
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка обновления задачи: {response.status_code} - {error_text}"
                 )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"Задача обновлена: {data.get('title')}")
-                    return True
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка обновления задачи: {response.status_code} - {error_text}"
-                    )
-                    return False
+                return False
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при обновлении задачи: {e}")
@@ -202,62 +527,73 @@ class APIClient:
 
     async def get_categories(self, telegram_id: int) -> List[Category]:
         """Получение категорий (теперь через системного пользователя)"""
+        key = (telegram_id, "categories")
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+        generation = self._cache.generation(telegram_id)
+
         if not await self._ensure_authenticated():
             return []
 
+        categories = []
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/categories/",
-                    headers=self._get_headers(),
-                    params={"telegram_user_id": str(telegram_id)},
+            pages = self._iter_pages(
+                "/api/categories/", {"telegram_user_id": str(telegram_id)}
+            )
+            async for page in pages:
+                categories.extend(Category(**category) for category in page)
+            logger.info(f"Получено {len(categories)} категорий")
+            self._cache.set(key, tuple(categories), generation)
+            for category in categories:
+                self._cache.set(
+                    (telegram_id, "category", category.id), category, generation
                 )
-                if response.status_code == 200:
-                    data = response.json()
-                    categories_data = data.get("results", data)
-                    categories = [Category(**category) for category in categories_data]
-                    logger.info(f"Получено {len(categories)} категорий")
-                    return categories
-                else:
-                    logger.error(
-                        f"Ошибка получения категорий: статус {response.status_code}"
-                    )
-                    return []
 
+        except APIError as e:
+            logger.error(f"Не получены категории пользователя {telegram_id}: {e}")
         except httpx.TimeoutException:
             logger.error("Таймаут при получении категорий")
-            return []
         except Exception as e:
             logger.error(f"Неожиданная ошибка при получении категорий: {e}")
-            return []
+
+        return categories
 
     async def get_category_detail(
         self, telegram_id: int, category_id: str
     ) -> Optional[Category]:
         """Получение деталей конкретной задачи"""
+        key = (telegram_id, "category", str(category_id))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(telegram_id)
+
         if not await self._ensure_authenticated():
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.base_url}/api/categories/{category_id}/",
-                    headers=self._get_headers(),
-                    params={"telegram_user_id": telegram_id},
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"Получены детали категории: {data.get('title')}")
-                    return Category(**data)
-                else:
-                    logger.error(f"Ошибка получения категории: {response.status_code}")
-                    return None
+            response = await self._request(
+                "GET",
+                f"/api/categories/{category_id}/",
+                params={"telegram_user_id": telegram_id},
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Получены детали категории: {data.get('title')}")
+                category = Category(**data)
+                self._cache.set(key, category, generation)
+                return category
+            else:
+                logger.error(f"Ошибка получения категории: {response.status_code}")
+                return None
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при получении категории: {e}")
             return None
 
+    @invalidates_cache
     async def update_category(
         self, telegram_id: int, category_id: str, category_data: CreateCategoryRequest
     ) -> bool:
@@ -272,53 +608,53 @@ class APIClient:
             # api_data = category_data.model_dump()
             # api_data['telegram_user_id'] = telegram_id
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.patch(
-                    f"{self.base_url}/api/categories/{category_id}/",
-                    headers=self._get_headers(),
-                    json=api_task_data,
+            response = await self._request(
+                "PATCH",
+                f"/api/categories/{category_id}/",
+                json=api_task_data,
+            )
+            if response.status_code == 200:
+                logger.info(f"Категория обновлена: {category_data.name}")
+                return True
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка обновления категории: {response.status_code} - {error_text}"
                 )
-                if response.status_code == 200:
-                    logger.info(f"Категория обновлена: {category_data.name}")
-                    return True
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка обновления категории: {response.status_code} - {error_text}"
-                    )
-                    return False
+                return False
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при обновлении категории: {e}")
             return False
 
+    @invalidates_cache
     async def delete_category(self, telegram_id: int, category_id: str) -> bool:
         """Удаление категории"""
         if not await self._ensure_authenticated():
             return False
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.delete(
-                    f"{self.base_url}/api/categories/{category_id}/",
-                    headers=self._get_headers(),
-                    params={"telegram_user_id": telegram_id},
+            response = await self._request(
+                "DELETE",
+                f"/api/categories/{category_id}/",
+                params={"telegram_user_id": telegram_id},
+            )
+
+            if response.status_code == 204:
+                logger.info(f"Категория {category_id} удалена")
+                return True
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка удаления категории: {response.status_code} - {error_text}"
                 )
-
-                if response.status_code == 204:
-                    logger.info(f"Категория {category_id} удалена")
-                    return True
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка удаления категории: {response.status_code} - {error_text}"
-                    )
-                    return False
+                return False
 
         except Exception as e:
             logger.error(f"Неожиданная ошибка при удалении категории: {e}")
             return False
 
+    @invalidates_cache
     async def create_task(self, telegram_id: int, task_data: CreateTaskRequest) -> bool:
         """Создание задачи для конкретного Telegram пользователя"""
         if not await self._ensure_authenticated():
@@ -336,29 +672,28 @@ class APIClient:
                 "category_ids": task_data.category_ids or [],
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/tasks/",
-                    headers=self._get_headers(),
-                    json=api_task_data,
-                )
+            response = await self._request(
+                "POST",
+                "/api/tasks/",
+                json=api_task_data,
+            )
 
-                if response.status_code == 201:
-                    data = response.json()
-                    logger.info(
-                        f"Задача создана: {data.get('title')} (ID: {data.get('task_id')})"
-                    )
-                    # Создаем объект Task из ответа
-                    return True
-                elif response.status_code == 404:
-                    logger.error(f"Telegram пользователь {telegram_id} не найден")
-                    return False
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка создания задачи: статус {response.status_code} - {error_text}"
-                    )
-                    return False
+            if response.status_code == 201:
+                data = response.json()
+                logger.info(
+                    f"Задача создана: {data.get('title')} (ID: {data.get('task_id')})"
+                )
+                # Создаем объект Task из ответа
+                return True
+            elif response.status_code == 404:
+                logger.error(f"Telegram пользователь {telegram_id} не найден")
+                return False
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка создания задачи: статус {response.status_code} - {error_text}"
+                )
+                return False
 
         except httpx.TimeoutException:
             logger.error(f"Таймаут при создании задачи для пользователя {telegram_id}")
@@ -367,6 +702,7 @@ class APIClient:
             logger.error(f"Неожиданная ошибка при создании задачи: {e}")
             return False
 
+    @invalidates_cache
     async def create_category(
         self, telegram_id: int, category_data: CreateCategoryRequest
     ) -> Optional[Category]:
@@ -376,23 +712,22 @@ class APIClient:
         try:
             api_data = category_data.model_dump()
             api_data["telegram_user_id"] = telegram_id
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/categories/",
-                    headers=self._get_headers(),
-                    json=api_data,
+            response = await self._request(
+                "POST",
+                "/api/categories/",
+                json=api_data,
+            )
+
+            if response.status_code == 201:
+                data = response.json()
+                logger.info(f"Категория создана: {data.get('name')}")
+                return Category(**data)
+            else:
+                error_text = response.text
+                logger.error(
+                    f"Ошибка создания категории: статус {response.status_code} - {error_text}"
                 )
-
-                if response.status_code == 201:
-                    data = response.json()
-                    logger.info(f"Категория создана: {data.get('name')}")
-                    return Category(**data)
-                else:
-                    error_text = response.text
-                    logger.error(
-                        f"Ошибка создания категории: статус {response.status_code} - {error_text}"
-                    )
-                    return None
+                return None
 
         except httpx.TimeoutException:
             logger.error("Таймаут при создании категории")
@@ -401,6 +736,7 @@ class APIClient:
             logger.error(f"Неожиданная ошибка при создании категории: {e}")
             return None
 
+    @invalidates_cache
     async def toggle_task_completion(
         self, telegram_id: int, task_id: str
     ) -> Optional[Task]:
@@ -409,25 +745,24 @@ class APIClient:
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/tasks/{task_id}/toggle_complete/",
-                    headers=self._get_headers(),
-                    json={"telegram_user_id": telegram_id},
+            response = await self._request(
+                "POST",
+                f"/api/tasks/{task_id}/toggle_complete/",
+                json={"telegram_user_id": telegram_id},
+            )
+
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"Статус задачи обновлен: {data.get('title')}")
+                return Task(**data)
+            elif response.status_code == 404:
+                logger.error(
+                    f"Задача {task_id} не найдена для пользователя {telegram_id}"
                 )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    logger.info(f"Статус задачи обновлен: {data.get('title')}")
-                    return Task(**data)
-                elif response.status_code == 404:
-                    logger.error(
-                        f"Задача {task_id} не найдена для пользователя {telegram_id}"
-                    )
-                    return None
-                else:
-                    logger.error(f"Ошибка переключения задачи: {response.status_code}")
-                    return None
+                return None
+            else:
+                logger.error(f"Ошибка переключения задачи: {response.status_code}")
+                return None
 
         except httpx.TimeoutException:
             logger.error("Таймаут при переключении статуса задачи")
@@ -436,26 +771,26 @@ class APIClient:
             logger.error(f"Исключение в toggle_task_completion: {e}")
             return None
 
+    @invalidates_cache
     async def delete_task(self, telegram_id: int, task_id: str) -> bool:
         """Удаление задачи"""
         if not await self._ensure_authenticated():
             return False
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.delete(
-                    f"{self.base_url}/api/tasks/{task_id}/",
-                    headers=self._get_headers(),
-                )
-
-                if response.status_code == 204:
-                    logger.info(f"Задача {task_id} удалена")
-                    return True
-                elif response.status_code == 404:
-                    logger.warning(f"Задача {task_id} не найдена")
-                    return False
-                else:
-                    logger.error(f"Ошибка удаления задачи: {response.status_code}")
-                    return False
+            response = await self._request(
+                "DELETE",
+                f"/api/tasks/{task_id}/",
+            )
+
+            if response.status_code == 204:
+                logger.info(f"Задача {task_id} удалена")
+                return True
+            elif response.status_code == 404:
+                logger.warning(f"Задача {task_id} не найдена")
+                return False
+            else:
+                logger.error(f"Ошибка удаления задачи: {response.status_code}")
+                return False
 
         except httpx.TimeoutException:
             logger.error("Таймаут при удалении задачи")
@@ -463,3 +798,6 @@ class APIClient:
         except Exception as e:
             logger.error(f"Ошибка при удалении задачи: {e}")
             return False
+
+
+api_client = APIClient()
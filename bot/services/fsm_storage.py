@@ -0,0 +1,71 @@
+import json
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Optional
+
+from aiogram.fsm.storage.base import (
+    BaseEventIsolation,
+    BaseStorage,
+    DefaultKeyBuilder,
+)
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+DATETIME_KEY = "__dt__"
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {DATETIME_KEY: value.isoformat()}
+    raise TypeError(f"Значение {type(value).__name__} нельзя сохранить в FSM")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1 and DATETIME_KEY in obj:
+        return datetime.fromisoformat(obj[DATETIME_KEY])
+    return obj
+
+
+# Компактный JSON: datetime (срок задачи в dialog_data) сохраняется строкой ISO,
+# остальное - только примитивы, без pydantic-объектов
+dumps = partial(json.dumps, default=_encode, ensure_ascii=False, separators=(",", ":"))
+loads = partial(json.loads, object_hook=_decode)
+
+
+def build_fsm_storage() -> BaseStorage:
+    """Хранилище состояний и стеков диалогов по FSM_STORAGE: memory или redis"""
+    if settings.FSM_STORAGE == "memory":
+        return MemoryStorage()
+
+    if settings.FSM_STORAGE == "redis":
+        from aiogram.fsm.storage.redis import RedisStorage
+
+        # aiogram_dialog хранит стеки под отдельными ключами (destiny)
+        storage = RedisStorage.from_url(
+            settings.FSM_REDIS_URL,
+            key_builder=DefaultKeyBuilder(with_destiny=True),
+            state_ttl=settings.FSM_TTL,
+            data_ttl=settings.FSM_TTL,
+            json_dumps=dumps,
+            json_loads=loads,
+        )
+        logger.info(f"Состояния диалогов хранятся в Redis (TTL {settings.FSM_TTL} с)")
+        return storage
+
+    raise ValueError(f"Неизвестный FSM_STORAGE: {settings.FSM_STORAGE}")
+
+
+def build_events_isolation(storage: BaseStorage) -> Optional[BaseEventIsolation]:
+    """Блокировка обработки событий одного пользователя в Redis
+
+    С общим хранилищем обновления одного чата могут одновременно попасть в
+    разные реплики бота (webhook за балансировщиком): без блокировки они
+    перезапишут состояние и стек диалога друг друга.
+    """
+    if settings.FSM_STORAGE == "redis":
+        return storage.create_isolation()
+    return None
@@ -0,0 +1,63 @@
+import re
+import time
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+API_REQUEST_DURATION = Histogram(
+    "bot_api_request_duration_seconds",
+    "Время запроса APIClient к бэкенду",
+    ["method", "endpoint", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SEND_DURATION = Histogram(
+    "bot_send_duration_seconds",
+    "Время отправки сообщения в Telegram",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SEND_RESULTS = Counter(
+    "bot_send_total",
+    "Попытки отправки сообщений в Telegram по результату",
+    ["result"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "bot_http_request_duration_seconds",
+    "Время обработки запроса к HTTP API бота",
+    ["method", "route", "status"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(url: str) -> str:
+    """Путь запроса (в том числе ссылки next) без ID и query-строки"""
+    return _ID_SEGMENT.sub("/{id}", urlsplit(url).path)
+
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Время ответа по маршруту (шаблону пути) HTTP API бота"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        resource = request.match_info.route.resource
+        route = resource.canonical if resource is not None else "unmatched"
+        HTTP_REQUEST_DURATION.labels(request.method, route, status).observe(
+            time.perf_counter() - started
+        )
+
+
+async def metrics_handler(request):
+    """Метрики в текстовом формате Prometheus"""
+    return web.Response(
+        body=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST}
+    )
@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import socket
+from typing import Set
+
+from redis import asyncio as aioredis
+from redis.exceptions import ResponseError
+
+from config.settings import settings
+from services.send_queue import FAILED, RETRY, SendQueue
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationStreamConsumer:
+    """Чтение уведомлений бэкенда из Redis Stream через consumer group
+
+    Запись подтверждается (XACK) после итога отправки в Telegram: сообщение
+    отправлено или Telegram отказал окончательно. При временной ошибке
+    запись остается в pending, и через NOTIFICATION_CLAIM_IDLE секунд ее
+    забирает XAUTOCLAIM этого или другого экземпляра бота. Записи, которые
+    нельзя разобрать или не удалось доставить за NOTIFICATION_MAX_DELIVERIES
+    попыток, переносятся в dead-letter стрим.
+    """
+
+    def __init__(
+        self, send_queue: SendQueue, batch_size: int = 100, block_ms: int = 5000
+    ):
+        self.send_queue = send_queue
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.stream = settings.NOTIFICATION_STREAM
+        self.group = settings.NOTIFICATION_GROUP
+        self.dead_letter_stream = settings.NOTIFICATION_DEAD_LETTER_STREAM
+        self.claim_idle_ms = int(settings.NOTIFICATION_CLAIM_IDLE * 1000)
+        self.max_deliveries = settings.NOTIFICATION_MAX_DELIVERIES
+        self.consumer = socket.gethostname()
+        self.redis = aioredis.from_url(settings.REDIS_URL)
+        self._task = None
+        # Записи в очереди отправки, XAUTOCLAIM не должен брать их повторно
+        self._in_flight: Set[bytes] = set()
+        self._acks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        try:
+            await self.redis.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            # Группа уже создана другим экземпляром бота
+            if "BUSYGROUP" not in str(e):
+                raise
+
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Чтение уведомлений из Redis Stream {self.stream} запущено")
+
+    async def stop(self) -> None:
+        """Остановка чтения стрима; подтверждения ждут итогов очереди отправки"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Подтверждение отправленных записей и закрытие соединения с Redis
+
+        Вызывается после остановки очереди отправки, когда у переданных ей
+        записей уже есть итог. Неподтвержденные записи остаются в pending.
+        """
+        if self._acks:
+            _, pending = await asyncio.wait(set(self._acks), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.redis.aclose()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Первым делом забираем зависшие записи, в том числе свои до рестарта
+        next_claim = 0.0
+        while True:
+            try:
+                if loop.time() >= next_claim:
+                    await self._reclaim()
+                    next_claim = loop.time() + self.claim_idle_ms / 1000
+
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {self.stream: ">"},
+                    count=self.batch_size,
+                    block=self.block_ms,
+                )
+                for entry_id, fields in response[0][1] if response else []:
+                    await self._handle(entry_id, fields)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения Redis Stream {self.stream}: {e}")
+                await asyncio.sleep(1)
+
+    async def _reclaim(self) -> None:
+        """Повторная обработка записей, зависших в pending (XAUTOCLAIM)"""
+        start_id = "0-0"
+        while True:
+            response = await self.redis.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer,
+                self.claim_idle_ms,
+                start_id=start_id,
+                count=self.batch_size,
+            )
+            start_id, claimed = response[0], response[1]
+            # Записи, удаленные из стрима (MAXLEN), приходят без данных
+            entries = [
+                (entry_id, fields)
+                for entry_id, fields in claimed
+                if entry_id is not None and entry_id not in self._in_flight
+            ]
+
+            if entries:
+                pending = await self.redis.xpending_range(
+                    self.stream,
+                    self.group,
+                    min=entries[0][0],
+                    max=entries[-1][0],
+                    count=len(claimed),
+                    consumername=self.consumer,
+                )
+                deliveries = {
+                    item["message_id"]: item["times_delivered"] for item in pending
+                }
+                for entry_id, fields in entries:
+                    if deliveries.get(entry_id, 0) > self.max_deliveries:
+                        await self._dead_letter(
+                            entry_id,
+                            fields,
+                            f"не доставлено за {self.max_deliveries} попыток",
+                        )
+                    else:
+                        await self._handle(entry_id, fields)
+
+            if start_id in (b"0-0", "0-0"):
+                return
+
+    async def _handle(self, entry_id, fields: dict) -> None:
+        try:
+            telegram_id = int(fields[b"telegram_id"])
+            message = fields[b"message"].decode()
+        except (KeyError, TypeError, ValueError) as e:
+            await self._dead_letter(entry_id, fields, f"некорректная запись: {e!r}")
+            return
+
+        # Ожидание места в очереди отправки служит backpressure для чтения стрима
+        delivered = await self.send_queue.put(telegram_id, message)
+        self._in_flight.add(entry_id)
+        task = asyncio.create_task(self._ack_when_sent(entry_id, delivered))
+        self._acks.add(task)
+        task.add_done_callback(self._acks.discard)
+
+    async def _ack_when_sent(self, entry_id, delivered: asyncio.Future) -> None:
+        try:
+            result = await delivered
+            if result == RETRY:
+                logger.warning(
+                    f"Запись {entry_id} не отправлена, повтор через "
+                    f"{self.claim_idle_ms // 1000} с"
+                )
+                return
+            if result == FAILED:
+                logger.warning(f"Telegram отказал в доставке записи {entry_id}")
+            await self.redis.xack(self.stream, self.group, entry_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Не удалось подтвердить запись {entry_id}: {e}")
+        finally:
+            self._in_flight.discard(entry_id)
+
+    async def _dead_letter(self, entry_id, fields: dict, reason: str) -> None:
+        """Перенос записи в dead-letter стрим с причиной и ее подтверждение"""
+        logger.error(
+            f"Запись {entry_id} перенесена в {self.dead_letter_stream}: {reason}"
+        )
+        await self.redis.xadd(
+            self.dead_letter_stream,
+            {**(fields or {}), "source_id": entry_id, "error": reason},
+            maxlen=settings.NOTIFICATION_DEAD_LETTER_MAXLEN,
+            approximate=True,
+        )
+        await self.redis.xack(self.stream, self.group, entry_id)
@@ -1,14 +1,32 @@
+import asyncio
+import hmac
+import json
 import logging
+from typing import Optional
 
 from aiogram import Bot
+from aiogram.types import Update
 from aiohttp import web
 
 from config.settings import settings
+from services.client_api import api_client
+from services.metrics import metrics_handler, metrics_middleware
+from services.send_queue import FAILED, SENT, SendQueue
+from services.update_pool import UpdateWorkerPool
 
 logger = logging.getLogger(__name__)
 
+bot_key = web.AppKey("bot", Bot)
+send_queue_key = web.AppKey("send_queue", SendQueue)
+update_pool_key = web.AppKey("update_pool", UpdateWorkerPool)
+
 
 async def send_message_handler(request):
+    """Отправка одного сообщения: ответ после ответа Telegram
+
+    200 - отправлено, 502 - Telegram отказал окончательно, 503 - очередь
+    переполнена или временная ошибка, отправителю стоит повторить позже.
+    """
     try:
         data = await request.json()
         telegram_id = data.get("telegram_id")
@@ -19,29 +37,204 @@ async def send_message_handler(request):
                 {"error": "Необходимы telegram_id и message"}, status=400
             )
 
-        bot = Bot(token=settings.BOT_TOKEN)
-
-        await bot.send_message(chat_id=telegram_id, text=message, parse_mode="HTML")
+        delivered = request.app[send_queue_key].enqueue(int(telegram_id), message)
+        if delivered is None:
+            logger.warning("Очередь отправки переполнена")
+            return web.json_response(
+                {"error": "Очередь отправки переполнена"},
+                status=503,
+                headers={"Retry-After": "1"},
+            )
 
-        logger.info(f"Сообщение успешно отправлено пользователю {telegram_id}")
-        return web.json_response({"status": "success"})
+        # shield: обрыв соединения отправителем не отменяет саму отправку
+        result = await asyncio.shield(delivered)
 
     except Exception as e:
-        logger.error(f"Ошибка отправки сообщения пользователю {telegram_id}: {e}")
+        logger.error(f"Ошибка отправки сообщения: {e}")
         return web.json_response(
             {"error": f"Не удалось отправить сообщение: {str(e)}"}, status=500
         )
 
+    if result == SENT:
+        return web.json_response({"status": result})
+    if result == FAILED:
+        return web.json_response({"status": result}, status=502)
+    return web.json_response(
+        {"status": result}, status=503, headers={"Retry-After": "1"}
+    )
+
+
+def enqueue_item(send_queue: SendQueue, item):
+    """Постановка одного элемента пакета в очередь
+
+    Возвращает future с итогом доставки или готовый итог с ошибкой.
+    """
+    if (
+        not isinstance(item, dict)
+        or not item.get("telegram_id")
+        or not item.get("message")
+    ):
+        return {"status": "invalid", "error": "Необходимы telegram_id и message"}
+
+    try:
+        telegram_id = int(item["telegram_id"])
+    except (TypeError, ValueError):
+        return {"status": "invalid", "error": "Неверный telegram_id"}
+
+    delivered = send_queue.enqueue(telegram_id, item["message"])
+    if delivered is None:
+        return {"status": "rejected", "error": "Очередь отправки переполнена"}
+    return delivered
+
+
+async def item_result(index: int, pending) -> dict:
+    """Итог элемента пакета для ответа"""
+    if isinstance(pending, dict):
+        return {"index": index, **pending}
+    return {"index": index, "status": await pending}
+
+
+async def send_messages_handler(request):
+    """Пакетная отправка сообщений: JSON-массив или NDJSON-поток
+
+    Элементы ставятся в очередь по мере чтения, ответ приходит после
+    ответа Telegram по каждому: sent, failed (повтор бесполезен), retry
+    (временная ошибка), rejected (очередь переполнена) или invalid.
+    """
+    send_queue = request.app[send_queue_key]
+    pending = []
+
+    try:
+        if request.content_type == "application/x-ndjson":
+            async for line in request.content:
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = None
+                pending.append(enqueue_item(send_queue, item))
+        else:
+            data = await request.json()
+            items = data.get("messages") if isinstance(data, dict) else data
+            if not isinstance(items, list):
+                return web.json_response(
+                    {"error": "Ожидается массив сообщений"}, status=400
+                )
+            for item in items:
+                pending.append(enqueue_item(send_queue, item))
+
+    except Exception as e:
+        logger.error(f"Ошибка пакетной постановки сообщений: {e}")
+        return web.json_response(
+            {"error": f"Не удалось обработать пакет: {str(e)}"}, status=400
+        )
+
+    results = await asyncio.shield(
+        asyncio.gather(
+            *(item_result(index, item) for index, item in enumerate(pending))
+        )
+    )
+    sent = len([r for r in results if r["status"] == SENT])
+    logger.info(f"Пакет сообщений: отправлено {sent} из {len(results)}")
+    return web.json_response({"sent": sent, "total": len(results), "results": results})
+
+
+async def webhook_handler(request):
+    """Прием обновлений Telegram в режиме webhook
+
+    Обновление ставится в пул обработки, ответ Telegram уходит сразу.
+    """
+    token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(token, settings.WEBHOOK_SECRET):
+        return web.json_response({"error": "Неверный секретный токен"}, status=401)
+
+    try:
+        update = Update.model_validate(
+            await request.json(), context={"bot": request.app[bot_key]}
+        )
+    except Exception as e:
+        logger.error(f"Некорректное обновление webhook: {e}")
+        return web.json_response({"error": "Некорректное обновление"}, status=400)
+
+    if not request.app[update_pool_key].submit(update):
+        # Telegram повторит доставку обновления позже
+        logger.warning("Очередь обновлений переполнена")
+        return web.json_response(
+            {"error": "Очередь обновлений переполнена"},
+            status=503,
+            headers={"Retry-After": "1"},
+        )
+
+    return web.json_response({"status": "accepted"})
+
+
+async def stats_handler(request):
+    """Метрики пула соединений к бэкенду и очередей отправки и обновлений"""
+    stats = {
+        "api_client": api_client.pool_stats(),
+        "send_queue": request.app[send_queue_key].snapshot(),
+    }
+    if update_pool_key in request.app:
+        stats["update_pool"] = request.app[update_pool_key].snapshot()
+    return web.json_response(stats)
+
 
 def setup_routes(app):
     app.router.add_post("/send_message", send_message_handler)
+    app.router.add_post("/send_messages", send_messages_handler)
+    app.router.add_get("/stats", stats_handler)
+    app.router.add_get("/metrics", metrics_handler)
+    if update_pool_key in app:
+        app.router.add_post(settings.WEBHOOK_PATH, webhook_handler)
+
+
+async def start_send_queue(app):
+    await app[send_queue_key].start()
+
+
+async def stop_send_queue(app):
+    await app[send_queue_key].stop()
+
 
+async def start_update_pool(app):
+    await app[update_pool_key].start()
 
-async def start_notification_api():
-    app = web.Application()
+
+async def stop_update_pool(app):
+    await app[update_pool_key].stop()
+
+
+async def close_bot_session(app):
+    """Закрытие общей сессии бота вместе с Notification API"""
+    await app[bot_key].session.close()
+
+
+def build_notification_app(
+    bot: Bot, update_pool: Optional[UpdateWorkerPool] = None
+) -> web.Application:
+    """Приложение Notification API; с update_pool также принимает webhook Telegram"""
+    app = web.Application(middlewares=[metrics_middleware])
+    app[bot_key] = bot
+    app[send_queue_key] = SendQueue(bot)
+    app.on_startup.append(start_send_queue)
+    if update_pool is not None:
+        app[update_pool_key] = update_pool
+        app.on_startup.append(start_update_pool)
+        # Обработчики обновлений отправляют сообщения, поэтому пул
+        # останавливается раньше очереди отправки и сессии бота
+        app.on_cleanup.append(stop_update_pool)
+    app.on_cleanup.append(stop_send_queue)
+    app.on_cleanup.append(close_bot_session)
     setup_routes(app)
+    return app
+
 
-    runner = web.AppRunner(app)
+async def start_notification_api(
+    bot: Bot, update_pool: Optional[UpdateWorkerPool] = None
+):
+    """Запуск Notification API на порту 8001"""
+    runner = web.AppRunner(build_notification_app(bot, update_pool))
     await runner.setup()
 
     site = web.TCPSite(runner, "0.0.0.0", 8001)
@@ -0,0 +1,325 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+from config.settings import settings
+from services.metrics import SEND_DURATION, SEND_RESULTS
+
+logger = logging.getLogger(__name__)
+
+# Итог доставки сообщения из очереди
+SENT = "sent"
+# Telegram отказал окончательно (бот заблокирован, неверный чат), повтор бесполезен
+FAILED = "failed"
+# Временные ошибки исчерпали попытки или очередь остановлена, стоит повторить позже
+RETRY = "retry"
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity в запасе"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Сколько секунд ждать до появления токена"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение в очереди отправки"""
+
+    chat_id: int
+    text: str
+    attempt: int = 0
+    delivered: Optional[asyncio.Future] = None
+    finished: bool = False
+
+    def finish(self, result: str) -> bool:
+        """Сообщает итог доставки, False если итог уже был"""
+        if self.finished:
+            return False
+        self.finished = True
+        if self.delivered is not None and not self.delivered.done():
+            self.delivered.set_result(result)
+        return True
+
+
+class SendQueue:
+    """Очередь исходящих сообщений с учетом лимитов Telegram
+
+    Глобальный и поканальный token bucket ограничивают темп отправки,
+    RetryAfter приостанавливает отправку на указанное Telegram время,
+    сетевые ошибки повторяются с экспоненциальной задержкой. Место в лимите
+    чата резервируется при постановке: сообщение, которому рано уходить,
+    ждет по таймеру, а не занимает воркер, поэтому поток сообщений в один
+    чат не задерживает остальные. Постановка возвращает future с итогом
+    доставки (SENT, FAILED или RETRY): успех отправителю сообщается только
+    после ответа Telegram, а сообщения, не отправленные до остановки,
+    завершаются с RETRY.
+    """
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.workers_count = settings.SEND_QUEUE_WORKERS
+        self.max_retries = settings.SEND_MAX_RETRIES
+        self.maxsize = settings.SEND_QUEUE_MAXSIZE
+
+        # Сообщения, которые можно отправлять с учетом лимита их чата
+        self._ready: asyncio.Queue = asyncio.Queue()
+        # Сообщения, ждущие своего места в лимите чата
+        self._delayed: Dict[int, Tuple[asyncio.TimerHandle, OutgoingMessage]] = {}
+        # Принятые сообщения без итога доставки, не больше maxsize
+        self._pending = 0
+        self._has_space = asyncio.Event()
+        self._has_space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self._global_bucket = None
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._paused_until = 0.0
+        self._workers: Set[asyncio.Task] = set()
+        self._retries: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "sent": 0,
+            "failed": 0,
+            "retried": 0,
+            "retry_after": 0,
+        }
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._global_bucket = TokenBucket(
+            settings.SEND_GLOBAL_RATE, settings.SEND_GLOBAL_BURST, loop.time()
+        )
+        for _ in range(self.workers_count):
+            self._workers.add(asyncio.create_task(self._worker()))
+        logger.info(f"Очередь отправки запущена ({self.workers_count} воркеров)")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Остановка с попыткой дослать накопленные сообщения"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Очередь отправки остановлена, не отправлено: {self._pending}"
+            )
+
+        for task in self._workers | self._retries:
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers.clear()
+        self._retries.clear()
+
+        # Отправители узнают, что сообщения не доставлены, и повторят их позже
+        for handle, item in list(self._delayed.values()):
+            handle.cancel()
+            self._finish(item, RETRY)
+        self._delayed.clear()
+        while not self._ready.empty():
+            self._finish(self._ready.get_nowait(), RETRY)
+
+    def _message(self, chat_id: int, text: str) -> OutgoingMessage:
+        future = asyncio.get_running_loop().create_future()
+        return OutgoingMessage(chat_id=chat_id, text=text, delivered=future)
+
+    def _accept(self, item: OutgoingMessage) -> None:
+        self._pending += 1
+        self._idle.clear()
+        if self._pending >= self.maxsize:
+            self._has_space.clear()
+        self.stats["enqueued"] += 1
+        self._schedule(item)
+
+    def _finish(self, item: OutgoingMessage, result: str) -> None:
+        """Итог доставки и освобождение места в очереди"""
+        if not item.finish(result):
+            return
+        self._pending -= 1
+        self._has_space.set()
+        if not self._pending:
+            self._idle.set()
+
+    def enqueue(self, chat_id: int, text: str) -> Optional[asyncio.Future]:
+        """Постановка без ожидания: future с итогом доставки, None если очередь
+        переполнена"""
+        if self._pending >= self.maxsize:
+            self.stats["rejected"] += 1
+            return None
+
+        item = self._message(chat_id, text)
+        self._accept(item)
+        return item.delivered
+
+    async def put(self, chat_id: int, text: str) -> asyncio.Future:
+        """Постановка с ожиданием свободного места, future с итогом доставки"""
+        while self._pending >= self.maxsize:
+            self._has_space.clear()
+            await self._has_space.wait()
+
+        item = self._message(chat_id, text)
+        self._accept(item)
+        return item.delivered
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self._pending,
+            "delayed": len(self._delayed),
+            "maxsize": self.maxsize,
+            "chats_tracked": len(self._chat_buckets),
+        }
+
+    def _schedule(self, item: OutgoingMessage) -> None:
+        """Передача сообщения воркерам, когда лимит его чата позволит отправку
+
+        Токен чата списывается сразу, и следующие сообщения того же чата
+        получают более поздний срок, поэтому их порядок сохраняется.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        bucket = self._chat_bucket(item.chat_id, now)
+        delay = bucket.delay(now)
+        bucket.consume(now)
+
+        if delay <= 0:
+            self._ready.put_nowait(item)
+            return
+        handle = loop.call_at(now + delay, self._release, item)
+        self._delayed[id(item)] = (handle, item)
+
+    def _release(self, item: OutgoingMessage) -> None:
+        self._delayed.pop(id(item), None)
+        self._ready.put_nowait(item)
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self._ready.get()
+            try:
+                await self._acquire()
+                await self._send(item)
+            except asyncio.CancelledError:
+                self._finish(item, RETRY)
+                raise
+            except Exception as e:
+                self._finish(item, RETRY)
+                logger.error(f"Ошибка воркера очереди отправки: {e}")
+
+    async def _acquire(self) -> None:
+        """Ожидание глобального лимита и паузы RetryAfter (общих для всех чатов)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            wait = max(self._paused_until - now, self._global_bucket.delay(now))
+            if wait <= 0:
+                self._global_bucket.consume(now)
+                return
+            await asyncio.sleep(wait)
+
+    def _chat_bucket(self, chat_id: int, now: float) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= settings.SEND_MAX_TRACKED_CHATS:
+                # Полные бакеты ничем не отличаются от новых, их можно забыть
+                self._chat_buckets = {
+                    key: value
+                    for key, value in self._chat_buckets.items()
+                    if not value.is_full(now)
+                }
+            bucket = TokenBucket(settings.SEND_CHAT_RATE, settings.SEND_CHAT_BURST, now)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _send(self, item: OutgoingMessage) -> None:
+        started = time.perf_counter()
+        result = "failed"
+        try:
+            await self.bot.send_message(
+                chat_id=item.chat_id, text=item.text, parse_mode="HTML"
+            )
+            result = "sent"
+            self.stats["sent"] += 1
+            self._finish(item, SENT)
+            logger.info(f"Сообщение успешно отправлено пользователю {item.chat_id}")
+
+        except TelegramRetryAfter as e:
+            result = "retry_after"
+            self.stats["retry_after"] += 1
+            loop = asyncio.get_running_loop()
+            self._paused_until = max(self._paused_until, loop.time() + e.retry_after)
+            logger.warning(f"Flood control Telegram, пауза {e.retry_after} с")
+            self._retry(item, delay=0)
+
+        except (TelegramNetworkError, TelegramServerError) as e:
+            result = "network_error"
+            delay = min(
+                settings.SEND_BACKOFF_BASE * 2**item.attempt, settings.SEND_BACKOFF_MAX
+            )
+            logger.warning(
+                f"Ошибка отправки пользователю {item.chat_id}, повтор через {delay} с: {e}"
+            )
+            self._retry(item, delay=delay)
+
+        except Exception as e:
+            self.stats["failed"] += 1
+            self._finish(item, FAILED)
+            logger.error(f"Ошибка отправки сообщения пользователю {item.chat_id}: {e}")
+
+        finally:
+            SEND_DURATION.observe(time.perf_counter() - started)
+            SEND_RESULTS.labels(result).inc()
+
+    def _retry(self, item: OutgoingMessage, delay: float) -> None:
+        if item.attempt >= self.max_retries:
+            self.stats["failed"] += 1
+            self._finish(item, RETRY)
+            logger.error(
+                f"Сообщение пользователю {item.chat_id} не отправлено "
+                f"после {item.attempt + 1} попыток"
+            )
+            return
+
+        item.attempt += 1
+        self.stats["retried"] += 1
+        task = asyncio.create_task(self._requeue(item, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue(self, item: OutgoingMessage, delay: float) -> None:
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+            self._schedule(item)
+        except asyncio.CancelledError:
+            self._finish(item, RETRY)
+            raise
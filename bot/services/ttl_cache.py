@@ -0,0 +1,68 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class UserTTLCache:
+    """LRU-кеш с TTL для данных API, ключи начинаются с telegram_id
+
+    Мутации сбрасывают все записи пользователя. Поколение пользователя
+    растет при каждом сбросе, и ответ, запрошенный до сброса, не попадет
+    в кеш после него. Поколения тоже хранятся не больше чем для maxsize
+    пользователей: у вытесненных поколением считается последнее выданное,
+    поэтому их ответы, запрошенные до вытеснения, в кеш не попадут.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._generations: "OrderedDict[int, int]" = OrderedDict()
+        self._last_generation = 0
+        self._evicted_generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def generation(self, telegram_id: int) -> int:
+        return self._generations.get(telegram_id, self._evicted_generation)
+
+    def set(self, key: Tuple, value: Any, generation: int) -> None:
+        """Сохраняет значение, если данные пользователя не сбрасывались"""
+        if self.ttl <= 0 or generation != self.generation(key[0]):
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate_user(self, telegram_id: int) -> None:
+        self._last_generation += 1
+        self._generations[telegram_id] = self._last_generation
+        self._generations.move_to_end(telegram_id)
+        while len(self._generations) > self.maxsize:
+            self._generations.popitem(last=False)
+            self._evicted_generation = self._last_generation
+
+        for key in [key for key in self._data if key[0] == telegram_id]:
+            del self._data[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
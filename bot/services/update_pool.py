@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Hashable, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateWorkerPool:
+    """Параллельная обработка входящих обновлений webhook
+
+    Обновления разных чатов обрабатываются параллельно (не больше
+    WEBHOOK_WORKERS одновременно), обновления одного чата - строго по
+    очереди. Каждый чат стоит в общей очереди не больше одного раза:
+    воркер обрабатывает одно его обновление и возвращает чат в конец
+    очереди, если у него есть еще.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot):
+        self.dp = dp
+        self.bot = bot
+        self.workers_count = settings.WEBHOOK_WORKERS
+        self.maxsize = settings.WEBHOOK_QUEUE_MAXSIZE
+
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._lanes: Dict[Hashable, Deque[Update]] = {}
+        self._pending = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers: Set[asyncio.Task] = set()
+
+        self.stats = {"accepted": 0, "rejected": 0, "processed": 0, "failed": 0}
+
+    async def start(self) -> None:
+        for _ in range(self.workers_count):
+            self._workers.add(asyncio.create_task(self._worker()))
+        logger.info(f"Обработка обновлений запущена ({self.workers_count} воркеров)")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Остановка с попыткой обработать принятые обновления"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Обработка остановлена, не обработано: {self._pending}")
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+    def submit(self, update: Update) -> bool:
+        """Постановка обновления без ожидания, False если очередь переполнена"""
+        if self._pending >= self.maxsize:
+            self.stats["rejected"] += 1
+            return False
+
+        key = self._lane_key(update)
+        lane = self._lanes.get(key)
+        if lane is None:
+            self._lanes[key] = deque([update])
+            self._ready.put_nowait(key)
+        else:
+            lane.append(update)
+
+        self._pending += 1
+        self._idle.clear()
+        self.stats["accepted"] += 1
+        return True
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "pending": self._pending,
+            "maxsize": self.maxsize,
+            "chats": len(self._lanes),
+        }
+
+    @staticmethod
+    def _lane_key(update: Update) -> Hashable:
+        """Чат обновления; обновления без чата и пользователя не упорядочиваются"""
+        context = UserContextMiddleware.resolve_event_context(update)
+        if context.chat_id is not None:
+            return ("chat", context.chat_id)
+        if context.user_id is not None:
+            return ("user", context.user_id)
+        return ("update", update.update_id)
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self._ready.get()
+            lane = self._lanes[key]
+            update = lane.popleft()
+            try:
+                await self.dp.feed_update(self.bot, update)
+                self.stats["processed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"Ошибка обработки обновления {update.update_id}: {e}")
+            finally:
+                if lane:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._lanes[key]
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.set()
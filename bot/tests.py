@@ -0,0 +1,727 @@
+import asyncio
+import base64
+import json
+import time
+import unittest
+from collections import Counter
+from datetime import datetime
+from unittest import mock
+
+import httpx
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+)
+from aiogram.fsm.storage.redis import RedisEventIsolation
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update, User
+from aiohttp.test_utils import TestClient, TestServer
+
+from config.settings import settings
+from services.client_api import APIClient
+from services.fsm_storage import build_events_isolation, build_fsm_storage
+from services.notification_consumer import NotificationStreamConsumer
+from services.notification_service import build_notification_app
+from models.schemas import UpdateTaskRequest
+from services.send_queue import FAILED, RETRY, SENT, SendQueue, TokenBucket
+from services.ttl_cache import UserTTLCache
+from services.update_pool import UpdateWorkerPool
+
+SEND_METHOD = SendMessage(chat_id=1, text="test")
+
+# Лимиты, которые не тормозят тесты, и короткий backoff
+FAST_SEND = {
+    "SEND_GLOBAL_RATE": 1000.0,
+    "SEND_GLOBAL_BURST": 1000.0,
+    "SEND_CHAT_RATE": 1000.0,
+    "SEND_CHAT_BURST": 1000.0,
+    "SEND_BACKOFF_BASE": 0.05,
+    "SEND_MAX_RETRIES": 3,
+}
+
+
+class FakeSession:
+    async def close(self) -> None:
+        pass
+
+
+class FakeBot:
+    """Бот, send_message которого отвечает ошибками из errors, затем успехом"""
+
+    def __init__(self, errors=(), block: bool = False):
+        self.errors = list(errors)
+        self.block = block
+        self.attempts = []
+        self.sent = []
+        self.session = FakeSession()
+
+    async def send_message(self, chat_id: int, text: str, **kwargs) -> None:
+        self.attempts.append((chat_id, asyncio.get_running_loop().time()))
+        if self.block:
+            await asyncio.Event().wait()
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text))
+
+
+class TokenBucketTests(unittest.TestCase):
+    """Темп и запас token bucket"""
+
+    def test_delay_until_next_token(self):
+        bucket = TokenBucket(rate=2, capacity=1, now=0)
+        self.assertEqual(bucket.delay(0), 0)
+
+        bucket.consume(0)
+        self.assertEqual(bucket.delay(0), 0.5)
+        self.assertEqual(bucket.delay(0.25), 0.25)
+        self.assertEqual(bucket.delay(0.5), 0)
+
+    def test_capacity_bounds_burst(self):
+        bucket = TokenBucket(rate=1, capacity=3, now=0)
+        bucket.consume(0)
+        self.assertFalse(bucket.is_full(0))
+        # За долгий простой запас не растет выше capacity
+        self.assertTrue(bucket.is_full(100))
+
+        for _ in range(3):
+            self.assertEqual(bucket.delay(100), 0)
+            bucket.consume(100)
+        self.assertEqual(bucket.delay(100), 1)
+
+
+@mock.patch.multiple(settings, **FAST_SEND)
+class SendQueueTests(unittest.IsolatedAsyncioTestCase):
+    """Итог доставки, пауза RetryAfter и повторы с backoff"""
+
+    async def send(self, bot: FakeBot, chat_id: int = 1) -> str:
+        queue = SendQueue(bot)
+        await queue.start()
+        try:
+            return await (await queue.put(chat_id, "text"))
+        finally:
+            await queue.stop()
+
+    async def test_result_after_telegram_answer(self):
+        bot = FakeBot()
+        self.assertEqual(await self.send(bot), SENT)
+        self.assertEqual(bot.sent, [(1, "text")])
+
+    async def test_retry_after_pauses_sending(self):
+        bot = FakeBot([TelegramRetryAfter(SEND_METHOD, "Flood", retry_after=1)])
+        queue = SendQueue(bot)
+        await queue.start()
+        try:
+            first = await queue.put(1, "first")
+            await asyncio.sleep(0.1)
+            # Пауза общая: сообщение другому чату тоже ждет ее окончания
+            second = await queue.put(2, "second")
+            self.assertEqual(await asyncio.gather(first, second), [SENT, SENT])
+        finally:
+            await queue.stop()
+
+        started = bot.attempts[0][1]
+        self.assertTrue(all(at - started >= 1 for _, at in bot.attempts[1:]))
+        self.assertEqual(queue.stats["retry_after"], 1)
+
+    async def test_network_errors_back_off_exponentially(self):
+        bot = FakeBot([TelegramNetworkError(SEND_METHOD, "timeout")] * 2)
+        queue = SendQueue(bot)
+        with mock.patch.object(queue, "_retry", wraps=queue._retry) as retry:
+            await queue.start()
+            try:
+                self.assertEqual(await (await queue.put(1, "text")), SENT)
+            finally:
+                await queue.stop()
+
+        delays = [call.kwargs["delay"] for call in retry.call_args_list]
+        self.assertEqual(delays, [0.05, 0.1])
+        self.assertEqual(queue.stats["retried"], 2)
+
+    async def test_exhausted_retries_ask_to_retry_later(self):
+        bot = FakeBot([TelegramNetworkError(SEND_METHOD, "timeout")] * 4)
+        self.assertEqual(await self.send(bot), RETRY)
+        self.assertEqual(len(bot.attempts), 4)
+
+    async def test_permanent_error_is_not_retried(self):
+        bot = FakeBot([TelegramForbiddenError(SEND_METHOD, "bot was blocked")])
+        self.assertEqual(await self.send(bot), FAILED)
+        self.assertEqual(len(bot.attempts), 1)
+
+    async def test_busy_chat_does_not_block_others(self):
+        bot = FakeBot()
+        # Лимиты класса перекрыли бы патч-декоратор метода
+        with mock.patch.multiple(
+            settings, SEND_QUEUE_WORKERS=1, SEND_CHAT_RATE=10.0, SEND_CHAT_BURST=1.0
+        ):
+            queue = SendQueue(bot)
+            await queue.start()
+            started = asyncio.get_running_loop().time()
+            try:
+                burst = [await queue.put(1, f"{index}") for index in range(5)]
+                other = await queue.put(2, "other")
+                self.assertEqual(await asyncio.gather(*burst, other), [SENT] * 6)
+            finally:
+                await queue.stop()
+
+        # Пять сообщений чату 1 уходят по лимиту за 0.4 с, по порядку, а
+        # сообщение чату 2 не ждет их единственного воркера
+        self.assertEqual(
+            [text for chat_id, text in bot.sent if chat_id == 1],
+            ["0", "1", "2", "3", "4"],
+        )
+        times = {chat_id: at - started for chat_id, at in bot.attempts}
+        self.assertLess(times[2], 0.1)
+        self.assertGreaterEqual(times[1], 0.39)
+
+    @mock.patch.object(settings, "SEND_QUEUE_MAXSIZE", 2)
+    async def test_capacity_counts_messages_without_result(self):
+        queue = SendQueue(FakeBot(block=True))
+        await queue.start()
+        accepted = [queue.enqueue(chat_id, "text") for chat_id in range(3)]
+        self.assertIsNone(accepted[2])
+        self.assertEqual(queue.stats["rejected"], 1)
+
+        await queue.stop(timeout=0.1)
+        self.assertEqual([future.result() for future in accepted[:2]], [RETRY] * 2)
+        self.assertEqual(queue.snapshot()["queued"], 0)
+
+    @mock.patch.object(settings, "SEND_QUEUE_WORKERS", 1)
+    async def test_stop_reports_undelivered_messages(self):
+        queue = SendQueue(FakeBot(block=True))
+        await queue.start()
+        sending = await queue.put(1, "sending")
+        queued = await queue.put(2, "queued")
+        await asyncio.sleep(0)
+
+        await queue.stop(timeout=0.1)
+        self.assertEqual([sending.result(), queued.result()], [RETRY, RETRY])
+
+
+@mock.patch.multiple(settings, **FAST_SEND)
+class NotificationApiTests(unittest.IsolatedAsyncioTestCase):
+    """Ответ Notification API после ответа Telegram"""
+
+    async def client(self, bot: FakeBot) -> TestClient:
+        client = TestClient(TestServer(build_notification_app(bot)))
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        return client
+
+    async def test_send_message_answers_after_delivery(self):
+        bot = FakeBot()
+        client = await self.client(bot)
+
+        response = await client.post(
+            "/send_message", json={"telegram_id": 5, "message": "hi"}
+        )
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.json(), {"status": SENT})
+        self.assertEqual(bot.sent, [(5, "hi")])
+
+    async def test_send_message_reports_failures(self):
+        client = await self.client(
+            FakeBot(
+                [
+                    TelegramForbiddenError(SEND_METHOD, "bot was blocked"),
+                    *[TelegramNetworkError(SEND_METHOD, "timeout")] * 4,
+                ]
+            )
+        )
+
+        response = await client.post(
+            "/send_message", json={"telegram_id": 5, "message": "hi"}
+        )
+        self.assertEqual(response.status, 502)
+
+        response = await client.post(
+            "/send_message", json={"telegram_id": 5, "message": "hi"}
+        )
+        self.assertEqual(response.status, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+    async def test_send_messages_reports_each_item(self):
+        bot = FakeBot([TelegramForbiddenError(SEND_METHOD, "bot was blocked")])
+        client = await self.client(bot)
+
+        response = await client.post(
+            "/send_messages",
+            json=[
+                {"telegram_id": 5, "message": "blocked"},
+                {"telegram_id": "x", "message": "invalid"},
+                {"telegram_id": 6, "message": "hi"},
+            ],
+        )
+        self.assertEqual(response.status, 200)
+        body = await response.json()
+        self.assertEqual(body["sent"], 1)
+        self.assertEqual(
+            [item["status"] for item in body["results"]], [FAILED, "invalid", SENT]
+        )
+
+
+class FakeSendQueue:
+    """Очередь отправки, которая сразу завершает сообщения итогом result"""
+
+    def __init__(self, result: str = SENT):
+        self.result = result
+        self.messages = []
+
+    async def put(self, chat_id: int, text: str) -> asyncio.Future:
+        self.messages.append((chat_id, text))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(self.result)
+        return future
+
+
+class FakeStreamRedis:
+    """Pending-записи consumer group одного стрима в памяти"""
+
+    def __init__(self, pending: dict = None):
+        # ID записи -> [поля, число доставок]
+        self.pending = {
+            entry_id: [fields, 1] for entry_id, fields in (pending or {}).items()
+        }
+        self.acked = []
+        self.dead_letters = []
+
+    async def xack(self, stream, group, *entry_ids) -> int:
+        for entry_id in entry_ids:
+            self.acked.append(entry_id)
+            self.pending.pop(entry_id, None)
+        return len(entry_ids)
+
+    async def xadd(self, stream, fields, **kwargs) -> bytes:
+        self.dead_letters.append(fields)
+        return b"1-0"
+
+    async def xautoclaim(self, stream, group, consumer, min_idle_time, **kwargs):
+        for item in self.pending.values():
+            item[1] += 1
+        return [
+            b"0-0",
+            [(entry_id, item[0]) for entry_id, item in self.pending.items()],
+            [],
+        ]
+
+    async def xpending_range(self, stream, group, **kwargs) -> list:
+        return [
+            {"message_id": entry_id, "times_delivered": item[1]}
+            for entry_id, item in self.pending.items()
+        ]
+
+
+ENTRY = {b"telegram_id": b"5", b"message": "привет".encode()}
+
+
+@mock.patch.multiple(
+    settings, NOTIFICATION_MAX_DELIVERIES=3, NOTIFICATION_DEAD_LETTER_MAXLEN=100
+)
+class NotificationStreamConsumerTests(unittest.IsolatedAsyncioTestCase):
+    """Подтверждение записей стрима по итогу отправки, dead-letter и XAUTOCLAIM"""
+
+    def consumer(self, result: str = SENT, pending: dict = None):
+        consumer = NotificationStreamConsumer(FakeSendQueue(result))
+        consumer.redis = FakeStreamRedis(pending)
+        return consumer
+
+    async def handle(self, consumer, entry_id, fields: dict) -> None:
+        await consumer._handle(entry_id, fields)
+        await asyncio.gather(*consumer._acks)
+
+    async def test_acked_after_delivery(self):
+        for result in (SENT, FAILED):
+            consumer = self.consumer(result, pending={b"1-0": ENTRY})
+            await self.handle(consumer, b"1-0", ENTRY)
+
+            self.assertEqual(consumer.send_queue.messages, [(5, "привет")])
+            self.assertEqual(consumer.redis.acked, [b"1-0"])
+            self.assertEqual(consumer._in_flight, set())
+
+    async def test_transient_failure_stays_pending(self):
+        consumer = self.consumer(RETRY, pending={b"1-0": ENTRY})
+        await self.handle(consumer, b"1-0", ENTRY)
+
+        self.assertEqual(consumer.redis.acked, [])
+        self.assertIn(b"1-0", consumer.redis.pending)
+        self.assertEqual(consumer._in_flight, set())
+
+    async def test_malformed_entries_are_dead_lettered(self):
+        malformed = {
+            b"1-0": {b"message": b"text"},
+            b"2-0": {b"telegram_id": b"abc", b"message": b"text"},
+            b"3-0": {b"telegram_id": b"5", b"message": b"\xff"},
+        }
+        consumer = self.consumer(pending=malformed)
+        for entry_id, fields in malformed.items():
+            await self.handle(consumer, entry_id, fields)
+
+        self.assertEqual(consumer.send_queue.messages, [])
+        self.assertEqual(consumer.redis.acked, [b"1-0", b"2-0", b"3-0"])
+        self.assertEqual(
+            [item["source_id"] for item in consumer.redis.dead_letters],
+            [b"1-0", b"2-0", b"3-0"],
+        )
+
+    async def test_reclaim_caps_deliveries(self):
+        consumer = self.consumer(pending={b"1-0": ENTRY, b"2-0": ENTRY, b"3-0": ENTRY})
+        consumer.redis.pending[b"1-0"][1] = 3
+        # Запись в очереди отправки этого экземпляра повторно не ставится
+        consumer._in_flight.add(b"3-0")
+
+        await consumer._reclaim()
+        await asyncio.gather(*consumer._acks)
+
+        self.assertEqual(
+            [item["source_id"] for item in consumer.redis.dead_letters], [b"1-0"]
+        )
+        self.assertEqual(consumer.send_queue.messages, [(5, "привет")])
+        self.assertEqual(consumer.redis.acked, [b"1-0", b"2-0"])
+        self.assertEqual(list(consumer.redis.pending), [b"3-0"])
+
+
+class FSMStorageTests(unittest.IsolatedAsyncioTestCase):
+    """Блокировка событий пользователя включается вместе с Redis-хранилищем"""
+
+    async def test_redis_storage_isolates_events(self):
+        with mock.patch.object(settings, "FSM_STORAGE", "redis"):
+            storage = build_fsm_storage()
+            isolation = build_events_isolation(storage)
+        self.addAsyncCleanup(storage.close)
+
+        self.assertIsInstance(isolation, RedisEventIsolation)
+        self.assertIs(isolation.redis, storage.redis)
+
+    async def test_memory_storage_needs_no_isolation(self):
+        with mock.patch.object(settings, "FSM_STORAGE", "memory"):
+            self.assertIsNone(build_events_isolation(build_fsm_storage()))
+
+
+def chat_update(update_id: int, chat_id: int) -> Update:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime(2025, 1, 1),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=User(id=chat_id, is_bot=False, first_name="User"),
+            text="text",
+        ),
+    )
+
+
+class FakeDispatcher:
+    """Dispatcher, обработка обновления в котором ждет release"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.events = []
+        self.running = {}
+        self.max_running = 0
+
+    async def feed_update(self, bot, update: Update) -> None:
+        chat_id = update.message.chat.id
+        self.running[chat_id] = self.running.get(chat_id, 0) + 1
+        self.max_running = max(self.max_running, sum(self.running.values()))
+        self.events.append((chat_id, update.update_id, self.running[chat_id]))
+        await self.release.wait()
+        self.running[chat_id] -= 1
+
+
+@mock.patch.multiple(
+    settings,
+    WEBHOOK_WORKERS=4,
+    WEBHOOK_QUEUE_MAXSIZE=6,
+    WEBHOOK_SECRET="secret",
+    **FAST_SEND,
+)
+class UpdateWorkerPoolTests(unittest.IsolatedAsyncioTestCase):
+    """Параллельная обработка чатов, порядок внутри чата и переполнение"""
+
+    async def test_chats_in_parallel_updates_of_chat_in_order(self):
+        dp = FakeDispatcher()
+        pool = UpdateWorkerPool(dp, FakeBot())
+        await pool.start()
+        for update_id, chat_id in enumerate([1, 2, 1, 2, 1, 2], start=1):
+            self.assertTrue(pool.submit(chat_update(update_id, chat_id)))
+        # Очередь заполнена: обновление отклоняется, Telegram повторит его
+        self.assertFalse(pool.submit(chat_update(7, 3)))
+
+        await asyncio.sleep(0.01)
+        dp.release.set()
+        await pool.stop(timeout=1)
+
+        self.assertEqual(dp.max_running, 2)
+        self.assertEqual(
+            [update_id for chat_id, update_id, _ in dp.events if chat_id == 1],
+            [1, 3, 5],
+        )
+        self.assertEqual(
+            [update_id for chat_id, update_id, _ in dp.events if chat_id == 2],
+            [2, 4, 6],
+        )
+        # Обновления одного чата не обрабатываются одновременно
+        self.assertTrue(all(running == 1 for _, _, running in dp.events))
+        self.assertEqual(pool.stats["processed"], 6)
+        self.assertEqual(pool.stats["rejected"], 1)
+
+    async def test_webhook_answers_503_when_queue_is_full(self):
+        dp = FakeDispatcher()
+        bot = FakeBot()
+        client = TestClient(
+            TestServer(build_notification_app(bot, UpdateWorkerPool(dp, bot)))
+        )
+        await client.start_server()
+        self.addAsyncCleanup(client.close)
+        self.addCleanup(dp.release.set)
+
+        headers = {"X-Telegram-Bot-Api-Secret-Token": "secret"}
+        statuses = []
+        for update_id in range(1, 9):
+            update = chat_update(update_id, update_id)
+            response = await client.post(
+                "/webhook",
+                json=update.model_dump(mode="json", exclude_none=True),
+                headers=headers,
+            )
+            statuses.append(response.status)
+
+        self.assertEqual(statuses, [200] * 6 + [503] * 2)
+        self.assertEqual(response.headers["Retry-After"], "1")
+
+        response = await client.post("/webhook", json={}, headers={})
+        self.assertEqual(response.status, 401)
+
+
+def make_jwt(claims: dict) -> str:
+    """JWT без подписи: клиент читает из него только exp"""
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode()
+    return f"header.{payload.rstrip('=')}.signature"
+
+
+TASK = {
+    "id": "1",
+    "title": "Задача",
+    "created_at": "2025-01-01T00:00:00Z",
+    "is_completed": False,
+    "telegram_user_id": 5,
+}
+
+
+class FakeBackend:
+    """Бэкенд на httpx.MockTransport: токены бота и данные задач"""
+
+    def __init__(self, refresh_status: int = 200, reject_all: bool = False):
+        self.refresh_status = refresh_status
+        self.reject_all = reject_all
+        self.calls = Counter()
+        self.valid_tokens = set()
+        # Задержка ответа по пути запроса
+        self.delays = {}
+        # Статус второй страницы списка задач
+        self.next_page_status = 200
+
+    def issue(self, lifetime: float = 3600) -> str:
+        token = make_jwt({"exp": time.time() + lifetime, "jti": len(self.valid_tokens)})
+        self.valid_tokens.add(token)
+        return token
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.calls[path] += 1
+        # Окно, в которое успевают прийти параллельные запросы
+        await asyncio.sleep(self.delays.get(path, 0.01))
+
+        if path == "/api/bot/token/":
+            return httpx.Response(
+                200, json={"access": self.issue(), "refresh": "refresh-new"}
+            )
+        if path == "/api/bot/token/refresh/":
+            if self.refresh_status != 200:
+                return httpx.Response(self.refresh_status)
+            return httpx.Response(200, json={"access": self.issue()})
+
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        if self.reject_all or token not in self.valid_tokens:
+            return httpx.Response(401)
+        if path == "/api/tasks/stats/":
+            return httpx.Response(200, json={"total": 3})
+        if path == "/api/tasks/1/":
+            return httpx.Response(200, json=TASK)
+        if path == "/api/tasks/":
+            if "cursor" not in request.url.params:
+                next_url = "http://backend/api/tasks/?cursor=2&telegram_user_id=5"
+                return httpx.Response(200, json={"results": [TASK], "next": next_url})
+            if self.next_page_status != 200:
+                return httpx.Response(self.next_page_status)
+            task = {**TASK, "id": "2", "title": "Вторая"}
+            return httpx.Response(200, json={"results": [task], "next": None})
+        return httpx.Response(404)
+
+    async def client(self, access: str, refresh: str = "refresh") -> APIClient:
+        client = APIClient()
+        client._client = httpx.AsyncClient(
+            base_url="http://backend", transport=httpx.MockTransport(self.handle)
+        )
+        client._set_access_token(access)
+        client.refresh_token = refresh
+        return client
+
+
+@mock.patch.multiple(settings, API_TOKEN_REFRESH_MARGIN=300, API_ASYNC_READS=False)
+class APIClientAuthTests(unittest.IsolatedAsyncioTestCase):
+    """Обновление токена бота: одно на все запросы, запасной путь, один повтор"""
+
+    async def client(self, backend: FakeBackend, access: str) -> APIClient:
+        client = await backend.client(access)
+        self.addAsyncCleanup(client.close)
+        return client
+
+    async def test_concurrent_401s_refresh_once(self):
+        backend = FakeBackend()
+        # Токен еще не истек по exp, но бэкенд его уже не принимает
+        client = await self.client(backend, make_jwt({"exp": time.time() + 3600}))
+
+        stats = await asyncio.gather(
+            *(client.get_task_stats(telegram_id) for telegram_id in range(10))
+        )
+
+        self.assertEqual([item.total for item in stats], [3] * 10)
+        self.assertEqual(backend.calls["/api/bot/token/refresh/"], 1)
+        self.assertEqual(backend.calls["/api/bot/token/"], 0)
+        self.assertEqual(backend.calls["/api/tasks/stats/"], 20)
+
+    async def test_refresh_before_expiry(self):
+        backend = FakeBackend()
+        client = await self.client(backend, backend.issue(lifetime=60))
+
+        self.assertEqual((await client.get_task_stats(1)).total, 3)
+        self.assertEqual(backend.calls["/api/bot/token/refresh/"], 1)
+        self.assertEqual(backend.calls["/api/tasks/stats/"], 1)
+
+    async def test_failed_refresh_falls_back_to_new_tokens(self):
+        backend = FakeBackend(refresh_status=401)
+        client = await self.client(backend, make_jwt({"exp": time.time() + 3600}))
+
+        self.assertEqual((await client.get_task_stats(1)).total, 3)
+        self.assertEqual(backend.calls["/api/bot/token/refresh/"], 1)
+        self.assertEqual(backend.calls["/api/bot/token/"], 1)
+        self.assertEqual(client.refresh_token, "refresh-new")
+
+    async def test_401_is_retried_once(self):
+        backend = FakeBackend(reject_all=True)
+        client = await self.client(backend, backend.issue())
+
+        self.assertEqual((await client.get_task_stats(1)).total, 0)
+        self.assertEqual(backend.calls["/api/tasks/stats/"], 2)
+        self.assertEqual(backend.calls["/api/bot/token/refresh/"], 1)
+
+
+class UserTTLCacheTests(unittest.TestCase):
+    """Срок жизни, ограничение размера и сброс записей пользователя"""
+
+    def setUp(self):
+        patcher = mock.patch("services.ttl_cache.time")
+        self.clock = patcher.start().monotonic
+        self.clock.return_value = 100.0
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_ttl(self):
+        cache = UserTTLCache(maxsize=10, ttl=30)
+        cache.set((5, "stats"), "value", cache.generation(5))
+
+        self.clock.return_value = 129.9
+        self.assertEqual(cache.get((5, "stats")), "value")
+
+        self.clock.return_value = 130.1
+        self.assertIsNone(cache.get((5, "stats")))
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_size_is_bounded_by_lru(self):
+        cache = UserTTLCache(maxsize=2, ttl=30)
+        for key in ("a", "b"):
+            cache.set((5, key), key, cache.generation(5))
+        cache.get((5, "a"))
+        cache.set((5, "c"), "c", cache.generation(5))
+
+        self.assertEqual(cache.stats()["size"], 2)
+        self.assertIsNone(cache.get((5, "b")))
+        self.assertEqual(cache.get((5, "a")), "a")
+
+    def test_invalidation_drops_user_entries_and_stale_results(self):
+        cache = UserTTLCache(maxsize=10, ttl=30)
+        generation = cache.generation(5)
+        cache.set((5, "stats"), "stats", generation)
+        cache.set((6, "stats"), "other user", cache.generation(6))
+
+        cache.invalidate_user(5)
+        self.assertIsNone(cache.get((5, "stats")))
+        self.assertEqual(cache.get((6, "stats")), "other user")
+
+        # Ответ, запрошенный до сброса, в кеш не попадает
+        cache.set((5, "stats"), "stale", generation)
+        self.assertIsNone(cache.get((5, "stats")))
+
+    def test_generations_are_bounded(self):
+        cache = UserTTLCache(maxsize=2, ttl=30)
+        generation = cache.generation(5)
+        for telegram_id in range(5, 105):
+            cache.invalidate_user(telegram_id)
+        self.assertEqual(len(cache._generations), 2)
+
+        # Ответ до сброса не попадает в кеш и после вытеснения поколения
+        cache.set((5, "stats"), "stale", generation)
+        self.assertIsNone(cache.get((5, "stats")))
+        cache.set((5, "stats"), "fresh", cache.generation(5))
+        self.assertEqual(cache.get((5, "stats")), "fresh")
+
+
+@mock.patch.multiple(
+    settings, API_CACHE_TTL=30, API_CACHE_MAXSIZE=100, API_ASYNC_READS=False
+)
+class APIClientCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Кеш чтений APIClient и его сброс мутациями клиента"""
+
+    async def asyncSetUp(self):
+        self.backend = FakeBackend()
+        self.api = await self.backend.client(self.backend.issue())
+        self.addAsyncCleanup(self.api.close)
+
+    async def test_reads_are_cached_until_mutation(self):
+        for _ in range(3):
+            self.assertEqual((await self.api.get_task_detail(5, "1")).title, "Задача")
+        self.assertEqual(self.backend.calls["/api/tasks/1/"], 1)
+
+        await self.api.update_task(5, "1", UpdateTaskRequest(title="Новая"))
+        await self.api.get_task_detail(5, "1")
+        # GET до мутации, PATCH и новый GET после сброса
+        self.assertEqual(self.backend.calls["/api/tasks/1/"], 3)
+
+    async def test_read_racing_a_mutation_is_not_cached(self):
+        # Мутация завершается, пока чтение еще ждет ответа
+        self.backend.delays["/api/tasks/stats/"] = 0.1
+        await asyncio.gather(
+            self.api.get_task_stats(5),
+            self.api.update_task(5, "1", UpdateTaskRequest(title="Новая")),
+        )
+        await self.api.get_task_stats(5)
+        self.assertEqual(self.backend.calls["/api/tasks/stats/"], 2)
+
+    async def test_incomplete_list_is_not_cached(self):
+        self.backend.next_page_status = 500
+        tasks = await self.api.get_tasks(5)
+        self.assertEqual([task.id for task in tasks], ["1"])
+
+        self.backend.next_page_status = 200
+        tasks = await self.api.get_tasks(5)
+        self.assertEqual([task.id for task in tasks], ["1", "2"])
+        self.assertEqual(self.backend.calls["/api/tasks/"], 4)
+
+    async def test_list_is_not_cached_without_token(self):
+        with mock.patch.object(self.api, "_ensure_authenticated", return_value=False):
+            self.assertEqual(await self.api.get_tasks(5), [])
+        self.assertEqual(len(await self.api.get_tasks(5)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()